@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+本地工具使用的外部归并排序
+行（bytes，不含换行符）先在有界的排序缓冲区中累积，写满后排序并溢写为临时排序段文件，
+最后用heapq多路归并；排序段数超过归并因子时先分轮归并成中间排序段，同时打开的文件数有界。
+内存只取决于排序缓冲区大小，与输入大小无关，可以排序远大于内存的数据
+
+缓冲区大小、归并因子和溢写压缩默认读取conf/mapred-site.xml中的
+mapreduce.task.io.sort.mb、mapreduce.task.io.sort.factor、mapreduce.map.output.compress(.codec)
+"""
+
+import heapq
+import importlib
+import operator
+import os
+import shutil
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from itertools import islice
+
+# 集群配置文件
+MAPRED_SITE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'conf',
+                           'mapred-site.xml')
+# 未配置时使用Hadoop的默认值
+DEFAULT_SORT_MB = 100
+DEFAULT_SORT_FACTOR = 10
+# 读写管道和排序段文件的缓冲区大小
+IO_BUFFER_BYTES = 1024 * 1024
+# 批量写入时每批的行数
+WRITE_BATCH_LINES = 65536
+# 缓冲区中每条记录除数据外的内存开销（bytes对象头 + 列表指针），用于按实际内存计算缓冲区占用
+RECORD_OVERHEAD_BYTES = sys.getsizeof(b'') + 8
+
+# 溢写压缩格式：名称 -> (模块, 打开参数, 文件后缀)
+SPILL_CODECS = {
+    'gzip': ('gzip', {'compresslevel': 1}, '.gz'),
+    'bz2': ('bz2', {'compresslevel': 1}, '.bz2'),
+    'lzma': ('lzma', {'preset': 0}, '.xz'),
+}
+# Hadoop压缩类 -> 溢写压缩格式（Snappy、LZ4等没有标准库实现的格式按gzip处理）
+HADOOP_CODECS = {
+    'org.apache.hadoop.io.compress.DefaultCodec': 'gzip',
+    'org.apache.hadoop.io.compress.GzipCodec': 'gzip',
+    'org.apache.hadoop.io.compress.BZip2Codec': 'bz2',
+}
+
+def read_hadoop_conf(conf_file=MAPRED_SITE):
+    """
+    读取Hadoop XML配置文件
+    Args:
+        conf_file: 配置文件路径
+    Returns:
+        {属性名: 值}，文件不存在或无法解析时为空字典
+    """
+    try:
+        root = ET.parse(conf_file).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    conf = {}
+    for prop in root.iter('property'):
+        name = prop.findtext('name')
+        if name:
+            conf[name.strip()] = (prop.findtext('value') or '').strip()
+    return conf
+
+def sort_settings(buffer_bytes=None, merge_factor=None, codec=None, conf_file=MAPRED_SITE):
+    """
+    确定排序参数：显式指定的值优先，其余从mapred-site.xml读取，最后使用Hadoop默认值
+    Args:
+        buffer_bytes: 排序缓冲区大小（字节）
+        merge_factor: 一轮归并最多同时打开的排序段数
+        codec: 溢写压缩格式（SPILL_CODECS中的名称，'none'表示不压缩）
+        conf_file: 配置文件路径
+    Returns:
+        (buffer_bytes, merge_factor, codec)，codec为None表示不压缩
+    Raises:
+        ValueError: 压缩格式不支持
+    """
+    conf = None
+    if buffer_bytes is None or merge_factor is None or codec is None:
+        conf = read_hadoop_conf(conf_file)
+
+    if buffer_bytes is None:
+        buffer_bytes = int(conf.get('mapreduce.task.io.sort.mb', DEFAULT_SORT_MB)) * 1024 * 1024
+    if merge_factor is None:
+        merge_factor = int(conf.get('mapreduce.task.io.sort.factor', DEFAULT_SORT_FACTOR))
+    if codec is None:
+        if conf.get('mapreduce.map.output.compress', 'false').lower() == 'true':
+            codec = HADOOP_CODECS.get(conf.get('mapreduce.map.output.compress.codec'), 'gzip')
+        else:
+            codec = 'none'
+
+    if codec == 'none':
+        codec = None
+    elif codec not in SPILL_CODECS:
+        raise ValueError(f"Unknown spill codec: {codec}")
+    return buffer_bytes, max(2, merge_factor), codec
+
+def run_suffix(codec):
+    """排序段文件的后缀"""
+    return SPILL_CODECS[codec][2] if codec else ''
+
+def open_run(path, mode, codec=None):
+    """
+    打开排序段文件
+    Args:
+        path: 文件路径
+        mode: 'rb'或'wb'
+        codec: 压缩格式，为None时不压缩
+    Returns:
+        二进制文件对象
+    """
+    if codec is None:
+        return open(path, mode, buffering=IO_BUFFER_BYTES)
+    module, options, _ = SPILL_CODECS[codec]
+    if mode == 'rb':
+        options = {}
+    return importlib.import_module(module).open(path, mode, **options)
+
+def read_lines(stream):
+    """
+    按块读取二进制流并拆分成行（不含换行符）
+    Args:
+        stream: 二进制流
+    Yields:
+        每块中的完整行列表
+    """
+    read = getattr(stream, 'read1', stream.read)
+    pending = b''
+    while True:
+        block = read(IO_BUFFER_BYTES)
+        if not block:
+            break
+        lines = (pending + block).split(b'\n')
+        pending = lines.pop()
+        yield lines
+    if pending:
+        yield [pending]
+
+def write_lines(stream, lines):
+    """按批将行（不含换行符）写入二进制流"""
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, WRITE_BATCH_LINES))
+        if not batch:
+            break
+        stream.write(b'\n'.join(batch))
+        stream.write(b'\n')
+
+def write_run(path, lines, codec=None):
+    """
+    将有序行写入排序段文件
+    Args:
+        path: 文件路径
+        lines: 有序行（不含换行符）
+        codec: 压缩格式，为None时不压缩
+    Returns:
+        文件在磁盘上的字节数
+    """
+    with open_run(path, 'wb', codec) as run:
+        write_lines(run, lines)
+    return os.path.getsize(path)
+
+def merge_runs(runs):
+    """
+    多路归并排序段文件
+    Args:
+        runs: 打开的排序段文件列表
+    Returns:
+        有序行迭代器（不含换行符）
+    """
+    # 去掉换行符后比较，与缓冲区内的排序顺序一致
+    lines = [map(operator.itemgetter(slice(None, -1)), run) for run in runs]
+    if len(lines) == 1:
+        return lines[0]
+    return heapq.merge(*lines)
+
+def merge_run_files(paths, codec=None, merge_factor=DEFAULT_SORT_FACTOR, tmp_dir=None):
+    """
+    归并排序段文件：超过归并因子时先把最早的排序段分轮归并成中间排序段，最后一轮流式输出
+    Args:
+        paths: 排序段文件路径列表（不会被删除）
+        codec: 排序段压缩格式
+        merge_factor: 一轮归并最多同时打开的排序段数
+        tmp_dir: 中间排序段目录，默认为第一个排序段所在目录
+    Yields:
+        有序行（不含换行符）
+    """
+    pending = list(paths)
+    intermediate = []
+    if tmp_dir is None and pending:
+        tmp_dir = os.path.dirname(pending[0])
+    try:
+        while len(pending) > merge_factor:
+            group, pending = pending[:merge_factor], pending[merge_factor:]
+            runs = [open_run(path, 'rb', codec) for path in group]
+            try:
+                fd, path = tempfile.mkstemp(prefix='merge-', suffix=run_suffix(codec), dir=tmp_dir)
+                os.close(fd)
+                intermediate.append(path)
+                write_run(path, merge_runs(runs), codec)
+            finally:
+                for run in runs:
+                    run.close()
+            pending.append(path)
+
+        runs = [open_run(path, 'rb', codec) for path in pending]
+        try:
+            yield from merge_runs(runs)
+        finally:
+            for run in runs:
+                run.close()
+    finally:
+        for path in intermediate:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class ExternalSorter:
+    """
+    有界内存的行排序器：add_lines累积行，缓冲区写满时排序并溢写，sorted_lines归并输出
+    """
+
+    def __init__(self, tmp_dir=None, buffer_bytes=None, merge_factor=None, codec=None):
+        self.buffer_bytes, self.merge_factor, self.codec = sort_settings(buffer_bytes,
+                                                                         merge_factor, codec)
+        self.spill_dir = tempfile.mkdtemp(prefix='external-sort-', dir=tmp_dir)
+        self.lines = []
+        self.size = 0
+        self.runs = []
+        self.records = 0
+        self.spills = 0
+        self.spilled_bytes = 0
+
+    def add_lines(self, lines):
+        """添加一批行（不含换行符）"""
+        self.lines.extend(lines)
+        self.size += sum(map(len, lines)) + len(lines) * RECORD_OVERHEAD_BYTES
+        self.records += len(lines)
+        if self.size >= self.buffer_bytes:
+            self.spill()
+
+    def spill(self):
+        """缓冲区排序后写入排序段文件"""
+        if not self.lines:
+            return
+        self.lines.sort()
+        path = os.path.join(self.spill_dir, f"spill{self.spills}{run_suffix(self.codec)}")
+        self.spilled_bytes += write_run(path, self.lines, self.codec)
+        self.runs.append(path)
+        self.lines = []
+        self.size = 0
+        self.spills += 1
+
+    def sorted_lines(self):
+        """
+        输出全部已添加行的有序序列；没有溢写过时直接在内存中排序
+        Returns:
+            有序行迭代器（不含换行符）
+        """
+        if not self.runs:
+            self.lines.sort()
+            return iter(self.lines)
+        self.spill()
+        return merge_run_files(self.runs, self.codec, self.merge_factor, self.spill_dir)
+
+    def close(self):
+        """删除排序段文件"""
+        self.lines = []
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def main():
+    """主函数：对文件按行做外部排序（与LC_ALL=C sort结果一致）"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="有界内存的外部归并排序")
+    parser.add_argument('input', help="输入文件")
+    parser.add_argument('output', help="输出文件")
+    parser.add_argument('-sortmb', type=int, default=None,
+                        help="排序缓冲区大小（MB），默认读取mapreduce.task.io.sort.mb")
+    parser.add_argument('-sortfactor', type=int, default=None,
+                        help="归并因子，默认读取mapreduce.task.io.sort.factor")
+    parser.add_argument('-compress', choices=['none'] + list(SPILL_CODECS), default=None,
+                        help="溢写文件压缩格式，默认读取mapreduce.map.output.compress")
+    args = parser.parse_args()
+
+    buffer_bytes = args.sortmb * 1024 * 1024 if args.sortmb is not None else None
+    with ExternalSorter(os.path.dirname(os.path.abspath(args.output)), buffer_bytes,
+                        args.sortfactor, args.compress) as sorter:
+        with open(args.input, 'rb') as f:
+            for lines in read_lines(f):
+                sorter.add_lines(lines)
+        with open(args.output, 'wb', buffering=IO_BUFFER_BYTES) as output:
+            write_lines(output, sorter.sorted_lines())
+        print(f"✅ 排序 {sorter.records} 行，溢写 {sorter.spills} 次，"
+              f"排序段共 {sorter.spilled_bytes} 字节")
+
+if __name__ == '__main__':
+    main()
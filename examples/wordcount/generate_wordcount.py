@@ -2,8 +2,21 @@
 """
 Python MapReduce 示例 - 词频统计
 用于Hadoop Streaming的mapper和reducer
+
+用法: python3 generate_wordcount.py [--variant simple|fast]
+    simple: 逐行处理的示例版本（默认）
+    fast:   高吞吐版本，mapper在内存中预聚合并批量写出，reducer流式分组并用堆选取前100个，
+            输出格式与simple版本相同
 """
 
+import argparse
+import os
+
+parser = argparse.ArgumentParser(description="生成Python MapReduce词频统计示例")
+parser.add_argument('--variant', choices=['simple', 'fast'], default='simple',
+                    help="mapper/reducer模板版本")
+args = parser.parse_args()
+
 # mapper.py
 mapper_code = '''#!/usr/bin/env python3
 import sys
@@ -15,7 +28,7 @@ for line in sys.stdin:
     line = line.strip().lower()
     
     # 使用正则表达式分割单词，只保留字母和数字
-    words = re.findall(r'\b[a-zA-Z]+\b', line)
+    words = re.findall(r'\\b[a-zA-Z]+\\b', line)
     
     # 输出每个单词和计数1
     for word in words:
@@ -51,6 +64,100 @@ for word, count in sorted_words[:100]:
     print(f"{word}\t{count}")
 '''
 
+# 高吞吐版本的mapper.py
+# 按块读取多行后一次匹配（单词不会跨行，结果与逐行处理相同），在内存中累计词频，
+# 批量写入sys.stdout.buffer；不同单词过多时先输出部分计数，由combiner/reducer继续合并
+fast_mapper_code = r'''#!/usr/bin/env python3
+import re
+import sys
+from collections import Counter
+
+# 只保留长度大于2的单词，与逐行版本的过滤规则相同
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+# 每次读取的字符数
+READ_SIZE = 1 << 20
+# 内存中保留的最大不同单词数
+MAX_WORDS = 100000
+
+def flush(counts, out):
+    out.write(''.join(f"{word}\t{count}\n" for word, count in counts.items()).encode('utf-8'))
+    counts.clear()
+
+counts = Counter()
+out = sys.stdout.buffer
+findall = WORD_PATTERN.findall
+
+for lines in iter(lambda: sys.stdin.readlines(READ_SIZE), []):
+    counts.update(findall(''.join(lines).lower()))
+    if len(counts) > MAX_WORDS:
+        flush(counts, out)
+
+flush(counts, out)
+'''
+
+# 高吞吐版本的reducer.py
+# 输入已按单词排序，用groupby流式求和，只用堆保留前100个，不在内存中保存全部单词
+fast_reducer_code = r'''#!/usr/bin/env python3
+import heapq
+import sys
+from itertools import groupby
+from operator import itemgetter
+
+def parse(stream):
+    for line in stream:
+        word, sep, count = line.strip().partition(b'\t')
+        if not sep:
+            # 跳过格式不正确的行
+            continue
+        try:
+            yield word, int(count)
+        except ValueError:
+            continue
+
+def word_counts(records):
+    for word, group in groupby(records, key=itemgetter(0)):
+        yield word, sum(count for _, count in group)
+
+# 与sorted(..., reverse=True)[:100]一致，计数相同时按单词顺序
+top_words = heapq.nlargest(100, word_counts(parse(sys.stdin.buffer)), key=itemgetter(1))
+sys.stdout.buffer.write(b''.join(b'%s\t%d\n' % (word, count) for word, count in top_words))
+'''
+
+if args.variant == 'fast':
+    mapper_code = fast_mapper_code
+    reducer_code = fast_reducer_code
+
+# combiner.py
+# 对已排序的输入按单词求和，不截取前100个，相当于Java版本中setCombinerClass(WordCountReducer.class)
+combiner_code = '''#!/usr/bin/env python3
+import sys
+
+current_word = None
+current_count = 0
+
+# 输入已按单词排序，相同单词相邻
+for line in sys.stdin:
+    line = line.strip()
+    
+    try:
+        word, count = line.split('\t', 1)
+        count = int(count)
+    except ValueError:
+        # 跳过格式不正确的行
+        continue
+    
+    if word == current_word:
+        current_count += count
+    else:
+        if current_word is not None:
+            print(f"{current_word}\t{current_count}")
+        current_word = word
+        current_count = count
+
+if current_word is not None:
+    print(f"{current_word}\t{current_count}")
+'''
+
 # 创建mapper文件
 with open('mapper.py', 'w', encoding='utf-8') as f:
     f.write(mapper_code)
@@ -59,16 +166,21 @@ with open('mapper.py', 'w', encoding='utf-8') as f:
 with open('reducer.py', 'w', encoding='utf-8') as f:
     f.write(reducer_code)
 
+# 创建combiner文件
+with open('combiner.py', 'w', encoding='utf-8') as f:
+    f.write(combiner_code)
+
 # 设置执行权限
-import os
 os.chmod('mapper.py', 0o755)
 os.chmod('reducer.py', 0o755)
+os.chmod('combiner.py', 0o755)
 
-print("✅ 已创建 mapper.py 和 reducer.py 文件")
+print(f"✅ 已创建 mapper.py、reducer.py 和 combiner.py 文件（{args.variant}版本）")
 print("📖 使用方法:")
-print("1. 将这两个文件复制到master容器中:")
+print("1. 将这些文件复制到master容器中:")
 print("   docker cp mapper.py hadoop-master:/tmp/")
 print("   docker cp reducer.py hadoop-master:/tmp/")
+print("   docker cp combiner.py hadoop-master:/tmp/")
 print("")
 print("2. 创建测试数据文件:")
 print("   echo 'Hello World Hello Hadoop This is a test file for word count' > input.txt")
@@ -80,8 +192,9 @@ print("   docker-compose exec master hdfs dfs -put /tmp/input.txt /wordcount/inp
 print("")
 print("4. 执行MapReduce作业:")
 print("   docker-compose exec master hadoop jar /opt/hadoop/share/hadoop/tools/lib/hadoop-streaming-3.3.6.jar \\")
-print("       -files /tmp/mapper.py,/tmp/reducer.py \\")
+print("       -files /tmp/mapper.py,/tmp/reducer.py,/tmp/combiner.py \\")
 print("       -mapper 'python3 /tmp/mapper.py' \\")
+print("       -combiner 'python3 /tmp/combiner.py' \\")
 print("       -reducer 'python3 /tmp/reducer.py' \\")
 print("       -input /wordcount/input \\")
 print("       -output /wordcount/output")
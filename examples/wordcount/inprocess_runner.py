@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+在当前进程中运行mapper/reducer脚本
+脚本只读取并编译一次（按路径、修改时间和大小缓存代码对象），每次运行在新的全局命名空间中执行，
+标准输入输出替换为可复用的内存字节缓冲区，不再为每个用例启动python3子进程，
+适合对大量边界用例或随机生成的用例做批量测试
+"""
+
+import builtins
+import io
+import os
+import sys
+import traceback
+
+# 已编译的脚本：绝对路径 -> ((修改时间, 大小), 代码对象)
+_code_cache = {}
+
+def load_script(script):
+    """
+    读取并编译脚本，文件未变化时直接返回缓存的代码对象
+    Args:
+        script: 脚本路径
+    Returns:
+        代码对象
+    """
+    path = os.path.abspath(script)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _code_cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        code = compile(f.read(), path, 'exec')
+    _code_cache[path] = (version, code)
+    return code
+
+class InProcessScript:
+    """
+    在当前进程中反复运行的Streaming脚本，输入输出缓冲区在多次运行之间复用
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.code = load_script(script)
+        self.stdin_bytes = io.BytesIO()
+        self.stdout_bytes = io.BytesIO()
+        # 与Linux上python3子进程的标准输入输出一致：只按'\n'分行，'\r'原样保留
+        self.stdin = io.TextIOWrapper(self.stdin_bytes, encoding='utf-8', newline='\n')
+        self.stdout = io.TextIOWrapper(self.stdout_bytes, encoding='utf-8', newline='\n')
+
+    def run(self, input_data):
+        """
+        以input_data作为标准输入运行脚本
+        Args:
+            input_data: 输入数据（str或bytes）
+        Returns:
+            标准输出（bytes）
+        Raises:
+            RuntimeError: 脚本抛出异常或以非0状态退出
+        """
+        if isinstance(input_data, str):
+            input_data = input_data.encode('utf-8')
+
+        # 复用缓冲区：清空上一次的内容，TextIOWrapper.seek同时重置解码器状态
+        self.stdin.seek(0)
+        self.stdin_bytes.seek(0)
+        self.stdin_bytes.truncate()
+        self.stdin_bytes.write(input_data)
+        self.stdin.seek(0)
+        self.stdout.seek(0)
+        self.stdout.truncate()
+
+        namespace = {'__name__': '__main__', '__file__': self.code.co_filename,
+                     '__builtins__': builtins}
+        saved = sys.stdin, sys.stdout, sys.argv
+        sys.stdin, sys.stdout, sys.argv = self.stdin, self.stdout, [self.script]
+        try:
+            exec(self.code, namespace)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise RuntimeError(f"{self.script} 执行失败: 退出状态 {e.code}") from None
+        except Exception:
+            raise RuntimeError(f"{self.script} 执行失败: {traceback.format_exc().strip()}") from None
+        finally:
+            sys.stdin, sys.stdout, sys.argv = saved
+            self.stdout.flush()
+        return self.stdout_bytes.getvalue()
+
+# 按脚本路径复用的运行器
+_runners = {}
+
+def script_runner(script):
+    """
+    获取脚本的运行器，脚本文件变化时重新编译
+    Args:
+        script: 脚本路径
+    Returns:
+        InProcessScript
+    """
+    runner = _runners.get(script)
+    if runner is None or runner.code is not load_script(script):
+        runner = _runners[script] = InProcessScript(script)
+    return runner
+
+def run_script(script, input_data):
+    """
+    在当前进程中运行脚本
+    Args:
+        script: 脚本路径
+        input_data: 输入数据（str或bytes）
+    Returns:
+        标准输出（bytes）
+    Raises:
+        RuntimeError: 脚本执行失败
+    """
+    return script_runner(script).run(input_data)
+
+def shuffle(map_output):
+    """
+    内存中的shuffle：丢弃空白行并按字节排序，与本地运行器的排序顺序一致
+    Args:
+        map_output: mapper输出（bytes）
+    Returns:
+        reducer输入（bytes）
+    """
+    lines = [line for line in map_output.split(b'\n') if line.strip()]
+    lines.sort()
+    return b''.join(line + b'\n' for line in lines)
+
+def run_pipeline(input_data, mapper_script, reducer_script):
+    """
+    在当前进程中运行mapper -> shuffle -> reducer，用于小输入的批量测试
+    Args:
+        input_data: 输入数据（str或bytes）
+        mapper_script: mapper脚本路径
+        reducer_script: reducer脚本路径
+    Returns:
+        (mapper输出, reducer输出)，均为bytes
+    Raises:
+        RuntimeError: mapper或reducer执行失败
+    """
+    map_output = run_script(mapper_script, input_data)
+    return map_output, run_script(reducer_script, shuffle(map_output))
@@ -0,0 +1,817 @@
+#!/usr/bin/env python3
+"""
+Hadoop Streaming 本地运行器
+mapper输出直接流入shuffle：在有界的排序缓冲区中累积，写满后排序并溢写到临时文件，
+最后多路归并所有排序段送入reducer的标准输入，全程不在内存中保存完整的中间结果，
+可以在提交Hadoop Streaming作业前用GB级输入在本地验证
+
+支持多个mapper/reducer并行执行：输入按行边界切分，mapper输出按Hadoop默认的HashPartitioner
+分区，每个reducer归并自己分区的排序段并输出part-0000N文件
+
+可选combiner：与Hadoop一样在每次溢写时对每个分区的有序数据运行，减少shuffle的记录数和字节数
+
+排序缓冲区大小、归并因子和溢写压缩与集群一致，默认读取conf/mapred-site.xml（见external_sort.py）
+
+可选分阶段性能剖析（-profile）：各阶段CPU时间、输入输出量、reduce输入的键分布，
+并可用cProfile记录mapper/reducer脚本的函数级耗时（见profiling.py）
+"""
+
+import argparse
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from external_sort import (IO_BUFFER_BYTES, RECORD_OVERHEAD_BYTES, SPILL_CODECS, merge_run_files,
+                           read_lines, run_suffix, sort_settings, write_lines, write_run)
+from profiling import KeyGroupStats, cpu_seconds, diagnose, merge_group_summaries
+
+# 分区缓存的最大键数，超过时清空
+PARTITION_CACHE_SIZE = 1 << 20
+
+def script_command(script, profile_file=None):
+    """
+    将脚本参数转换为命令：.py文件用python3运行，其余按命令行拆分（与-mapper 'python3 mapper.py'写法兼容）
+    Args:
+        script: 脚本路径或命令
+        profile_file: cProfile结果文件，只对.py文件生效
+    Returns:
+        命令参数列表
+    """
+    if script.endswith('.py') and os.path.isfile(script):
+        if profile_file is not None:
+            return ['python3', '-m', 'cProfile', '-o', profile_file, script]
+        return ['python3', script]
+    return shlex.split(script)
+
+def wait_process(process):
+    """
+    等待子进程结束
+    Returns:
+        (返回码, 子进程的CPU时间)
+    """
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, cpu_seconds(usage)
+
+def read_stderr(stderr_file):
+    """读取子进程的标准错误输出"""
+    stderr_file.seek(0)
+    return stderr_file.read().decode('utf-8', errors='replace').strip()
+
+def text_hash(key):
+    """
+    计算与Hadoop Text.hashCode()相同的哈希值（WritableComparator.hashBytes，字节按有符号数计算）
+    Args:
+        key: 键的UTF-8字节
+    Returns:
+        32位有符号整数
+    """
+    h = 1
+    for b in key:
+        h = (31 * h + (b - 256 if b > 127 else b)) & 0xFFFFFFFF
+    return h - (1 << 32) if h & 0x80000000 else h
+
+def hadoop_partition(key, num_partitions):
+    """
+    HashPartitioner: (key.hashCode() & Integer.MAX_VALUE) % numReduceTasks
+    Args:
+        key: 键的UTF-8字节（Streaming中为第一个制表符之前的部分）
+        num_partitions: reducer数量
+    Returns:
+        分区号
+    """
+    return (text_hash(key) & 0x7FFFFFFF) % num_partitions
+
+def map_output_key(line):
+    """Streaming默认以第一个制表符之前的部分作为键，没有制表符时整行为键"""
+    return line.split(b'\t', 1)[0]
+
+def compute_splits(input_file, num_splits):
+    """
+    按字节均分输入文件，切分点对齐到行首（与LineRecordReader跳过半行的效果一致）
+    Args:
+        input_file: 输入文件路径
+        num_splits: 切分数
+    Returns:
+        [(start, end)]，空切分被去掉
+    """
+    size = os.path.getsize(input_file)
+    boundaries = [0]
+    with open(input_file, 'rb') as f:
+        for i in range(1, num_splits):
+            position = size * i // num_splits
+            if position <= boundaries[-1]:
+                continue
+            f.seek(position - 1)
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def split_data(input_data, num_splits):
+    """
+    按行边界切分内存中的输入数据
+    Args:
+        input_data: 输入数据（bytes）
+        num_splits: 切分数
+    Returns:
+        切分后的bytes列表
+    """
+    boundaries = [0]
+    for i in range(1, num_splits):
+        position = len(input_data) * i // num_splits
+        if position <= boundaries[-1]:
+            continue
+        newline = input_data.find(b'\n', position - 1)
+        boundaries.append(len(input_data) if newline < 0 else newline + 1)
+    boundaries.append(len(input_data))
+    return [input_data[start:end] for start, end in zip(boundaries, boundaries[1:])
+            if end > start] or [b'']
+
+def feed_input(pipe, input_data=None, input_file=None, start=0, end=0):
+    """
+    在后台线程中将输入数据或文件的一个字节区间写入子进程，避免与读取输出互相阻塞
+    """
+    try:
+        if input_file is None:
+            pipe.write(input_data)
+        else:
+            with open(input_file, 'rb') as f:
+                f.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    block = f.read(min(IO_BUFFER_BYTES, remaining))
+                    if not block:
+                        break
+                    pipe.write(block)
+                    remaining -= len(block)
+    except BrokenPipeError:
+        # 子进程提前退出，错误由返回码报告
+        pass
+    finally:
+        try:
+            pipe.close()
+        except BrokenPipeError:
+            pass
+
+def run_combiner(combiner_script, lines):
+    """
+    对一个分区的有序数据运行combiner
+    Args:
+        combiner_script: combiner脚本路径或命令
+        lines: 有序行列表（不含换行符）
+    Returns:
+        output: combiner输出行列表（不含换行符），空白行被丢弃
+        cpu_time: combiner进程的CPU时间
+    Raises:
+        RuntimeError: combiner执行失败
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(script_command(combiner_script), stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=stderr,
+                                   bufsize=IO_BUFFER_BYTES)
+        feeder = threading.Thread(target=feed_lines, args=(process.stdin, lines))
+        feeder.start()
+        output = []
+        for block in read_lines(process.stdout):
+            output.extend(filter(bytes.strip, block))
+        process.stdout.close()
+        returncode, cpu_time = wait_process(process)
+        feeder.join()
+
+        if returncode != 0:
+            raise RuntimeError(f"Combiner执行失败: {read_stderr(stderr)}")
+    return output, cpu_time
+
+class SortBuffer:
+    """
+    shuffle排序缓冲区：按内存占用累积mapper输出行（不含换行符）并按键分区，
+    超过上限时各分区分别排序（可选经过combiner），溢写为一组临时排序段文件（可选压缩）
+    """
+
+    def __init__(self, spill_dir, name, num_partitions=1, buffer_bytes=None,
+                 combiner_script=None, codec=None):
+        self.spill_dir = spill_dir
+        self.name = name
+        self.num_partitions = num_partitions
+        self.buffer_bytes, _, self.codec = sort_settings(buffer_bytes, codec=codec or 'none')
+        self.combiner_script = combiner_script
+        self.partitions = [[] for _ in range(num_partitions)]
+        self.partition_cache = {}
+        self.size = 0
+        self.spills = 0
+        self.runs = [[] for _ in range(num_partitions)]
+        self.partition_records = [0] * num_partitions
+        self.records = 0
+        self.bytes = 0
+        self.combine_input_records = 0
+        self.combine_input_bytes = 0
+        self.spilled_records = 0
+        self.spilled_bytes = 0
+        self.spill_file_bytes = 0
+        self.combine_cpu_time = 0.0
+
+    def partition_of(self, key):
+        """计算键的分区号，按键缓存"""
+        partition = self.partition_cache.get(key)
+        if partition is None:
+            if len(self.partition_cache) >= PARTITION_CACHE_SIZE:
+                self.partition_cache.clear()
+            partition = hadoop_partition(key, self.num_partitions)
+            self.partition_cache[key] = partition
+        return partition
+
+    def add_lines(self, lines):
+        """添加一批mapper输出行，空白行被丢弃"""
+        lines = list(filter(bytes.strip, lines))
+        data_bytes = sum(map(len, lines))
+        if self.num_partitions == 1:
+            self.partitions[0].extend(lines)
+        else:
+            partitions = self.partitions
+            partition_of = self.partition_of
+            for line in lines:
+                partitions[partition_of(map_output_key(line))].append(line)
+        self.size += data_bytes + len(lines) * RECORD_OVERHEAD_BYTES
+        self.records += len(lines)
+        self.bytes += data_bytes + len(lines)
+        if self.size >= self.buffer_bytes:
+            self.spill()
+
+    def spill(self):
+        """各分区排序（并经过combiner）后写入临时文件"""
+        if not self.size:
+            return
+        for partition, lines in enumerate(self.partitions):
+            if not lines:
+                continue
+            lines.sort()
+            if self.combiner_script is not None:
+                self.combine_input_records += len(lines)
+                self.combine_input_bytes += sum(map(len, lines)) + len(lines)
+                # combiner的输出顺序不受约束，重新排序以保证排序段有序
+                lines, cpu_time = run_combiner(self.combiner_script, lines)
+                self.combine_cpu_time += cpu_time
+                lines.sort()
+            path = os.path.join(self.spill_dir,
+                                f"{self.name}-spill{self.spills}-part{partition:05d}"
+                                f"{run_suffix(self.codec)}")
+            self.spill_file_bytes += write_run(path, lines, self.codec)
+            self.runs[partition].append(path)
+            self.partition_records[partition] += len(lines)
+            self.spilled_records += len(lines)
+            self.spilled_bytes += sum(map(len, lines)) + len(lines)
+        self.partitions = [[] for _ in range(self.num_partitions)]
+        self.size = 0
+        self.spills += 1
+
+def feed_lines(pipe, lines):
+    """在后台线程中将行写入子进程并关闭管道"""
+    try:
+        write_lines(pipe, lines)
+    except BrokenPipeError:
+        # 子进程提前退出，错误由返回码报告
+        pass
+    finally:
+        try:
+            pipe.close()
+        except BrokenPipeError:
+            pass
+
+def count_input_records(input_data=None, input_file=None, start=0, end=None):
+    """
+    统计输入切分中的行数
+    Args:
+        input_data: 输入数据（bytes），未指定input_file时使用
+        input_file: 输入文件路径
+        start, end: 输入切分的字节区间，end为None时读到文件末尾
+    Returns:
+        (字节数, 行数)
+    """
+    if input_file is None:
+        data = input_data or b''
+        return len(data), data.count(b'\n') + (not data.endswith(b'\n') and len(data) > 0)
+
+    if end is None:
+        end = os.path.getsize(input_file)
+    count = 0
+    last = b'\n'
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(IO_BUFFER_BYTES, remaining))
+            if not block:
+                break
+            count += block.count(b'\n')
+            last = block[-1:]
+            remaining -= len(block)
+    return end - start, count + (last != b'\n')
+
+def count_lines(f):
+    """统计文件对象中的行数（从头读取）"""
+    f.seek(0)
+    count = 0
+    last = b'\n'
+    while True:
+        block = f.read(IO_BUFFER_BYTES)
+        if not block:
+            break
+        count += block.count(b'\n')
+        last = block[-1:]
+    return count + (last != b'\n')
+
+def run_map_task(task_id, mapper_script, spill_dir, num_partitions=1, sort_buffer_bytes=None,
+                 input_file=None, start=0, end=None, input_data=None, combiner_script=None,
+                 spill_codec=None, profile=False, profile_file=None):
+    """
+    运行一个map任务：mapper处理一个输入切分，输出分区、排序并溢写
+    Args:
+        task_id: 任务编号
+        mapper_script: mapper脚本路径或命令
+        spill_dir: 溢写文件目录
+        num_partitions: 分区数（reducer数量）
+        sort_buffer_bytes: 排序缓冲区大小，为None时读取mapreduce.task.io.sort.mb
+        input_file: 输入文件路径
+        start, end: 输入切分的字节区间，end为None时读到文件末尾
+        input_data: 输入数据（bytes），未指定input_file时使用
+        combiner_script: combiner脚本路径或命令，为None时不使用combiner
+        spill_codec: 溢写文件压缩格式，为None时不压缩
+        profile: 是否统计输入字节数和行数
+        profile_file: mapper的cProfile结果文件
+    Returns:
+        任务统计，runs为每个分区的排序段文件路径列表；cpu_time为mapper进程的CPU时间，
+        sort_cpu_time为本进程读取、分区、排序和溢写的CPU时间
+    Raises:
+        RuntimeError: mapper或combiner执行失败
+    """
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    sort_buffer = SortBuffer(spill_dir, f"map{task_id:05d}", num_partitions, sort_buffer_bytes,
+                             combiner_script, spill_codec)
+
+    # 整个文件作为一个切分时直接作为标准输入，否则由后台线程写入
+    whole_file = input_file is not None and start == 0 and end is None
+    stdin = open(input_file, 'rb') if whole_file else subprocess.PIPE
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(script_command(mapper_script, profile_file), stdin=stdin,
+                                       stdout=subprocess.PIPE, stderr=stderr,
+                                       bufsize=IO_BUFFER_BYTES)
+        finally:
+            if whole_file:
+                stdin.close()
+
+        feeder = None
+        if not whole_file:
+            feeder = threading.Thread(target=feed_input,
+                                      args=(process.stdin, input_data or b'', input_file,
+                                            start, end))
+            feeder.start()
+
+        try:
+            for lines in read_lines(process.stdout):
+                sort_buffer.add_lines(lines)
+        except BaseException:
+            # 溢写时combiner失败等：先结束mapper并回收输入线程，否则输入线程一直阻塞在写入上
+            process.kill()
+            process.stdout.close()
+            if feeder is not None:
+                feeder.join()
+            elif process.stdin is not None:
+                process.stdin.close()
+            wait_process(process)
+            raise
+        process.stdout.close()
+        returncode, cpu_time = wait_process(process)
+        if feeder is not None:
+            feeder.join()
+
+        if returncode != 0:
+            raise RuntimeError(f"Mapper执行失败: {read_stderr(stderr)}")
+
+    # 与Hadoop一样，map输出最终全部落盘，供reduce任务读取
+    sort_buffer.spill()
+    stats = {
+        'task': task_id,
+        'time': time.perf_counter() - start_time,
+        'cpu_time': cpu_time,
+        'sort_cpu_time': time.process_time() - start_cpu,
+        'combine_cpu_time': sort_buffer.combine_cpu_time,
+        'output_records': sort_buffer.records,
+        'output_bytes': sort_buffer.bytes,
+        'spills': sort_buffer.spills,
+        'combine_input_records': sort_buffer.combine_input_records,
+        'combine_input_bytes': sort_buffer.combine_input_bytes,
+        'spilled_records': sort_buffer.spilled_records,
+        'spilled_bytes': sort_buffer.spilled_bytes,
+        'spill_file_bytes': sort_buffer.spill_file_bytes,
+        'partition_records': sort_buffer.partition_records,
+        'runs': sort_buffer.runs,
+    }
+    if profile:
+        stats['input_bytes'], stats['input_records'] = count_input_records(input_data, input_file,
+                                                                           start, end)
+    return stats
+
+def run_reduce_task(partition, reducer_script, run_paths, output_file, spill_codec=None,
+                    merge_factor=None, profile=False, profile_file=None):
+    """
+    运行一个reduce任务：归并本分区的所有排序段，送入reducer，输出写入part文件
+    排序段数超过归并因子时先分轮归并，内存和同时打开的文件数与输入大小无关
+    Args:
+        partition: 分区号
+        reducer_script: reducer脚本路径或命令
+        run_paths: 本分区的排序段文件路径列表
+        output_file: 输出文件路径
+        spill_codec: 排序段压缩格式，为None时不压缩
+        merge_factor: 一轮归并最多同时打开的排序段数，为None时读取mapreduce.task.io.sort.factor
+        profile: 是否统计reducer输入的键分布
+        profile_file: reducer的cProfile结果文件
+    Returns:
+        任务统计，cpu_time为reducer进程的CPU时间，merge_cpu_time为本进程归并的CPU时间，
+        profile为True时key_groups为KeyGroupStats.summary()
+    Raises:
+        RuntimeError: reducer执行失败
+    """
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    _, merge_factor, _ = sort_settings(merge_factor=merge_factor, codec='none')
+    merged = merge_run_files(run_paths, spill_codec, merge_factor)
+    group_stats = KeyGroupStats() if profile else None
+    lines = group_stats.observe(merged) if profile else merged
+    try:
+        with open(output_file, 'w+b') as output, tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(script_command(reducer_script, profile_file),
+                                       stdin=subprocess.PIPE, stdout=output, stderr=stderr,
+                                       bufsize=IO_BUFFER_BYTES)
+            try:
+                write_lines(process.stdin, lines)
+                process.stdin.close()
+            except BrokenPipeError:
+                # reducer提前退出，错误由返回码报告
+                pass
+            returncode, cpu_time = wait_process(process)
+
+            if returncode != 0:
+                raise RuntimeError(f"Reducer执行失败: {read_stderr(stderr)}")
+
+            stats = {
+                'task': partition,
+                'time': time.perf_counter() - start_time,
+                'cpu_time': cpu_time,
+                'merge_cpu_time': time.process_time() - start_cpu,
+                'output_records': count_lines(output),
+                'output_bytes': output.tell(),
+            }
+            if group_stats is not None:
+                stats['key_groups'] = group_stats.summary()
+            return stats
+    finally:
+        merged.close()
+
+def run_tasks(func, task_args, num_workers):
+    """
+    执行一组任务：多个任务时使用进程池并行执行，否则在当前进程中执行
+    Args:
+        func: 任务函数
+        task_args: 每个任务的参数元组列表
+        num_workers: 最大并行数
+    Returns:
+        按任务顺序排列的结果列表
+    """
+    if num_workers <= 1 or len(task_args) <= 1:
+        return [func(*args) for args in task_args]
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(task_args))) as executor:
+        futures = [executor.submit(func, *args) for args in task_args]
+        return [future.result() for future in futures]
+
+def run_streaming_job(mapper_script, reducer_script, input_file=None, input_data=None,
+                      output_dir=None, num_mappers=1, num_reducers=1, sort_buffer_bytes=None,
+                      tmp_dir=None, combiner_script=None, spill_codec=None, merge_factor=None,
+                      profile=False, profile_dir=None):
+    """
+    在本地运行一个Hadoop Streaming作业：mapper -> 分区/排序/combiner/溢写/归并 -> reducer
+    Args:
+        mapper_script: mapper脚本路径或命令
+        reducer_script: reducer脚本路径或命令
+        input_file: 输入文件路径
+        input_data: 输入数据（str或bytes），未指定input_file时使用
+        output_dir: 输出目录（part-00000...），为None时返回按分区顺序拼接的reducer输出文本
+        num_mappers: mapper数量（输入切分数）
+        num_reducers: reducer数量（分区数）
+        sort_buffer_bytes: 每个mapper的排序缓冲区大小，为None时读取mapreduce.task.io.sort.mb
+        tmp_dir: 溢写文件目录
+        combiner_script: combiner脚本路径或命令，为None时不使用combiner
+        spill_codec: 溢写文件压缩格式（gzip/bz2/lzma，'none'不压缩），为None时读取
+                     mapreduce.map.output.compress
+        merge_factor: reduce端一轮归并最多同时打开的排序段数，为None时读取mapreduce.task.io.sort.factor
+        profile: 是否进行分阶段性能剖析，结果见stats['profile']（stage_profile）
+        profile_dir: 保存mapper/reducer的cProfile结果（map-0000N.prof、reduce-0000N.prof）的目录，
+                     只对.py脚本生效，为None时不做cProfile
+    Returns:
+        output: reducer输出文本（指定output_dir时为None）
+        stats: 运行统计，shuffle_records/shuffle_bytes为实际溢写（进入shuffle）的数据量，
+               spill_file_bytes为溢写文件在磁盘上（压缩后）的字节数
+    Raises:
+        RuntimeError: mapper、combiner或reducer执行失败
+        ValueError: 压缩格式不支持
+    """
+    if isinstance(input_data, str):
+        input_data = input_data.encode('utf-8')
+    sort_buffer_bytes, merge_factor, spill_codec = sort_settings(sort_buffer_bytes, merge_factor,
+                                                                 spill_codec)
+
+    job_start = time.perf_counter()
+    job_dir = tempfile.mkdtemp(prefix='local-streaming-', dir=tmp_dir)
+    try:
+        spill_dir = os.path.join(job_dir, 'spills')
+        os.makedirs(spill_dir)
+        part_dir = output_dir if output_dir is not None else os.path.join(job_dir, 'output')
+        os.makedirs(part_dir, exist_ok=True)
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+
+        def profile_file(name):
+            return os.path.join(profile_dir, f"{name}.prof") if profile_dir is not None else None
+
+        # map阶段
+        if input_file is not None:
+            if num_mappers == 1:
+                splits = [(input_file, 0, None, None)]
+            else:
+                splits = [(input_file, start, end, None)
+                          for start, end in compute_splits(input_file, num_mappers)]
+            if not splits:
+                splits = [(input_file, 0, None, None)]
+        else:
+            splits = [(None, 0, None, data) for data in split_data(input_data or b'', num_mappers)]
+
+        start_time = time.perf_counter()
+        map_tasks = run_tasks(run_map_task,
+                              [(i, mapper_script, spill_dir, num_reducers, sort_buffer_bytes)
+                               + split + (combiner_script, spill_codec, profile,
+                                          profile_file(f"map-{i:05d}"))
+                               for i, split in enumerate(splits)],
+                              num_mappers)
+        map_time = time.perf_counter() - start_time
+
+        # reduce阶段：每个分区汇总所有map任务的排序段
+        start_time = time.perf_counter()
+        part_files = [os.path.join(part_dir, f"part-{partition:05d}")
+                      for partition in range(num_reducers)]
+        reduce_tasks = run_tasks(run_reduce_task,
+                                 [(partition, reducer_script,
+                                   [path for task in map_tasks for path in task['runs'][partition]],
+                                   part_files[partition], spill_codec, merge_factor, profile,
+                                   profile_file(f"reduce-{partition:05d}"))
+                                  for partition in range(num_reducers)],
+                                 num_reducers)
+        reduce_time = time.perf_counter() - start_time
+
+        if output_dir is not None:
+            open(os.path.join(output_dir, '_SUCCESS'), 'w').close()
+            output = None
+        else:
+            parts = []
+            for path in part_files:
+                with open(path, 'r', encoding='utf-8') as f:
+                    parts.append(f.read())
+            output = ''.join(parts)
+
+        for task in map_tasks:
+            del task['runs']
+        stats = {
+            'num_mappers': len(map_tasks),
+            'num_reducers': num_reducers,
+            'map_time': map_time,
+            'map_output_records': sum(task['output_records'] for task in map_tasks),
+            'map_output_bytes': sum(task['output_bytes'] for task in map_tasks),
+            'spills': sum(task['spills'] for task in map_tasks),
+            'combine_input_records': sum(task['combine_input_records'] for task in map_tasks),
+            'combine_input_bytes': sum(task['combine_input_bytes'] for task in map_tasks),
+            'shuffle_records': sum(task['spilled_records'] for task in map_tasks),
+            'shuffle_bytes': sum(task['spilled_bytes'] for task in map_tasks),
+            'spill_file_bytes': sum(task['spill_file_bytes'] for task in map_tasks),
+            'sort_buffer_bytes': sort_buffer_bytes,
+            'merge_factor': merge_factor,
+            'spill_codec': spill_codec,
+            'partition_records': [sum(task['partition_records'][p] for task in map_tasks)
+                                  for p in range(num_reducers)],
+            'reduce_time': reduce_time,
+            'reduce_output_records': sum(task['output_records'] for task in reduce_tasks),
+            'total_time': time.perf_counter() - job_start,
+            'map_tasks': map_tasks,
+            'reduce_tasks': reduce_tasks,
+        }
+        if profile:
+            stats['profile'] = stage_profile(stats)
+            if profile_dir is not None:
+                stats['profile']['cprofile_files'] = sorted(
+                    os.path.join(profile_dir, name) for name in os.listdir(profile_dir)
+                    if name.endswith('.prof'))
+        return output, stats
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+def stage_profile(stats):
+    """
+    由run_streaming_job的统计汇总各阶段的剖析结果
+    map阶段为mapper进程，shuffle阶段为本地运行器的读取、分区、排序、combiner、溢写和归并，
+    reduce阶段为reducer进程；map和shuffle在同一任务中流水执行，shuffle没有单独的墙钟时间
+    Args:
+        stats: run_streaming_job(profile=True)的统计
+    Returns:
+        {'map': {...}, 'shuffle': {...}, 'reduce': {...}, 'bottleneck', 'reducer_skew', 'skewed'}
+    """
+    map_tasks = stats['map_tasks']
+    reduce_tasks = stats['reduce_tasks']
+    profile = {
+        'map': {
+            'wall_time': stats['map_time'],
+            'cpu_time': sum(task['cpu_time'] for task in map_tasks),
+            'input_bytes': sum(task['input_bytes'] for task in map_tasks),
+            'input_records': sum(task['input_records'] for task in map_tasks),
+            'output_bytes': stats['map_output_bytes'],
+            'output_records': stats['map_output_records'],
+        },
+        'shuffle': {
+            'cpu_time': sum(task['sort_cpu_time'] + task['combine_cpu_time'] for task in map_tasks)
+                        + sum(task['merge_cpu_time'] for task in reduce_tasks),
+            'input_bytes': stats['map_output_bytes'],
+            'input_records': stats['map_output_records'],
+            'output_bytes': stats['shuffle_bytes'],
+            'output_records': stats['shuffle_records'],
+            'spills': stats['spills'],
+            'spill_file_bytes': stats['spill_file_bytes'],
+            'partition_records': stats['partition_records'],
+        },
+        'reduce': {
+            'wall_time': stats['reduce_time'],
+            'cpu_time': sum(task['cpu_time'] for task in reduce_tasks),
+            'output_bytes': sum(task['output_bytes'] for task in reduce_tasks),
+            'output_records': stats['reduce_output_records'],
+        },
+    }
+    key_groups = merge_group_summaries([task['key_groups'] for task in reduce_tasks])
+    profile['reduce']['input_bytes'] = key_groups.pop('bytes')
+    profile['reduce']['input_records'] = key_groups.pop('records')
+    profile['reduce'].update(key_groups)
+    profile.update(diagnose(profile))
+    return profile
+
+def profile_summary(profile):
+    """
+    分阶段剖析结果的说明文字
+    Args:
+        profile: stage_profile的返回值
+    Returns:
+        多行说明文字
+    """
+    lines = []
+    for stage in ('map', 'shuffle', 'reduce'):
+        data = profile[stage]
+        wall = f"{data['wall_time']:.3f}s, " if 'wall_time' in data else ''
+        lines.append(f"{stage:<8} {wall}CPU {data['cpu_time']:.3f}s, "
+                     f"{data['input_records']} 条/{data['input_bytes']} 字节 -> "
+                     f"{data['output_records']} 条/{data['output_bytes']} 字节")
+    reduce = profile['reduce']
+    largest = ', '.join(f"{group['key']}({group['records']})" for group in reduce['largest_groups'][:5])
+    lines.append(f"不同键数 {reduce['distinct_keys']}，分组大小分布 {reduce['group_size_histogram']}")
+    lines.append(f"最大分组: {largest}")
+    lines.append(f"瓶颈: {profile['bottleneck']}，reducer倾斜 {profile['reducer_skew']:.2f}x"
+                 + ("（倾斜）" if profile['skewed'] else ""))
+    return '\n'.join(lines)
+
+def combiner_summary(stats):
+    """
+    combiner缩减效果的说明文字
+    Args:
+        stats: run_streaming_job返回的统计
+    Returns:
+        说明文字，未使用combiner时为None
+    """
+    if not stats['combine_input_records']:
+        return None
+    records_ratio = stats['shuffle_records'] / stats['combine_input_records']
+    bytes_ratio = stats['shuffle_bytes'] / max(stats['combine_input_bytes'], 1)
+    return (f"Combiner: {stats['combine_input_records']} -> {stats['shuffle_records']} 条记录"
+            f"（{records_ratio:.1%}），{stats['combine_input_bytes']} -> {stats['shuffle_bytes']} 字节"
+            f"（{bytes_ratio:.1%}）")
+
+def measure_speedup(mapper_script, reducer_script, input_file, num_mappers, num_reducers,
+                    sort_buffer_bytes=None, combiner_script=None, spill_codec=None):
+    """
+    对比单mapper单reducer、多mapper单reducer、多mapper多reducer的运行时间
+    Args:
+        mapper_script: mapper脚本路径或命令
+        reducer_script: reducer脚本路径或命令
+        input_file: 输入文件路径
+        num_mappers: mapper数量
+        num_reducers: reducer数量
+        sort_buffer_bytes: 每个mapper的排序缓冲区大小
+        combiner_script: combiner脚本路径或命令
+        spill_codec: 溢写文件压缩格式
+    Returns:
+        [{'mappers', 'reducers', 'map_time', 'reduce_time', 'total_time', 'speedup'}]
+    """
+    configs = []
+    for config in ((1, 1), (num_mappers, 1), (num_mappers, num_reducers)):
+        if config not in configs:
+            configs.append(config)
+
+    results = []
+    for mappers, reducers in configs:
+        with tempfile.TemporaryDirectory() as output_dir:
+            _, stats = run_streaming_job(mapper_script, reducer_script, input_file=input_file,
+                                         output_dir=output_dir, num_mappers=mappers,
+                                         num_reducers=reducers,
+                                         sort_buffer_bytes=sort_buffer_bytes,
+                                         combiner_script=combiner_script,
+                                         spill_codec=spill_codec)
+        results.append({
+            'mappers': mappers,
+            'reducers': reducers,
+            'map_time': stats['map_time'],
+            'reduce_time': stats['reduce_time'],
+            'total_time': stats['total_time'],
+            'speedup': results[0]['total_time'] / stats['total_time'] if results else 1.0,
+        })
+    return results
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="本地运行Hadoop Streaming作业")
+    parser.add_argument('-input', required=True, help="输入文件")
+    parser.add_argument('-output', required=True, help="输出目录（part-00000...）")
+    parser.add_argument('-mapper', default='mapper.py', help="mapper脚本或命令")
+    parser.add_argument('-reducer', default='reducer.py', help="reducer脚本或命令")
+    parser.add_argument('-combiner', default=None, help="combiner脚本或命令（可选）")
+    parser.add_argument('-numMapTasks', type=int, default=1, help="mapper数量")
+    parser.add_argument('-numReduceTasks', type=int, default=1, help="reducer数量")
+    parser.add_argument('-sortmb', type=int, default=None,
+                        help="每个mapper的排序缓冲区大小（MB），默认读取mapreduce.task.io.sort.mb")
+    parser.add_argument('-sortfactor', type=int, default=None,
+                        help="reduce端归并因子，默认读取mapreduce.task.io.sort.factor")
+    parser.add_argument('-compress', choices=['none'] + list(SPILL_CODECS), default=None,
+                        help="溢写文件压缩格式，默认读取mapreduce.map.output.compress")
+    parser.add_argument('-speedup', action='store_true',
+                        help="对比1x1、Nx1、NxR配置的运行时间")
+    parser.add_argument('-profile', action='store_true', help="分阶段性能剖析")
+    parser.add_argument('-cprofile', default=None, metavar='DIR',
+                        help="用cProfile记录mapper/reducer脚本，结果保存到该目录（隐含-profile）")
+    args = parser.parse_args()
+    sort_buffer_bytes = args.sortmb * 1024 * 1024 if args.sortmb is not None else None
+
+    try:
+        if args.speedup:
+            results = measure_speedup(args.mapper, args.reducer, args.input,
+                                      args.numMapTasks, args.numReduceTasks, sort_buffer_bytes,
+                                      args.combiner, args.compress)
+            print(f"{'mappers':>8} {'reducers':>8} {'map':>9} {'reduce':>9} {'total':>9} {'speedup':>8}")
+            for r in results:
+                print(f"{r['mappers']:>8} {r['reducers']:>8} {r['map_time']:>8.3f}s "
+                      f"{r['reduce_time']:>8.3f}s {r['total_time']:>8.3f}s {r['speedup']:>7.2f}x")
+            return True
+
+        _, stats = run_streaming_job(args.mapper, args.reducer, input_file=args.input,
+                                     output_dir=args.output, num_mappers=args.numMapTasks,
+                                     num_reducers=args.numReduceTasks,
+                                     sort_buffer_bytes=sort_buffer_bytes,
+                                     combiner_script=args.combiner,
+                                     spill_codec=args.compress,
+                                     merge_factor=args.sortfactor,
+                                     profile=args.profile or args.cprofile is not None,
+                                     profile_dir=args.cprofile)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return False
+
+    print(f"✅ Map: {stats['map_time']:.3f}s, {stats['num_mappers']} 个mapper, "
+          f"{stats['map_output_records']} 行输出, 溢写 {stats['spills']} 次"
+          f"（排序缓冲区 {stats['sort_buffer_bytes'] // (1024 * 1024)}MB）")
+    if stats['spill_codec']:
+        print(f"   溢写压缩({stats['spill_codec']}): {stats['shuffle_bytes']} -> "
+              f"{stats['spill_file_bytes']} 字节")
+    summary = combiner_summary(stats)
+    if summary:
+        print(f"   {summary}")
+    print(f"   分区记录数: {stats['partition_records']}")
+    print(f"✅ Reduce: {stats['reduce_time']:.3f}s, {stats['num_reducers']} 个reducer, "
+          f"{stats['reduce_output_records']} 行输出")
+    if 'profile' in stats:
+        print(profile_summary(stats['profile']))
+        for path in stats['profile'].get('cprofile_files', []):
+            print(f"cProfile结果: {path}")
+    print(f"结果已保存到: {args.output}")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
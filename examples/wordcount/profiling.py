@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+本地MapReduce分阶段性能剖析
+统计每个阶段的墙钟时间、CPU时间、输入输出字节数和记录数，以及reduce输入的键分布
+（不同键数、分组大小分布、最大的分组），用于在提交到集群前判断作业的瓶颈是map CPU、
+shuffle数据量还是reducer倾斜
+"""
+
+import cProfile
+import heapq
+import time
+from itertools import groupby
+
+# 记录的最大分组数
+TOP_GROUPS = 10
+# 最大分区记录数超过平均值的倍数时认为reducer倾斜
+SKEW_THRESHOLD = 2.0
+
+def cpu_seconds(usage):
+    """rusage中的用户态和内核态CPU时间之和（秒）"""
+    return usage.ru_utime + usage.ru_stime
+
+def record_key(line):
+    """Streaming默认以第一个制表符之前的部分作为键"""
+    return line.split(b'\t', 1)[0]
+
+def group_size_bucket(size):
+    """分组大小所在的2的幂区间，如 1、2-3、4-7"""
+    low = 1 << (size.bit_length() - 1)
+    high = (low << 1) - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+class KeyGroupStats:
+    """
+    统计有序记录流按键分组的情况：记录数、字节数、不同键数、分组大小分布和最大的分组
+    """
+
+    def __init__(self, top_groups=TOP_GROUPS):
+        self.top_groups = top_groups
+        self.records = 0
+        self.bytes = 0
+        self.distinct_keys = 0
+        self.histogram = {}
+        # (分组大小, 键)的小顶堆，保留最大的top_groups个分组
+        self.largest = []
+
+    def observe(self, lines):
+        """
+        透传有序行（不含换行符），同时统计分组
+        Args:
+            lines: 按键有序的行迭代器
+        Yields:
+            原样输出的行
+        """
+        for key, group in groupby(lines, key=record_key):
+            size = 0
+            for line in group:
+                size += 1
+                self.bytes += len(line) + 1
+                yield line
+            self.records += size
+            self.distinct_keys += 1
+            bucket = group_size_bucket(size)
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+            if len(self.largest) < self.top_groups:
+                heapq.heappush(self.largest, (size, key))
+            elif size > self.largest[0][0]:
+                heapq.heapreplace(self.largest, (size, key))
+
+    def summary(self):
+        """
+        Returns:
+            可序列化为JSON的统计字典
+        """
+        return {
+            'records': self.records,
+            'bytes': self.bytes,
+            'distinct_keys': self.distinct_keys,
+            'group_size_histogram': dict(sorted(self.histogram.items(),
+                                                key=lambda item: int(item[0].split('-')[0]))),
+            'largest_groups': [{'key': key.decode('utf-8', errors='replace'), 'records': size}
+                               for size, key in sorted(self.largest, reverse=True)],
+        }
+
+def key_group_summary(lines, top_groups=TOP_GROUPS):
+    """
+    统计一组无序行的键分布（先排序）
+    Args:
+        lines: 行列表（bytes，不含换行符），空白行被忽略
+        top_groups: 记录的最大分组数
+    Returns:
+        KeyGroupStats.summary()
+    """
+    stats = KeyGroupStats(top_groups)
+    for _ in stats.observe(sorted(line for line in lines if line.strip())):
+        pass
+    return stats.summary()
+
+def merge_group_summaries(summaries, top_groups=TOP_GROUPS):
+    """
+    合并多个reducer的键分布统计（各分区的键互不相交）
+    Args:
+        summaries: KeyGroupStats.summary()列表
+        top_groups: 记录的最大分组数
+    Returns:
+        合并后的统计字典
+    """
+    histogram = {}
+    for summary in summaries:
+        for bucket, count in summary['group_size_histogram'].items():
+            histogram[bucket] = histogram.get(bucket, 0) + count
+    largest = heapq.nlargest(top_groups,
+                             (group for summary in summaries for group in summary['largest_groups']),
+                             key=lambda group: group['records'])
+    return {
+        'records': sum(summary['records'] for summary in summaries),
+        'bytes': sum(summary['bytes'] for summary in summaries),
+        'distinct_keys': sum(summary['distinct_keys'] for summary in summaries),
+        'group_size_histogram': dict(sorted(histogram.items(),
+                                            key=lambda item: int(item[0].split('-')[0]))),
+        'largest_groups': largest,
+    }
+
+def profile_call(func, *args, profile_file=None):
+    """
+    运行函数并记录墙钟时间和CPU时间
+    Args:
+        func: 函数
+        args: 参数
+        profile_file: cProfile结果文件，为None时不做cProfile
+    Returns:
+        (返回值, {'wall_time', 'cpu_time'})
+    """
+    profiler = cProfile.Profile() if profile_file is not None else None
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+    return result, {'wall_time': time.perf_counter() - start_time,
+                    'cpu_time': time.process_time() - start_cpu}
+
+def diagnose(profile):
+    """
+    根据各阶段的CPU时间和分区记录数判断瓶颈
+    Args:
+        profile: 包含map、shuffle、reduce三个阶段统计的字典
+    Returns:
+        {'bottleneck': CPU时间最多的阶段, 'reducer_skew': 最大分区记录数 / 平均分区记录数,
+         'skewed': 是否超过SKEW_THRESHOLD}
+    """
+    bottleneck = max(('map', 'shuffle', 'reduce'), key=lambda stage: profile[stage]['cpu_time'])
+    partition_records = profile['shuffle'].get('partition_records') or [0]
+    mean = sum(partition_records) / len(partition_records)
+    skew = max(partition_records) / mean if mean else 1.0
+    return {
+        'bottleneck': bottleneck,
+        'reducer_skew': round(skew, 3),
+        'skewed': len(partition_records) > 1 and skew > SKEW_THRESHOLD,
+    }
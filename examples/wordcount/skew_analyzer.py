@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+键倾斜分析与加盐建议
+从输入中均匀抽取若干段样本运行mapper，对mapper输出：
+1. 用Space-Saving草图在固定内存内找出高频键（计数上界和误差界）
+2. 按Hadoop HashPartitioner精确统计样本在各reducer上的负载，按抽样比例放大得到预测负载
+3. 某个分区的负载超过平均值的阈值倍数时，对该分区中的高频键给出加盐建议
+   （键后追加#0..#N-1分散到多个reducer，再对各盐值的结果二次汇总），并预测加盐后的负载
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+from local_runner import (PARTITION_CACHE_SIZE, compute_splits, feed_input, map_output_key,
+                          read_lines, read_stderr, script_command, split_data, text_hash,
+                          wait_process)
+
+# 默认样本大小和抽样段数
+SAMPLE_BYTES = 16 * 1024 * 1024
+SAMPLE_CHUNKS = 16
+# Space-Saving草图跟踪的键数
+SKETCH_CAPACITY = 1000
+# 报告中列出的高频键数
+TOP_KEYS = 20
+# 分区负载超过平均负载的倍数时建议加盐
+SKEW_THRESHOLD = 1.5
+# 负载不低于平均负载该比例的高频键才值得加盐，更小的键加盐效果有限
+MIN_SALT_SHARE = 0.5
+# 加盐键的分隔符
+SALT_SEPARATOR = b'#'
+
+class SpaceSaving:
+    """
+    Space-Saving高频项草图：最多跟踪capacity个键，新键替换计数最小的键并继承其计数作为误差，
+    任何真实计数超过 总数/capacity 的键一定被跟踪，计数偏大不超过误差
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # (计数, 键)的小顶堆，每个键恰有一项，计数可能落后于实际值，弹出时修正
+        self.heap = []
+        self.total = 0
+
+    def update(self, key, weight=1):
+        """将键的计数增加weight"""
+        self.total += weight
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0
+            heapq.heappush(self.heap, (weight, key))
+            return
+
+        # 找到计数最小的键并替换
+        heap = self.heap
+        while True:
+            count, victim = heap[0]
+            if counts[victim] == count:
+                break
+            heapq.heapreplace(heap, (counts[victim], victim))
+        del counts[victim]
+        del self.errors[victim]
+        counts[key] = count + weight
+        self.errors[key] = count
+        heapq.heapreplace(heap, (count + weight, key))
+
+    def top(self, k):
+        """
+        Returns:
+            计数最大的k个键 [(键, 计数上界, 误差)]
+        """
+        return [(key, count, self.errors[key])
+                for key, count in heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])]
+
+def sample_input(input_file=None, input_data=None, sample_bytes=SAMPLE_BYTES,
+                 num_chunks=SAMPLE_CHUNKS):
+    """
+    从输入中均匀抽取若干段（对齐到行边界）作为样本，输入不超过样本大小时使用全部输入
+    Args:
+        input_file: 输入文件路径
+        input_data: 输入数据（bytes），未指定input_file时使用
+        sample_bytes: 样本大小
+        num_chunks: 抽样段数
+    Returns:
+        (样本bytes, 输入总字节数)
+    """
+    if input_file is None:
+        data = input_data or b''
+        if len(data) <= sample_bytes:
+            return data, len(data)
+        chunks = split_data(data, num_chunks)
+        chunk_bytes = sample_bytes // len(chunks)
+        sample = []
+        for chunk in chunks:
+            end = chunk.find(b'\n', chunk_bytes - 1)
+            sample.append(chunk if end < 0 else chunk[:end + 1])
+        return b''.join(sample), len(data)
+
+    size = os.path.getsize(input_file)
+    if size <= sample_bytes:
+        with open(input_file, 'rb') as f:
+            return f.read(), size
+    chunk_bytes = sample_bytes // num_chunks
+    sample = []
+    with open(input_file, 'rb') as f:
+        for start, end in compute_splits(input_file, num_chunks):
+            f.seek(start)
+            block = f.read(min(chunk_bytes, end - start))
+            if start + len(block) < end and not block.endswith(b'\n'):
+                block += f.readline()
+            sample.append(block)
+    return b''.join(sample), size
+
+def partition_loads(key_counts, hashes, num_reducers):
+    """
+    按HashPartitioner汇总各分区的记录数
+    Args:
+        key_counts: {键: 记录数}
+        hashes: {键: Text.hashCode()}
+        num_reducers: reducer数量
+    Returns:
+        各分区记录数列表
+    """
+    loads = [0] * num_reducers
+    for key, count in key_counts.items():
+        loads[(hashes[key] & 0x7FFFFFFF) % num_reducers] += count
+    return loads
+
+def load_summary(loads):
+    """负载列表的最大值、平均值和倾斜度（最大 / 平均）"""
+    mean = sum(loads) / len(loads) if loads else 0
+    return {
+        'max_load': max(loads) if loads else 0,
+        'mean_load': round(mean, 1),
+        'skew': round(max(loads) / mean, 3) if mean else 1.0,
+    }
+
+def salted_partitions(key, salts, num_reducers):
+    """键加盐（key#0 .. key#salts-1）后各盐值所在的分区"""
+    return [(text_hash(key + SALT_SEPARATOR + str(i).encode()) & 0x7FFFFFFF) % num_reducers
+            for i in range(salts)]
+
+def plan_salting(loads, heavy_hitters, hashes, num_reducers, threshold=SKEW_THRESHOLD):
+    """
+    对超过阈值的分区中的高频键给出加盐方案，并预测加盐后的负载
+    Args:
+        loads: 各分区负载（记录数）
+        heavy_hitters: [(键, 计数, 误差)]，计数已按与loads相同的比例放大
+        hashes: {键: Text.hashCode()}
+        num_reducers: reducer数量
+        threshold: 分区负载超过平均负载的倍数
+    Returns:
+        (加盐建议列表, 加盐后的各分区负载)
+    """
+    mean = sum(loads) / num_reducers if num_reducers else 0
+    overloaded = {p for p, load in enumerate(loads) if mean and load > threshold * mean}
+    salted_loads = list(loads)
+    suggestions = []
+    if num_reducers < 2:
+        return suggestions, salted_loads
+
+    # 每个盐值分到的记录数不超过阈值以内的余量，使接收盐值的分区不超过阈值
+    headroom = max(threshold - 1, 0.1) * mean
+    for key, count, _ in heavy_hitters:
+        partition = (hashes[key] & 0x7FFFFFFF) % num_reducers
+        if partition not in overloaded or count < MIN_SALT_SHARE * mean:
+            continue
+        salts = min(num_reducers, max(2, math.ceil(count / headroom)))
+        targets = salted_partitions(key, salts, num_reducers)
+        salted_loads[partition] -= count
+        for target in targets:
+            salted_loads[target] += count / salts
+        suggestions.append({
+            'key': key.decode('utf-8', errors='replace'),
+            'partition': partition,
+            'records': round(count),
+            'share_of_partition': round(count / loads[partition], 3),
+            'salts': salts,
+            'salted_partitions': targets,
+        })
+    return suggestions, [round(load) for load in salted_loads]
+
+def run_mapper_sample(mapper_script, sample):
+    """
+    对样本运行mapper
+    Args:
+        mapper_script: mapper脚本路径或命令
+        sample: 样本数据（bytes）
+    Yields:
+        mapper输出行列表（不含换行符）
+    Raises:
+        RuntimeError: mapper执行失败
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(script_command(mapper_script), stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=stderr)
+        feeder = threading.Thread(target=feed_input, args=(process.stdin, sample))
+        feeder.start()
+        try:
+            yield from read_lines(process.stdout)
+        finally:
+            process.stdout.close()
+            returncode, _ = wait_process(process)
+            feeder.join()
+        if returncode != 0:
+            raise RuntimeError(f"Mapper执行失败: {read_stderr(stderr)}")
+
+def analyze_skew(mapper_script, input_file=None, input_data=None, reducer_counts=(4,),
+                 sample_bytes=SAMPLE_BYTES, threshold=SKEW_THRESHOLD,
+                 capacity=SKETCH_CAPACITY, top_keys=TOP_KEYS):
+    """
+    分析mapper输出的键倾斜
+    Args:
+        mapper_script: mapper脚本路径或命令
+        input_file: 输入文件路径
+        input_data: 输入数据（str或bytes），未指定input_file时使用
+        reducer_counts: 要预测的reducer数量列表
+        sample_bytes: 样本大小
+        threshold: 分区负载超过平均负载的倍数时建议加盐
+        capacity: Space-Saving草图跟踪的键数
+        top_keys: 报告中列出的高频键数
+    Returns:
+        可序列化为JSON的分析结果；负载以记录数计（使用combiner时实际shuffle量更小）
+    Raises:
+        RuntimeError: mapper执行失败
+    """
+    if isinstance(input_data, str):
+        input_data = input_data.encode('utf-8')
+    sample, input_bytes = sample_input(input_file, input_data, sample_bytes)
+    scale = input_bytes / len(sample) if sample else 1.0
+
+    sketch = SpaceSaving(capacity)
+    # 样本中每个键的记录数用于精确计算各分区负载，键数超过上限时只保留高频键
+    key_counts = {}
+    exact = True
+    for lines in run_mapper_sample(mapper_script, sample):
+        for line in lines:
+            if not line.strip():
+                continue
+            key = map_output_key(line)
+            sketch.update(key)
+            if exact:
+                key_counts[key] = key_counts.get(key, 0) + 1
+                if len(key_counts) > PARTITION_CACHE_SIZE:
+                    exact = False
+    if not exact:
+        # 不同键过多时，高频键按草图中保证的计数下界计算，其余记录平均分配到各分区
+        key_counts = {key: count - sketch.errors[key] for key, count in sketch.counts.items()}
+
+    hashes = {key: text_hash(key) for key in key_counts}
+    heavy_hitters = sketch.top(top_keys)
+    for key, _, _ in heavy_hitters:
+        hashes.setdefault(key, text_hash(key))
+
+    result = {
+        'sample': {
+            'input_bytes': input_bytes,
+            'sample_bytes': len(sample),
+            'sample_fraction': round(len(sample) / input_bytes, 4) if input_bytes else 1.0,
+            'map_output_records': sketch.total,
+            'distinct_keys': len(key_counts) if exact else None,
+            'exact_partition_loads': exact,
+        },
+        'heavy_hitters': [{
+            'key': key.decode('utf-8', errors='replace'),
+            'records': round(count * scale),
+            'error': round(error * scale),
+            'share': round(count / sketch.total, 4) if sketch.total else 0.0,
+        } for key, count, error in heavy_hitters],
+        'threshold': threshold,
+        'reducers': {},
+    }
+
+    tracked = sum(key_counts.values())
+    for num_reducers in reducer_counts:
+        loads = partition_loads(key_counts, hashes, num_reducers)
+        if not exact:
+            remainder = (sketch.total - tracked) / num_reducers
+            loads = [load + remainder for load in loads]
+        loads = [round(load * scale) for load in loads]
+        scaled_hitters = [(key, count * scale, error * scale)
+                          for key, count, error in heavy_hitters]
+        suggestions, salted_loads = plan_salting(loads, scaled_hitters, hashes, num_reducers,
+                                                 threshold)
+        summary = load_summary(loads)
+        result['reducers'][str(num_reducers)] = dict(
+            summary,
+            partition_loads=loads,
+            overloaded_partitions=[p for p, load in enumerate(loads)
+                                   if summary['mean_load'] and load > threshold * summary['mean_load']],
+            salting=suggestions,
+            salted_partition_loads=salted_loads if suggestions else None,
+            salted_skew=load_summary(salted_loads)['skew'] if suggestions else None,
+        )
+    return result
+
+def print_analysis(result):
+    """打印分析结果"""
+    sample = result['sample']
+    print(f"样本: {sample['sample_bytes']}/{sample['input_bytes']} 字节"
+          f"（{sample['sample_fraction']:.1%}），mapper输出 {sample['map_output_records']} 条记录")
+    print("高频键:")
+    for hitter in result['heavy_hitters'][:10]:
+        print(f"  {hitter['key']:<20} {hitter['records']:>12} 条（{hitter['share']:.1%}，误差 ≤ {hitter['error']}）")
+    for num_reducers, analysis in result['reducers'].items():
+        print(f"\n{num_reducers} 个reducer: 预测负载 {analysis['partition_loads']}，"
+              f"倾斜 {analysis['skew']:.2f}x")
+        if not analysis['overloaded_partitions']:
+            print(f"  ✅ 没有分区超过平均负载的 {result['threshold']} 倍")
+            continue
+        print(f"  ⚠️  分区 {analysis['overloaded_partitions']} 超过平均负载的 {result['threshold']} 倍")
+        if not analysis['salting']:
+            print("  没有单个键占主导，建议增加reducer数量或使用自定义分区器")
+            continue
+        for suggestion in analysis['salting']:
+            print(f"  💡 键 '{suggestion['key']}'（{suggestion['records']} 条，"
+                  f"占分区 {suggestion['share_of_partition']:.0%}）: 加 {suggestion['salts']} 个盐值"
+                  f"（key#0..key#{suggestion['salts'] - 1}）分散到分区 {suggestion['salted_partitions']}，"
+                  f"再二次汇总")
+        print(f"  加盐后预测负载 {analysis['salted_partition_loads']}，倾斜 {analysis['salted_skew']:.2f}x")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="分析mapper输出的键倾斜并给出加盐建议")
+    parser.add_argument('-input', required=True, help="输入文件")
+    parser.add_argument('-mapper', default='mapper.py', help="mapper脚本或命令")
+    parser.add_argument('-numReduceTasks', default='4',
+                        help="要预测的reducer数量，逗号分隔，如 2,4,8")
+    parser.add_argument('-samplemb', type=float, default=SAMPLE_BYTES / (1024 * 1024),
+                        help="样本大小（MB）")
+    parser.add_argument('-threshold', type=float, default=SKEW_THRESHOLD,
+                        help="分区负载超过平均负载的倍数时建议加盐")
+    parser.add_argument('-output', default=None, help="分析结果JSON文件")
+    args = parser.parse_args()
+
+    try:
+        result = analyze_skew(args.mapper, input_file=args.input,
+                              reducer_counts=[int(r) for r in args.numReduceTasks.split(',')],
+                              sample_bytes=int(args.samplemb * 1024 * 1024),
+                              threshold=args.threshold)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return False
+
+    print_analysis(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n分析结果已保存到: {args.output}")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
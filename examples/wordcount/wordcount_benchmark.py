@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+词频统计吞吐量基准测试
+生成Zipf分布的语料（MB到GB级），分别测量mapper、shuffle（排序/溢写/归并）和reducer阶段的
+吞吐量（MB/s、记录/s）和峰值内存，结果保存为JSON，并与基线结果按回归阈值对比
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from external_sort import IO_BUFFER_BYTES, ExternalSorter, read_lines, sort_settings, write_lines
+from local_runner import count_lines, read_stderr, script_command
+
+# 默认语料大小（MB）
+DEFAULT_SIZES_MB = [1, 10, 100]
+# 词表大小
+VOCABULARY_SIZE = 50000
+# Zipf分布指数，第k常用的单词出现频率正比于1/k^s
+ZIPF_EXPONENT = 1.0
+# 每行单词数
+WORDS_PER_LINE = 12
+# 生成语料时每批的单词数
+GENERATE_BATCH_WORDS = 120000
+# 结果文件和基线文件
+RESULTS_FILE = "wordcount_benchmark.json"
+BASELINE_FILE = "wordcount_benchmark_baseline.json"
+# 回归阈值：吞吐量下降或峰值内存增长超过该比例视为回归
+REGRESSION_THRESHOLDS = {
+    'mb_per_s': 0.3,
+    'records_per_s': 0.3,
+    'peak_rss_mb': 0.5,
+}
+# 越大越好的指标，其余指标越小越好
+HIGHER_IS_BETTER = {'mb_per_s', 'records_per_s'}
+# 子进程内存采样间隔（秒）
+MEMORY_POLL_INTERVAL = 0.01
+
+def vocabulary_word(rank):
+    """
+    生成第rank个词表单词：由rank的26进制表示得到，至少3个字母，不会被mapper的长度过滤去掉
+    Args:
+        rank: 词频排名（从0开始）
+    Returns:
+        单词
+    """
+    n = rank + 26 * 26
+    letters = []
+    while n:
+        n, digit = divmod(n, 26)
+        letters.append(chr(ord('a') + digit))
+    return ''.join(reversed(letters))
+
+def generate_corpus(corpus_file, size_bytes, vocabulary_size=VOCABULARY_SIZE,
+                    exponent=ZIPF_EXPONENT, seed=42):
+    """
+    生成Zipf分布的语料文件
+    Args:
+        corpus_file: 输出文件路径
+        size_bytes: 目标大小（字节），按行截断
+        vocabulary_size: 词表大小
+        exponent: Zipf分布指数
+        seed: 随机种子
+    Returns:
+        {'bytes', 'lines', 'words'}
+    """
+    rng = random.Random(seed)
+    vocabulary = [vocabulary_word(rank) for rank in range(vocabulary_size)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** exponent
+                                            for rank in range(vocabulary_size)))
+    written = lines = words = 0
+
+    with open(corpus_file, 'w', encoding='utf-8', buffering=IO_BUFFER_BYTES) as f:
+        while written < size_bytes:
+            batch = rng.choices(vocabulary, cum_weights=cum_weights, k=GENERATE_BATCH_WORDS)
+            text = '\n'.join(' '.join(batch[i:i + WORDS_PER_LINE])
+                             for i in range(0, len(batch), WORDS_PER_LINE)) + '\n'
+            remaining = size_bytes - written
+            if len(text) > remaining:
+                text = text[:text.rfind('\n', 0, remaining) + 1]
+                if not text:
+                    break
+            f.write(text)
+            written += len(text)
+            batch_lines = text.count('\n')
+            lines += batch_lines
+            words += text.count(' ') + batch_lines
+
+    return {'bytes': written, 'lines': lines, 'words': words}
+
+def peak_rss_mb(usage):
+    """将rusage中的ru_maxrss转换为MB（Linux上单位为KB，macOS上为字节）"""
+    peak = usage.ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return round(peak / 1024, 1)
+
+def read_vm_hwm(pid='self'):
+    """
+    读取/proc/<pid>/status中的VmHWM（进程当前地址空间的峰值内存，MB）。
+    Linux上ru_maxrss会计入exec之前从父进程继承的内存，VmHWM只反映进程自身
+    Returns:
+        峰值内存（MB），不支持或进程已退出时返回None
+    """
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def file_records(path):
+    """统计文件行数"""
+    with open(path, 'rb') as f:
+        return count_lines(f)
+
+def run_script_stage(script, input_file, output_file):
+    """
+    以文件作为标准输入/输出运行mapper或reducer，记录耗时和该子进程的峰值内存
+    Args:
+        script: 脚本路径或命令
+        input_file: 输入文件
+        output_file: 输出文件
+    Returns:
+        {'time', 'peak_rss_mb'}
+    Raises:
+        RuntimeError: 脚本执行失败
+    """
+    with open(input_file, 'rb') as stdin, open(output_file, 'wb') as stdout, \
+            tempfile.TemporaryFile() as stderr:
+        start_time = time.perf_counter()
+        process = subprocess.Popen(script_command(script), stdin=stdin, stdout=stdout,
+                                   stderr=stderr)
+
+        # 子进程运行期间定期采样VmHWM，最后一次采样即为峰值
+        peak = []
+        finished = threading.Event()
+
+        def monitor():
+            while not finished.is_set():
+                value = read_vm_hwm(process.pid)
+                if value is not None:
+                    peak.append(value)
+                finished.wait(MEMORY_POLL_INTERVAL)
+
+        monitor_thread = threading.Thread(target=monitor, daemon=True)
+        monitor_thread.start()
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start_time
+        finished.set()
+        monitor_thread.join()
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        if process.returncode != 0:
+            raise RuntimeError(f"{script} 执行失败: {read_stderr(stderr)}")
+    # 不支持/proc的平台退回到wait4返回的ru_maxrss
+    return {'time': elapsed, 'peak_rss_mb': max(peak) if peak else peak_rss_mb(usage)}
+
+def shuffle_file(input_file, output_file, sort_buffer_bytes=None):
+    """
+    用外部归并排序对mapper输出排序（溢写+多路归并），在独立进程中运行以单独统计内存
+    Args:
+        input_file: mapper输出文件
+        output_file: 排序后的输出文件
+        sort_buffer_bytes: 排序缓冲区大小，为None时读取mapreduce.task.io.sort.mb
+    Returns:
+        {'time', 'spills', 'peak_rss_mb'}
+    """
+    import resource
+
+    start_time = time.perf_counter()
+    with ExternalSorter(os.path.dirname(output_file), sort_buffer_bytes) as sorter:
+        with open(input_file, 'rb') as f:
+            for lines in read_lines(f):
+                sorter.add_lines(list(filter(bytes.strip, lines)))
+        # 与本地运行器一样，map输出最终全部落盘
+        sorter.spill()
+        with open(output_file, 'wb', buffering=IO_BUFFER_BYTES) as output:
+            write_lines(output, sorter.sorted_lines())
+
+    peak = read_vm_hwm()
+    if peak is None:
+        peak = peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF))
+    return {
+        'time': time.perf_counter() - start_time,
+        'spills': sorter.spills,
+        'peak_rss_mb': peak,
+    }
+
+def stage_result(stats, input_bytes, input_records, output_file):
+    """补充阶段的输入输出数据量和吞吐量"""
+    elapsed = max(stats['time'], 1e-9)
+    stats.update({
+        'input_bytes': input_bytes,
+        'input_records': input_records,
+        'output_bytes': os.path.getsize(output_file),
+        'output_records': file_records(output_file),
+        'mb_per_s': input_bytes / (1024 * 1024) / elapsed,
+        'records_per_s': input_records / elapsed,
+    })
+    return stats
+
+def benchmark_corpus(corpus_file, corpus, mapper_script, reducer_script, work_dir,
+                     sort_buffer_bytes=None):
+    """
+    对一份语料分别测量mapper、shuffle、reducer三个阶段
+    Args:
+        corpus_file: 语料文件
+        corpus: generate_corpus返回的语料信息
+        mapper_script: mapper脚本路径或命令
+        reducer_script: reducer脚本路径或命令
+        work_dir: 中间文件目录
+        sort_buffer_bytes: shuffle排序缓冲区大小
+    Returns:
+        {'map': {...}, 'shuffle': {...}, 'reduce': {...}}
+    """
+    map_output = os.path.join(work_dir, 'map.out')
+    shuffle_output = os.path.join(work_dir, 'shuffle.out')
+    reduce_output = os.path.join(work_dir, 'reduce.out')
+    stages = {}
+
+    try:
+        stats = run_script_stage(mapper_script, corpus_file, map_output)
+        stages['map'] = stage_result(stats, corpus['bytes'], corpus['lines'], map_output)
+
+        # 在spawn启动的新解释器中运行，峰值内存只反映shuffle本身
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            stats = executor.submit(shuffle_file, map_output, shuffle_output,
+                                    sort_buffer_bytes).result()
+        stages['shuffle'] = stage_result(stats, stages['map']['output_bytes'],
+                                         stages['map']['output_records'], shuffle_output)
+
+        stats = run_script_stage(reducer_script, shuffle_output, reduce_output)
+        stages['reduce'] = stage_result(stats, stages['shuffle']['output_bytes'],
+                                        stages['shuffle']['output_records'], reduce_output)
+    finally:
+        for path in (map_output, shuffle_output, reduce_output):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    return stages
+
+def run_benchmark(sizes_mb=DEFAULT_SIZES_MB, mapper_script='mapper.py', reducer_script='reducer.py',
+                  sort_buffer_bytes=None, corpus_dir=None,
+                  vocabulary_size=VOCABULARY_SIZE, exponent=ZIPF_EXPONENT):
+    """
+    运行基准测试
+    Args:
+        sizes_mb: 语料大小列表（MB）
+        mapper_script: mapper脚本路径或命令
+        reducer_script: reducer脚本路径或命令
+        sort_buffer_bytes: shuffle排序缓冲区大小，为None时读取mapreduce.task.io.sort.mb
+        corpus_dir: 语料保存目录，已存在的同参数语料直接复用；为None时使用临时目录，结束后删除
+        vocabulary_size: 词表大小
+        exponent: Zipf分布指数
+    Returns:
+        报告字典
+    """
+    sort_buffer_bytes = sort_settings(sort_buffer_bytes)[0]
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'mapper': mapper_script,
+        'reducer': reducer_script,
+        'sort_buffer_mb': sort_buffer_bytes / (1024 * 1024),
+        'results': [],
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size_mb in sizes_mb:
+            name = f"zipf-{size_mb}mb-v{vocabulary_size}-s{exponent}.txt"
+            corpus_file = os.path.join(corpus_dir or work_dir, name)
+            info_file = corpus_file + '.json'
+
+            if corpus_dir is not None and os.path.exists(corpus_file) and os.path.exists(info_file):
+                with open(info_file, 'r', encoding='utf-8') as f:
+                    corpus = json.load(f)
+            else:
+                print(f"生成 {size_mb}MB Zipf语料...")
+                corpus = generate_corpus(corpus_file, int(size_mb * 1024 * 1024),
+                                         vocabulary_size, exponent)
+                if corpus_dir is not None:
+                    with open(info_file, 'w', encoding='utf-8') as f:
+                        json.dump(corpus, f)
+
+            try:
+                stages = benchmark_corpus(corpus_file, corpus, mapper_script, reducer_script,
+                                          work_dir, sort_buffer_bytes)
+            finally:
+                if corpus_dir is None:
+                    os.unlink(corpus_file)
+
+            report['results'].append({
+                'corpus_mb': size_mb,
+                'corpus_bytes': corpus['bytes'],
+                'lines': corpus['lines'],
+                'words': corpus['words'],
+                'vocabulary': vocabulary_size,
+                'zipf_exponent': exponent,
+                'stages': stages,
+            })
+
+    return report
+
+def compare_results(report, baseline, thresholds=REGRESSION_THRESHOLDS):
+    """
+    与基线结果对比，找出超过回归阈值的指标（只比较两边都有的语料大小）
+    Args:
+        report: 本次结果
+        baseline: 基线结果
+        thresholds: {指标: 允许的相对变化}
+    Returns:
+        回归列表 [{'corpus_mb', 'stage', 'metric', 'baseline', 'current', 'change'}]
+    """
+    baseline_results = {result['corpus_mb']: result for result in baseline.get('results', [])}
+    regressions = []
+
+    for result in report['results']:
+        base = baseline_results.get(result['corpus_mb'])
+        if base is None:
+            continue
+        for stage, stats in result['stages'].items():
+            base_stats = base['stages'].get(stage, {})
+            for metric, threshold in thresholds.items():
+                if metric not in stats or not base_stats.get(metric):
+                    continue
+                change = stats[metric] / base_stats[metric] - 1
+                regressed = (change < -threshold if metric in HIGHER_IS_BETTER
+                             else change > threshold)
+                if regressed:
+                    regressions.append({
+                        'corpus_mb': result['corpus_mb'],
+                        'stage': stage,
+                        'metric': metric,
+                        'baseline': base_stats[metric],
+                        'current': stats[metric],
+                        'change': change,
+                    })
+
+    return regressions
+
+def print_report(report):
+    """打印各阶段吞吐量"""
+    for result in report['results']:
+        print(f"\n语料 {result['corpus_mb']}MB: {result['lines']} 行, {result['words']} 个单词")
+        print(f"  {'阶段':<8} {'耗时':>9} {'MB/s':>9} {'记录/s':>12} {'输出记录':>10} {'峰值内存':>10}")
+        for stage, stats in result['stages'].items():
+            print(f"  {stage:<8} {stats['time']:>8.3f}s {stats['mb_per_s']:>9.2f} "
+                  f"{stats['records_per_s']:>12.0f} {stats['output_records']:>10} "
+                  f"{stats['peak_rss_mb']:>8.1f}MB")
+
+def print_regressions(regressions):
+    """打印回归项"""
+    for r in regressions:
+        print(f"  ⚠️  {r['corpus_mb']}MB {r['stage']} {r['metric']}: "
+              f"{r['baseline']:.2f} -> {r['current']:.2f} ({r['change']:+.1%})")
+
+def load_results(path):
+    """读取结果文件，不存在时返回None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_results(report, path):
+    """保存结果文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="词频统计吞吐量基准测试")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES_MB)),
+                        help="语料大小列表（MB），逗号分隔，如 1,10,1024")
+    parser.add_argument('--mapper', default='mapper.py', help="mapper脚本或命令")
+    parser.add_argument('--reducer', default='reducer.py', help="reducer脚本或命令")
+    parser.add_argument('--sortmb', type=int, default=None,
+                        help="shuffle排序缓冲区大小（MB），默认读取mapreduce.task.io.sort.mb")
+    parser.add_argument('--output', default=RESULTS_FILE, help="结果JSON文件")
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help="基线JSON文件，不存在时以本次结果作为基线")
+    parser.add_argument('--corpus-dir', default=None, help="保存并复用生成的语料")
+    args = parser.parse_args()
+
+    sizes = [float(size) if '.' in size else int(size) for size in args.sizes.split(',')]
+    if args.corpus_dir:
+        os.makedirs(args.corpus_dir, exist_ok=True)
+
+    try:
+        sort_buffer_bytes = args.sortmb * 1024 * 1024 if args.sortmb is not None else None
+        report = run_benchmark(sizes, args.mapper, args.reducer, sort_buffer_bytes,
+                               args.corpus_dir)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return False
+
+    print_report(report)
+    save_results(report, args.output)
+    print(f"\n结果已保存到: {args.output}")
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        save_results(report, args.baseline)
+        print(f"基线不存在，已将本次结果保存为基线: {args.baseline}")
+        return True
+
+    regressions = compare_results(report, baseline)
+    if regressions:
+        print(f"\n❌ 相对基线 {args.baseline} 存在 {len(regressions)} 项性能回归:")
+        print_regressions(regressions)
+        return False
+    print(f"✅ 相对基线 {args.baseline} 没有超过阈值的性能回归")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+自适应引擎测试
+在benchmark.py的三类合成图上以默认收敛阈值分别运行csr和adaptive引擎，检查：
+- adaptive的页面更新次数少于csr（迭代次数 × 页面数）
+- adaptive结果与csr结果的平均绝对差低于收敛阈值
+- 相对于充分收敛的参考结果，adaptive的平均误差不超过csr的平均误差加收敛阈值
+"""
+
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmark import GENERATORS, write_graph
+from main import pagerank_python
+
+# 测试图规模
+TEST_VERTICES = 5_000
+TEST_EDGES = 50_000
+# 默认收敛阈值（与pagerank_python一致）
+CONVERGENCE_THRESHOLD = 0.001
+# 参考结果的收敛阈值
+REFERENCE_THRESHOLD = 1e-12
+
+def run_engine(edges_file, vertices_file, engine, convergence_threshold=CONVERGENCE_THRESHOLD):
+    """
+    静默运行一次PageRank
+    Returns:
+        pagerank: PageRank向量
+        stats: pagerank_python记录的统计
+    """
+    stats = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        pagerank, _ = pagerank_python(edges_file, vertices_file, max_iterations=1000,
+                                      convergence_threshold=convergence_threshold,
+                                      engine=engine, use_cache=False, stats=stats)
+    return pagerank, stats
+
+def check_graph(work_dir, graph_name, generator, seed=42):
+    """
+    在一张合成图上比较csr和adaptive引擎
+    Returns:
+        通过返回True
+    """
+    rng = np.random.default_rng(seed)
+    sources, targets = generator(TEST_VERTICES, TEST_EDGES, rng)
+    edges_file, vertices_file = write_graph(work_dir, graph_name, TEST_VERTICES, sources, targets)
+
+    reference, _ = run_engine(edges_file, vertices_file, 'csr', REFERENCE_THRESHOLD)
+    csr_rank, csr_stats = run_engine(edges_file, vertices_file, 'csr')
+    adaptive_rank, adaptive_stats = run_engine(edges_file, vertices_file, 'adaptive')
+
+    full_updates = csr_stats['iterations'] * len(csr_rank)
+    difference = float(np.abs(adaptive_rank - csr_rank).mean())
+    csr_error = float(np.abs(csr_rank - reference).mean())
+    adaptive_error = float(np.abs(adaptive_rank - reference).mean())
+
+    print(f"📊 {graph_name}: csr {csr_stats['iterations']} 次迭代 / {full_updates} 次页面更新，"
+          f"adaptive {adaptive_stats['iterations']} 次迭代 / {adaptive_stats['vertex_updates']} 次页面更新")
+    print(f"    与csr的平均差 {difference:.3g}，平均误差 csr {csr_error:.3g} / adaptive {adaptive_error:.3g}")
+
+    success = True
+    if not adaptive_stats['converged']:
+        print("    ❌ adaptive引擎未收敛")
+        success = False
+    if adaptive_stats['vertex_updates'] >= full_updates:
+        print("    ❌ adaptive的页面更新次数没有少于csr")
+        success = False
+    if difference >= CONVERGENCE_THRESHOLD:
+        print("    ❌ adaptive结果与csr结果的平均差超过收敛阈值")
+        success = False
+    if adaptive_error > csr_error + CONVERGENCE_THRESHOLD:
+        print("    ❌ adaptive的平均误差超过csr的平均误差加收敛阈值")
+        success = False
+    return success
+
+def main():
+    """主函数"""
+    print("🧪 自适应PageRank引擎测试")
+    print("=" * 50)
+
+    work_dir = tempfile.mkdtemp(prefix='pagerank-adaptive-test-')
+    try:
+        results = [check_graph(work_dir, name, generator) for name, generator in GENERATORS.items()]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if all(results):
+        print("\n✅ 所有测试通过")
+    else:
+        print("\n❌ 部分测试失败")
+    return all(results)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+PageRank性能基准测试
+生成幂律、Erdős–Rényi和高无出链比例三类合成图，在多个规模下运行pagerank_python的各个引擎，
+记录加载时间、每次迭代时间、峰值RSS和迭代次数，结果保存为JSON以便在版本之间对比
+"""
+
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from graph_cache import load_cached_graph
+from main import pagerank_python
+
+# 默认测试规模（边数）
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000, 10_000_000]
+# 平均出度，顶点数 = 边数 / 平均出度
+AVERAGE_DEGREE = 10
+# 字典引擎逐页分配无出链页面的PageRank，单次迭代为O(页面数 × 无出链页面数)，只在小图上运行
+MAX_DICT_EDGES = 100_000
+# 写入边文件时每块的边数
+WRITE_CHUNK_EDGES = 1_000_000
+# 等待子进程结果时检查其是否仍在运行的间隔（秒）
+RESULT_POLL_SECONDS = 1.0
+
+# (结果标签, 引擎, 是否使用快照缓存)
+ENGINES = [
+    ('dict', 'dict', False),
+    ('csr', 'csr', False),
+    ('csr-cached', 'csr', True),
+    ('parallel', 'parallel', True),
+    ('adaptive', 'adaptive', True),
+]
+
+def power_law_edges(num_vertices, num_edges, rng, exponent=1.0):
+    """
+    幂律图：出链目标按Zipf分布选取，源页面按较平缓的幂律选取
+    Args:
+        num_vertices: 顶点数
+        num_edges: 边数
+        rng: NumPy随机数生成器
+        exponent: 目标页面流行度的幂指数
+    Returns:
+        sources, targets: 边数组
+    """
+    ranks = np.arange(1, num_vertices + 1, dtype=np.float64)
+    target_weights = ranks ** -exponent
+    source_weights = ranks ** (-exponent / 2)
+    targets = rng.choice(num_vertices, num_edges, p=target_weights / target_weights.sum())
+    sources = rng.choice(num_vertices, num_edges, p=source_weights / source_weights.sum())
+    # 打乱顶点编号，避免热门页面集中在下标开头
+    permutation = rng.permutation(num_vertices)
+    return permutation[sources], permutation[targets]
+
+def erdos_renyi_edges(num_vertices, num_edges, rng):
+    """
+    Erdős–Rényi随机图：源和目标均匀选取
+    Args:
+        num_vertices: 顶点数
+        num_edges: 边数
+        rng: NumPy随机数生成器
+    Returns:
+        sources, targets: 边数组
+    """
+    return rng.integers(0, num_vertices, num_edges), rng.integers(0, num_vertices, num_edges)
+
+def high_dangling_edges(num_vertices, num_edges, rng, dangling_ratio=0.6):
+    """
+    高无出链比例图：只有部分顶点有出链
+    Args:
+        num_vertices: 顶点数
+        num_edges: 边数
+        rng: NumPy随机数生成器
+        dangling_ratio: 无出链顶点比例
+    Returns:
+        sources, targets: 边数组
+    """
+    num_sources = max(1, int(num_vertices * (1 - dangling_ratio)))
+    sources = rng.choice(num_vertices, num_sources, replace=False)
+    return sources[rng.integers(0, num_sources, num_edges)], rng.integers(0, num_vertices, num_edges)
+
+GENERATORS = {
+    'power_law': power_law_edges,
+    'erdos_renyi': erdos_renyi_edges,
+    'high_dangling': high_dangling_edges,
+}
+
+def write_graph(work_dir, name, num_vertices, sources, targets):
+    """
+    将合成图写成main.py使用的边文件和顶点文件
+    Args:
+        work_dir: 输出目录
+        name: 图名称
+        num_vertices: 顶点数
+        sources, targets: 边数组
+    Returns:
+        edges_file, vertices_file
+    """
+    edges_file = os.path.join(work_dir, f"{name}-edges.txt")
+    vertices_file = os.path.join(work_dir, f"{name}-vertices.txt")
+
+    with open(vertices_file, 'w', encoding='utf-8') as f:
+        for start in range(0, num_vertices, WRITE_CHUNK_EDGES):
+            end = min(start + WRITE_CHUNK_EDGES, num_vertices)
+            f.write(''.join(f"{i}\tPage {i}\n" for i in range(start, end)))
+
+    with open(edges_file, 'w', encoding='utf-8') as f:
+        for start in range(0, len(sources), WRITE_CHUNK_EDGES):
+            chunk_sources = sources[start:start + WRITE_CHUNK_EDGES].tolist()
+            chunk_targets = targets[start:start + WRITE_CHUNK_EDGES].tolist()
+            f.write(''.join(f"{s}\t{t}\n" for s, t in zip(chunk_sources, chunk_targets)))
+
+    return edges_file, vertices_file
+
+def read_vm_hwm():
+    """
+    读取/proc/self/status中的VmHWM（进程自身地址空间的峰值内存，MB）
+    Returns:
+        峰值内存（MB），不支持/proc的平台返回None
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def run_engine(edges_file, vertices_file, engine, use_cache, queue):
+    """
+    在spawn启动的子进程中运行一次PageRank，使峰值RSS只反映本次运行
+    Args:
+        edges_file, vertices_file: 图文件
+        engine: 引擎名称
+        use_cache: 是否使用快照缓存
+        queue: 结果队列
+    """
+    stats = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pagerank_python(edges_file, vertices_file, engine=engine, use_cache=use_cache,
+                            stats=stats)
+        peak_rss_mb = read_vm_hwm()
+        if peak_rss_mb is None:
+            # Linux上ru_maxrss单位为KB，macOS上为字节
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform == 'darwin':
+                peak_rss //= 1024
+            peak_rss_mb = round(peak_rss / 1024, 1)
+        stats['peak_rss_mb'] = peak_rss_mb
+    except Exception as e:
+        stats['error'] = str(e)
+    queue.put(stats)
+
+def benchmark_engine(edges_file, vertices_file, engine, use_cache):
+    """
+    运行并计时单个引擎
+    Args:
+        edges_file, vertices_file: 图文件
+        engine: 引擎名称
+        use_cache: 是否使用快照缓存
+    Returns:
+        统计结果字典
+    """
+    # fork出的子进程的ru_maxrss会计入父进程的常驻内存，因此用spawn启动新的解释器
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    start_time = time.perf_counter()
+    process = context.Process(target=run_engine,
+                              args=(edges_file, vertices_file, engine, use_cache, result_queue))
+    process.start()
+
+    # 子进程可能没有写入结果就退出（如被OOM killer终止），不能无限期阻塞在队列上
+    stats = None
+    while stats is None:
+        try:
+            stats = result_queue.get(timeout=RESULT_POLL_SECONDS)
+        except queue.Empty:
+            if not process.is_alive():
+                try:
+                    # 子进程退出前写入的结果可能刚到达
+                    stats = result_queue.get(timeout=RESULT_POLL_SECONDS)
+                except queue.Empty:
+                    process.join()
+                    stats = {'error': f"exit code {process.exitcode}"}
+    process.join()
+
+    stats['total_time'] = time.perf_counter() - start_time
+    iteration_times = stats.get('iteration_times', [])
+    if iteration_times:
+        stats['avg_iteration_time'] = sum(iteration_times) / len(iteration_times)
+    return stats
+
+def run_benchmarks(scales=DEFAULT_SCALES, engines=ENGINES, seed=42):
+    """
+    运行全部基准测试
+    Args:
+        scales: 边数列表
+        engines: [(标签, 引擎, 是否使用快照缓存)]
+        seed: 随机种子
+    Returns:
+        结果列表
+    """
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='pagerank-bench-')
+
+    try:
+        for num_edges in scales:
+            num_vertices = max(num_edges // AVERAGE_DEGREE, 2)
+            for graph_name, generator in GENERATORS.items():
+                rng = np.random.default_rng(seed)
+                name = f"{graph_name}-{num_edges}"
+                print(f"\nGenerating {name} ({num_vertices} vertices, {num_edges} edges)...")
+                sources, targets = generator(num_vertices, num_edges, rng)
+                edges_file, vertices_file = write_graph(work_dir, name, num_vertices,
+                                                        sources, targets)
+                del sources, targets
+
+                # 预先生成快照，使cached结果反映热缓存下的加载时间
+                with contextlib.redirect_stdout(io.StringIO()):
+                    load_cached_graph(edges_file, vertices_file)
+
+                for label, engine, use_cache in engines:
+                    if engine == 'dict' and num_edges > MAX_DICT_EDGES:
+                        continue
+                    stats = benchmark_engine(edges_file, vertices_file, engine, use_cache)
+                    stats.update({'graph': graph_name, 'edges': num_edges,
+                                  'vertices': num_vertices, 'engine': label})
+                    results.append(stats)
+
+                    if 'error' in stats:
+                        print(f"  {label:<12} ERROR: {stats['error']}")
+                    else:
+                        print(f"  {label:<12} load {stats['load_time']:.3f}s, "
+                              f"{stats['iterations']} iterations, "
+                              f"avg {stats.get('avg_iteration_time', 0.0):.4f}s/iter, "
+                              f"peak RSS {stats['peak_rss_mb']} MB")
+
+                os.remove(edges_file)
+                os.remove(vertices_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+def main():
+    """主函数"""
+    # 用法: python3 benchmark.py [输出JSON文件] [最大边数]
+    output_file = sys.argv[1] if len(sys.argv) >= 2 else "benchmark_results.json"
+    max_edges = int(sys.argv[2]) if len(sys.argv) >= 3 else DEFAULT_SCALES[-1]
+    scales = [n for n in DEFAULT_SCALES if n <= max_edges]
+
+    print("Starting PageRank benchmark...")
+    print(f"Scales: {scales}")
+    results = run_benchmarks(scales)
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("-" * 50)
+    print(f"Benchmark results saved to: {output_file}")
+
+if __name__ == "__main__":
+    main()
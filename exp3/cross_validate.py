@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+PageRank结果交叉验证
+流式读取两份结果（pagerank_results.txt或从HDFS拷贝到本地的MapReduce输出目录iteration*/part-r-*），
+按页面ID做归并连接，统计PageRank的最大/平均绝对误差、出链差异、缺失页面和排序差异。
+结果文件先按页面ID外部排序，MapReduce的各个part文件本身已按键排序，直接多路归并，
+内存占用只与排序块大小有关，与结果文件大小无关
+"""
+
+import heapq
+import os
+import pickle
+import re
+import sys
+import tempfile
+import zlib
+from itertools import islice
+
+# 外部排序时每个内存块的记录数
+SORT_CHUNK_RECORDS = 1_000_000
+# 排序段文件中每次序列化的记录数
+RUN_BATCH_RECORDS = 4096
+# 单个页面默认允许的绝对误差
+RANK_TOLERANCE = 1e-5
+# 排序比较时忽略的PageRank差异（结果文件保留6位小数）
+ORDER_TOLERANCE = 1e-6
+# Top-K比较的页面数
+TOP_K = 100
+# 每类差异最多打印的示例数
+MAX_EXAMPLES = 5
+
+def parse_result_line(line):
+    """
+    解析一行结果，兼容两种格式：
+    pageId\tpageRank[\toutLinks]（main.py）和 pageId\tpageId\tpageRank[\toutLinks]（PageRankReducer）
+    Args:
+        line: 结果行
+    Returns:
+        (page_id, rank, out_links_digest)，无法解析时返回None
+    """
+    parts = line.rstrip('\r\n').split('\t')
+    if len(parts) >= 3 and parts[0] == parts[1]:
+        # TextOutputFormat输出key\tvalue，而value本身以pageId开头
+        parts = parts[1:]
+    if len(parts) < 2:
+        return None
+
+    try:
+        rank = float(parts[1])
+    except ValueError:
+        return None
+
+    # 出链顺序不影响PageRank，按排序后的出链集合计算摘要
+    out_links = parts[2].strip() if len(parts) >= 3 else ''
+    links = sorted(link.strip() for link in out_links.split(',') if link.strip())
+    digest = zlib.crc32(','.join(links).encode('utf-8'))
+    return parts[0].strip(), rank, digest
+
+def iter_results_file(results_file):
+    """
+    逐行读取结果文件
+    Args:
+        results_file: 结果文件路径
+    Yields:
+        (page_id, rank, out_links_digest)
+    """
+    with open(results_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = parse_result_line(line)
+            if record is not None:
+                yield record
+
+def _write_run(records, tmp_dir):
+    """将已排序的记录块写入临时排序段文件"""
+    run = tempfile.TemporaryFile(dir=tmp_dir)
+    for start in range(0, len(records), RUN_BATCH_RECORDS):
+        pickle.dump(records[start:start + RUN_BATCH_RECORDS], run, protocol=pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+def _read_run(run):
+    """按批读取排序段文件"""
+    while True:
+        try:
+            batch = pickle.load(run)
+        except EOFError:
+            return
+        yield from batch
+
+def external_sort(records, key, chunk_records=SORT_CHUNK_RECORDS, tmp_dir=None):
+    """
+    外部排序：按块在内存中排序后写入临时排序段，再用堆多路归并
+    Args:
+        records: 可迭代的记录
+        key: 排序键函数
+        chunk_records: 每块的记录数
+        tmp_dir: 临时文件目录
+    Yields:
+        按key排序的记录
+    """
+    records = iter(records)
+    runs = []
+    try:
+        while True:
+            chunk = list(islice(records, chunk_records))
+            if not chunk:
+                break
+            chunk.sort(key=key)
+            if not runs and len(chunk) < chunk_records:
+                # 数据只有一块，无需落盘
+                yield from chunk
+                return
+            runs.append(_write_run(chunk, tmp_dir))
+            del chunk
+
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=key)
+    finally:
+        for run in runs:
+            run.close()
+
+def find_part_files(output_dir):
+    """
+    查找MapReduce输出文件：目录下直接有part-r-*时使用该目录，否则使用编号最大的iteration*子目录
+    Args:
+        output_dir: MapReduce输出目录
+    Returns:
+        part文件路径列表
+    """
+    def part_files(directory):
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.startswith('part-'))
+
+    parts = part_files(output_dir)
+    if parts:
+        return parts
+
+    iterations = []
+    for name in os.listdir(output_dir):
+        match = re.fullmatch(r'iteration(\d+)', name)
+        if match and os.path.isdir(os.path.join(output_dir, name)):
+            iterations.append((int(match.group(1)), name))
+    if not iterations:
+        raise ValueError(f"No part files or iteration directories in {output_dir}")
+
+    latest = os.path.join(output_dir, max(iterations)[1])
+    parts = part_files(latest)
+    if not parts:
+        raise ValueError(f"No part files in {latest}")
+    return parts
+
+def iter_sorted_part(part_file):
+    """
+    读取一个已按键排序的part文件，并检查排序
+    Args:
+        part_file: part文件路径
+    Yields:
+        (page_id, rank, out_links_digest)
+    """
+    previous = None
+    for record in iter_results_file(part_file):
+        # Hadoop Text按UTF-8字节序比较，与Python字符串按码点比较的顺序一致
+        if previous is not None and record[0] < previous:
+            raise ValueError(f"{part_file} is not sorted by page ID ({previous} before {record[0]})")
+        previous = record[0]
+        yield record
+
+def iter_sorted_results(path, tmp_dir=None):
+    """
+    按页面ID顺序读取一份结果
+    Args:
+        path: 结果文件或MapReduce输出目录
+        tmp_dir: 外部排序的临时文件目录
+    Yields:
+        按页面ID排序的(page_id, rank, out_links_digest)
+    """
+    if os.path.isdir(path):
+        parts = [iter_sorted_part(part) for part in find_part_files(path)]
+        return heapq.merge(*parts, key=lambda record: record[0])
+    return external_sort(iter_results_file(path), key=lambda record: record[0], tmp_dir=tmp_dir)
+
+def merge_join(left, right, report):
+    """
+    按页面ID归并连接两份已排序的结果，同时累计误差统计
+    Args:
+        left, right: 按页面ID排序的记录迭代器
+        report: 统计字典，就地更新
+    Yields:
+        (page_id, left_rank, right_rank)，只包含两边都有的页面
+    """
+    missing = {'left': report['only_in_left_examples'], 'right': report['only_in_right_examples']}
+    sentinel = (None, 0.0, 0)
+    left_record = next(left, sentinel)
+    right_record = next(right, sentinel)
+    previous_id = None
+
+    while left_record is not sentinel or right_record is not sentinel:
+        if right_record is sentinel or (left_record is not sentinel
+                                        and left_record[0] < right_record[0]):
+            side, record = 'left', left_record
+            left_record = next(left, sentinel)
+        elif left_record is sentinel or right_record[0] < left_record[0]:
+            side, record = 'right', right_record
+            right_record = next(right, sentinel)
+        else:
+            side = None
+            page_id, left_rank, left_digest = left_record
+            _, right_rank, right_digest = right_record
+            left_record = next(left, sentinel)
+            right_record = next(right, sentinel)
+
+        if side is not None:
+            # 同一侧的重复页面只计一次
+            if record[0] != previous_id:
+                report[f'only_in_{side}'] += 1
+                if len(missing[side]) < MAX_EXAMPLES:
+                    missing[side].append(record[0])
+            previous_id = record[0]
+            continue
+
+        if page_id == previous_id:
+            report['duplicates'] += 1
+            continue
+        previous_id = page_id
+
+        error = abs(left_rank - right_rank)
+        report['compared'] += 1
+        report['total_error'] += error
+        if error > report['max_error']:
+            report['max_error'] = error
+            report['max_error_page'] = page_id
+        if error > report['tolerance']:
+            report['over_tolerance'] += 1
+        if left_digest != right_digest:
+            report['out_link_mismatches'] += 1
+            if len(report['out_link_mismatch_examples']) < MAX_EXAMPLES:
+                report['out_link_mismatch_examples'].append(page_id)
+
+        yield page_id, left_rank, right_rank
+
+def compare_order(joined, report, top_k=TOP_K, tmp_dir=None):
+    """
+    比较排序：按左侧PageRank降序外部排序，统计右侧顺序相反的相邻页面对，以及Top-K重合度
+    Args:
+        joined: (page_id, left_rank, right_rank)迭代器
+        report: 统计字典，就地更新
+        top_k: Top-K比较的页面数
+        tmp_dir: 外部排序的临时文件目录
+    """
+    right_top = []
+
+    def track_right_top(records):
+        for record in records:
+            item = (record[2], record[0])
+            if len(right_top) < top_k:
+                heapq.heappush(right_top, item)
+            elif item > right_top[0]:
+                heapq.heapreplace(right_top, item)
+            yield record
+
+    ordered = external_sort(track_right_top(joined), key=lambda record: (-record[1], record[0]),
+                            tmp_dir=tmp_dir)
+    left_top = []
+    previous = None
+    for record in ordered:
+        if len(left_top) < top_k:
+            left_top.append(record[0])
+        if previous is not None and previous[1] > record[1] \
+                and record[2] - previous[2] > ORDER_TOLERANCE:
+            report['order_inversions'] += 1
+            if len(report['order_inversion_examples']) < MAX_EXAMPLES:
+                report['order_inversion_examples'].append((previous[0], record[0]))
+        previous = record
+
+    right_top_ids = [page_id for _, page_id in sorted(right_top, key=lambda x: (-x[0], x[1]))]
+    report['top_k'] = len(left_top)
+    report['top_k_overlap'] = len(set(left_top) & set(right_top_ids))
+    report['top_k_first_difference'] = next(
+        (i + 1 for i, (a, b) in enumerate(zip(left_top, right_top_ids)) if a != b), None)
+
+def cross_validate(left_path, right_path, tolerance=RANK_TOLERANCE, top_k=TOP_K, tmp_dir=None):
+    """
+    交叉验证两份PageRank结果
+    Args:
+        left_path: 待验证的结果（文件或MapReduce输出目录）
+        right_path: 参考结果（文件或MapReduce输出目录）
+        tolerance: 单个页面允许的绝对误差
+        top_k: Top-K比较的页面数
+        tmp_dir: 外部排序的临时文件目录
+    Returns:
+        统计字典
+    """
+    report = {
+        'tolerance': tolerance,
+        'compared': 0,
+        'total_error': 0.0,
+        'max_error': 0.0,
+        'max_error_page': None,
+        'over_tolerance': 0,
+        'duplicates': 0,
+        'only_in_left': 0,
+        'only_in_right': 0,
+        'only_in_left_examples': [],
+        'only_in_right_examples': [],
+        'out_link_mismatches': 0,
+        'out_link_mismatch_examples': [],
+        'order_inversions': 0,
+        'order_inversion_examples': [],
+    }
+
+    left = iter(iter_sorted_results(left_path, tmp_dir))
+    right = iter(iter_sorted_results(right_path, tmp_dir))
+    compare_order(merge_join(left, right, report), report, top_k, tmp_dir)
+
+    report['mean_error'] = report['total_error'] / max(report['compared'], 1)
+    return report
+
+def print_report(report, left_path, right_path):
+    """打印交叉验证结果"""
+    print(f"Left:  {left_path}")
+    print(f"Right: {right_path}")
+    print("-" * 50)
+    print(f"Compared pages: {report['compared']}")
+    print(f"Only in left: {report['only_in_left']} {report['only_in_left_examples']}")
+    print(f"Only in right: {report['only_in_right']} {report['only_in_right_examples']}")
+    if report['duplicates']:
+        print(f"Duplicate page IDs: {report['duplicates']}")
+    print(f"Max absolute error: {report['max_error']:.6g} (page {report['max_error_page']})")
+    print(f"Mean absolute error: {report['mean_error']:.6g}")
+    print(f"Pages over tolerance {report['tolerance']:g}: {report['over_tolerance']}")
+    print(f"Out-link mismatches: {report['out_link_mismatches']} "
+          f"{report['out_link_mismatch_examples']}")
+    print(f"Adjacent order inversions: {report['order_inversions']} "
+          f"{report['order_inversion_examples']}")
+    print(f"Top-{report['top_k']} overlap: {report['top_k_overlap']}/{report['top_k']}, "
+          f"first differing position: {report['top_k_first_difference']}")
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 3:
+        print("用法: python3 cross_validate.py <待验证结果> <参考结果> [容差]")
+        print("结果可以是pagerank_results.txt格式的文件，或MapReduce输出目录（iteration*/part-r-*）")
+        print("示例: python3 cross_validate.py pagerank_results.txt output/pagerank")
+        sys.exit(1)
+
+    left_path = sys.argv[1]
+    right_path = sys.argv[2]
+    tolerance = float(sys.argv[3]) if len(sys.argv) >= 4 else RANK_TOLERANCE
+
+    for path in (left_path, right_path):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    try:
+        report = cross_validate(left_path, right_path, tolerance)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print_report(report, left_path, right_path)
+
+    # 存在超出容差的页面、缺失页面或出链差异时返回非零退出码，便于脚本中使用
+    if report['over_tolerance'] or report['only_in_left'] or report['only_in_right'] \
+            or report['out_link_mismatches']:
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+图数据二进制快照缓存
+首次加载时将CSR数组和ID/标题表写成.npy快照，以源文件的大小和修改时间作为键；
+之后的运行直接以mmap方式打开快照，源文件变化时自动重建
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from graph_loader import load_csr_graph
+from pagerank_csr import make_csr_graph
+
+# 快照格式版本，格式变化时递增以使旧快照失效
+SNAPSHOT_VERSION = 1
+
+class StringTable:
+    """
+    只读字符串表：UTF-8字节拼接成一个数组，按偏移切片解码，
+    支持mmap打开，无需为每个字符串创建Python对象
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+def encode_string_table(strings):
+    """
+    将字符串序列编码为UTF-8字节数组和偏移数组
+    Args:
+        strings: 字符串序列
+    Returns:
+        data: 字节数组 (uint8)
+        offsets: 偏移数组 (int64, 长度len(strings)+1)
+    """
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def save_string_table(strings, data_file, offsets_file):
+    """
+    将字符串列表保存为字节数组和偏移数组
+    Args:
+        strings: 字符串序列
+        data_file: 字节数组文件路径
+        offsets_file: 偏移数组文件路径
+    """
+    data, offsets = encode_string_table(strings)
+    np.save(data_file, data)
+    np.save(offsets_file, offsets)
+
+def source_signature(edges_file, vertices_file):
+    """
+    计算源文件签名（大小和修改时间），用于判断快照是否过期
+    Args:
+        edges_file: 边文件路径
+        vertices_file: 顶点文件路径
+    Returns:
+        签名字典
+    """
+    signature = {'version': SNAPSHOT_VERSION}
+    for name, path in (('edges', edges_file), ('vertices', vertices_file)):
+        stat = os.stat(path)
+        signature[name] = {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+    return signature
+
+def snapshot_path(edges_file, cache_dir=None):
+    """
+    获取快照目录路径，默认为边文件所在目录下的cache/<边文件名>
+    Args:
+        edges_file: 边文件路径
+        cache_dir: 缓存根目录
+    Returns:
+        快照目录路径
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(edges_file)), 'cache')
+    name = os.path.splitext(os.path.basename(edges_file))[0]
+    return os.path.join(cache_dir, name)
+
+def save_snapshot(csr, snapshot_dir, signature):
+    """
+    保存CSR图快照，先写入临时目录再重命名，避免留下不完整的快照
+    Args:
+        csr: CSR图结构
+        snapshot_dir: 快照目录
+        signature: 源文件签名
+    """
+    tmp_dir = snapshot_dir + '.tmp'
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    for name in ('offsets', 'targets', 'sources'):
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), csr[name])
+    save_string_table(csr['ids'],
+                      os.path.join(tmp_dir, 'ids_data.npy'),
+                      os.path.join(tmp_dir, 'ids_offsets.npy'))
+    save_string_table(csr['titles'],
+                      os.path.join(tmp_dir, 'titles_data.npy'),
+                      os.path.join(tmp_dir, 'titles_offsets.npy'))
+
+    # 元数据最后写入，作为快照完整的标志
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(signature, f, indent=2)
+
+    if os.path.exists(snapshot_dir):
+        shutil.rmtree(snapshot_dir)
+    os.replace(tmp_dir, snapshot_dir)
+
+def load_snapshot(snapshot_dir, signature):
+    """
+    以mmap方式打开快照
+    Args:
+        snapshot_dir: 快照目录
+        signature: 当前源文件签名
+    Returns:
+        csr: CSR图结构；快照不存在或已过期时返回None
+    """
+    meta_file = os.path.join(snapshot_dir, 'meta.json')
+    if not os.path.exists(meta_file):
+        return None
+
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            if json.load(f) != signature:
+                return None
+
+        def load(name):
+            return np.load(os.path.join(snapshot_dir, f'{name}.npy'), mmap_mode='r')
+
+        ids = StringTable(load('ids_data'), load('ids_offsets'))
+        titles = StringTable(load('titles_data'), load('titles_offsets'))
+        return make_csr_graph(ids, titles, load('offsets'), load('targets'), load('sources'))
+    except (OSError, ValueError):
+        # 快照文件损坏，按过期处理
+        return None
+
+def load_cached_graph(edges_file, vertices_file, cache_dir=None):
+    """
+    加载CSR图，优先使用有效快照，否则解析源文件并重建快照
+    Args:
+        edges_file: 边文件路径
+        vertices_file: 顶点文件路径
+        cache_dir: 缓存根目录
+    Returns:
+        csr: CSR图结构
+    """
+    signature = source_signature(edges_file, vertices_file)
+    snapshot_dir = snapshot_path(edges_file, cache_dir)
+
+    csr = load_snapshot(snapshot_dir, signature)
+    if csr is not None:
+        print(f"Loaded graph snapshot: {snapshot_dir}")
+        return csr
+
+    print("Graph snapshot missing or stale, parsing source files...")
+    csr = load_csr_graph(edges_file, vertices_file)
+    try:
+        save_snapshot(csr, snapshot_dir, signature)
+        print(f"Graph snapshot saved: {snapshot_dir}")
+    except OSError as e:
+        print(f"Warning: failed to save graph snapshot: {e}")
+    return csr
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+流式图加载器
+将页面ID一次性映射为连续整数下标，分块读取边文件，
+用排序去重代替列表线性查找，直接生成CSR引擎使用的紧凑数组
+"""
+
+from array import array
+
+import numpy as np
+
+from pagerank_csr import make_csr_graph
+
+# 每次从边文件读取的字节数
+CHUNK_SIZE = 64 * 1024 * 1024
+
+def load_vertices(vertices_file, index):
+    """
+    加载顶点文件并为页面ID分配下标
+    Args:
+        vertices_file: 顶点文件路径 (vertex_id\ttitle)
+        index: {page_id: 下标}，就地更新，下标按首次出现顺序分配
+    Returns:
+        titles: [title]，与前len(titles)个下标一一对应
+    """
+    titles = []
+
+    with open(vertices_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            if len(parts) >= 2:
+                i = index.setdefault(parts[0].strip(), len(index))
+                if i == len(titles):
+                    titles.append(parts[1].strip())
+                else:
+                    titles[i] = parts[1].strip()
+
+    return titles
+
+def load_edges(edges_file, index, chunk_size=CHUNK_SIZE):
+    """
+    分块流式读取边文件，源/目标页面ID均映射为整数下标
+    Args:
+        edges_file: 边文件路径 (source_id\ttarget_id)
+        index: {page_id: 下标}，就地更新
+        chunk_size: 每次读取的字节数
+    Returns:
+        sources: 源页面下标数组 (int64)
+        targets: 目标页面下标数组 (int64)
+    """
+    sources = array('q')
+    targets = array('q')
+    intern = index.setdefault
+
+    with open(edges_file, 'r', encoding='utf-8', buffering=chunk_size) as f:
+        while True:
+            lines = f.readlines(chunk_size)
+            if not lines:
+                break
+
+            chunk_sources = []
+            chunk_targets = []
+            add_source = chunk_sources.append
+            add_target = chunk_targets.append
+            for line in lines:
+                parts = line.strip().split('\t')
+                if len(parts) < 2:
+                    continue
+                add_source(intern(parts[0].strip(), len(index)))
+                add_target(intern(parts[1].strip(), len(index)))
+
+            sources.extend(chunk_sources)
+            targets.extend(chunk_targets)
+
+    return np.frombuffer(sources, dtype=np.int64), np.frombuffer(targets, dtype=np.int64)
+
+def dedup_edges(sources, targets, num_ids):
+    """
+    排序去重：每个源页面的重复出链只保留第一次出现，并按源页面分组
+    Args:
+        sources: 源页面下标数组
+        targets: 目标页面下标数组
+        num_ids: 下标总数
+    Returns:
+        sources, targets: 去重并按源页面稳定排序后的数组
+    """
+    keys = sources * num_ids + targets
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+
+    order = np.argsort(sources[first], kind='stable')
+    keep = first[order]
+    return sources[keep], targets[keep]
+
+def assemble_csr_graph(ids, titles, page_order, sources, targets):
+    """
+    按给定页面顺序重新编号并构建CSR结构，未列入page_order的下标作为外部页面排在最后
+    Args:
+        ids: [page_id]，按临时下标排列
+        titles: [title]，与前len(titles)个临时下标对应，其余页面以页面ID作为标题
+        page_order: 参与计算的页面的临时下标，按最终顺序排列
+        sources: 源页面临时下标数组
+        targets: 目标页面临时下标数组
+    Returns:
+        csr: CSR图结构
+    """
+    num_ids = len(ids)
+    num_pages = len(page_order)
+
+    is_page = np.zeros(num_ids, dtype=bool)
+    is_page[page_order] = True
+    externals = np.flatnonzero(~is_page)
+
+    order = np.concatenate([np.asarray(page_order, dtype=np.int64), externals])
+    remap = np.empty(num_ids, dtype=np.int64)
+    remap[order] = np.arange(num_ids, dtype=np.int64)
+
+    sources, targets = dedup_edges(remap[sources], remap[targets], num_ids)
+    offsets = np.zeros(num_pages + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_pages), out=offsets[1:])
+
+    page_ids = [ids[i] for i in order]
+    num_titles = len(titles)
+    page_titles = [titles[i] if i < num_titles else ids[i] for i in order[:num_pages]]
+    return make_csr_graph(page_ids, page_titles, offsets, targets, sources)
+
+def load_csr_graph(edges_file, vertices_file, chunk_size=CHUNK_SIZE):
+    """
+    流式加载图数据并直接构建CSR结构，页面顺序与load_graph一致：
+    先是顶点文件中的页面，再是只出现在边文件源端的页面，其后为外部出链目标
+    Args:
+        edges_file: 边文件路径
+        vertices_file: 顶点文件路径
+        chunk_size: 每次读取边文件的字节数
+    Returns:
+        csr: CSR图结构，见pagerank_csr.build_csr_graph
+    """
+    index = {}
+    titles = load_vertices(vertices_file, index)
+    num_vertices = len(index)
+
+    sources, targets = load_edges(edges_file, index, chunk_size)
+    # 字典保持插入顺序，键列表即为下标到页面ID的映射
+    ids = list(index)
+
+    # 顶点在前，未登记的源页面按首次出现顺序在后
+    unique_sources, first_seen = np.unique(sources, return_index=True)
+    extra = unique_sources >= num_vertices
+    extra = unique_sources[extra][np.argsort(first_seen[extra], kind='stable')]
+    page_order = np.concatenate([np.arange(num_vertices, dtype=np.int64), extra])
+
+    return assemble_csr_graph(ids, titles, page_order, sources, targets)
+
+def page_index(csr):
+    """
+    获取页面ID到下标的映射，首次调用时构建并缓存在CSR结构中
+    Args:
+        csr: CSR图结构
+    Returns:
+        {page_id: 下标}
+    """
+    if 'index' not in csr:
+        csr['index'] = {page_id: i for i, page_id in enumerate(csr['ids'])}
+    return csr['index']
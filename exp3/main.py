@@ -6,6 +6,12 @@ PageRank算法Python实现
 
 import sys
 import os
+import time
+
+from pagerank_output import top_k_items, write_results_text
+
+# 基于CSR图结构的计算引擎
+CSR_ENGINES = ('csr', 'parallel', 'adaptive')
 
 def load_graph(edges_file, vertices_file):
     """
@@ -19,6 +25,8 @@ def load_graph(edges_file, vertices_file):
     """
     graph = {}
     pages = {}
+    # 每个源页面已添加的出链集合，用于O(1)去重
+    seen_links = {}
     
     # 加载顶点信息
     with open(vertices_file, 'r', encoding='utf-8') as f:
@@ -49,7 +57,9 @@ def load_graph(edges_file, vertices_file):
                     graph[source_id] = {'out_links': [], 'title': source_id}
                 
                 # 添加出链
-                if target_id not in graph[source_id]['out_links']:
+                links = seen_links.setdefault(source_id, set())
+                if target_id not in links:
+                    links.add(target_id)
                     graph[source_id]['out_links'].append(target_id)
     
     return graph, pages
@@ -100,7 +110,7 @@ def pagerank_iteration(graph, pagerank, damping_factor=0.85, teleportation=0.15)
     
     return new_pagerank, total_diff
 
-def pagerank_python(edges_file, vertices_file, max_iterations=100, convergence_threshold=0.001):
+def pagerank_python(edges_file, vertices_file, max_iterations=100, convergence_threshold=0.001, engine='dict', use_cache=True, num_workers=None, stats=None):
     """
     Python实现的PageRank算法
     Args:
@@ -108,20 +118,66 @@ def pagerank_python(edges_file, vertices_file, max_iterations=100, convergence_t
         vertices_file: 顶点文件路径
         max_iterations: 最大迭代次数
         convergence_threshold: 收敛阈值
+        engine: 计算引擎，'dict'为字典实现，'csr'为NumPy CSR稀疏矩阵实现，
+                'parallel'为多进程分区实现，'adaptive'为逐页面收敛冻结的自适应实现
+        use_cache: CSR类引擎是否使用二进制图快照缓存
+        num_workers: parallel引擎的工作进程数，默认为CPU核数
+        stats: 传入字典时记录耗时统计：load_time、setup_time、iteration_times、iterations、converged，
+               adaptive引擎另外记录vertex_updates、edge_updates
     Returns:
-        final_pagerank: 最终的PageRank值
+        final_pagerank: 最终的PageRank值（dict引擎为字典，CSR类引擎为NumPy向量）
+        graph: 图结构（dict引擎为字典图，CSR类引擎为CSR图）
     """
-    # 加载图数据
-    graph, pages = load_graph(edges_file, vertices_file)
-    
-    # 初始化PageRank值
-    pagerank = {}
-    num_pages = len(graph)
     initial_rank = 1.0
+    runner = None
+    if stats is None:
+        stats = {}
+    start_time = time.perf_counter()
     
-    for page_id in graph:
-        pagerank[page_id] = initial_rank
+    if engine in CSR_ENGINES:
+        import numpy as np
+        from graph_cache import load_cached_graph
+        from graph_loader import load_csr_graph
+        from pagerank_csr import csr_pagerank_iteration
+        
+        # 流式加载为CSR紧凑数组，不再构建字典图；有效快照存在时直接mmap打开
+        if use_cache:
+            graph = load_cached_graph(edges_file, vertices_file)
+        else:
+            graph = load_csr_graph(edges_file, vertices_file)
+        num_pages = graph['num_pages']
+        pagerank = np.full(num_pages, initial_rank, dtype=np.float64)
+        iteration_func = csr_pagerank_iteration
+        stats['load_time'] = time.perf_counter() - start_time
+        
+        if engine == 'parallel':
+            from pagerank_parallel import ParallelPageRank
+            runner = ParallelPageRank(graph, num_workers)
+            iteration_func = runner.iteration
+        elif engine == 'adaptive':
+            from pagerank_adaptive import AdaptivePageRank
+            # 冻结阈值默认取收敛阈值，保证自适应引擎达到调用方要求的精度
+            runner = AdaptivePageRank(graph, convergence_threshold=convergence_threshold)
+            iteration_func = runner.iteration
+    elif engine == 'dict':
+        # 加载图数据
+        graph, pages = load_graph(edges_file, vertices_file)
+        stats['load_time'] = time.perf_counter() - start_time
+        
+        # 初始化PageRank值
+        pagerank = {}
+        num_pages = len(graph)
+        
+        for page_id in graph:
+            pagerank[page_id] = initial_rank
+        iteration_func = pagerank_iteration
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+    stats['setup_time'] = time.perf_counter() - start_time - stats['load_time']
+    stats['iteration_times'] = []
+    stats['converged'] = False
     
+    print(f"Engine: {engine}")
     print(f"Loaded {num_pages} pages")
     print(f"Initial PageRank value: {initial_rank}")
     print(f"Damping factor: 0.85")
@@ -130,18 +186,29 @@ def pagerank_python(edges_file, vertices_file, max_iterations=100, convergence_t
     print("-" * 50)
     
     # 迭代计算
-    for iteration in range(max_iterations):
-        new_pagerank, total_diff = pagerank_iteration(graph, pagerank)
-        
-        avg_diff = total_diff / num_pages
-        print(f"Iteration {iteration + 1}: Average difference = {avg_diff:.6f}")
-        
-        # 检查收敛
-        if avg_diff < convergence_threshold:
-            print(f"Converged at iteration {iteration + 1}")
-            break
-        
-        pagerank = new_pagerank
+    try:
+        for iteration in range(max_iterations):
+            iteration_start = time.perf_counter()
+            new_pagerank, total_diff = iteration_func(graph, pagerank)
+            pagerank = new_pagerank
+            stats['iteration_times'].append(time.perf_counter() - iteration_start)
+            
+            avg_diff = total_diff / num_pages
+            print(f"Iteration {iteration + 1}: Average difference = {avg_diff:.6f}")
+            
+            # 检查收敛（返回本轮计算出的最新PageRank值）
+            if avg_diff < convergence_threshold:
+                print(f"Converged at iteration {iteration + 1}")
+                stats['converged'] = True
+                break
+    finally:
+        stats['iterations'] = len(stats['iteration_times'])
+        if runner is not None:
+            runner.close()
+            runner.report()
+            if engine == 'adaptive':
+                stats['vertex_updates'] = runner.vertex_updates
+                stats['edge_updates'] = runner.edge_updates
     
     return pagerank, graph
 
@@ -153,20 +220,30 @@ def save_pagerank_results(pagerank, graph, output_file):
         graph: 图结构
         output_file: 输出文件路径
     """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        # 按PageRank值降序排序
-        sorted_pages = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)
-        
-        for page_id, rank in sorted_pages:
-            out_links = graph[page_id]['out_links']
-            
-            # 构建输出格式：pageId\tpageRank[\toutLink1,outLink2,...]
-            output = f"{page_id}\t{rank:.6f}"
-            
-            if out_links:
-                output += "\t" + ",".join(out_links)
-            
-            f.write(output + "\n")
+    # 按PageRank值降序排序
+    sorted_pages = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)
+    
+    # 输出格式：pageId\tpageRank[\toutLink1,outLink2,...]，分块写入
+    rows = ((page_id, rank, graph[page_id]['out_links']) for page_id, rank in sorted_pages)
+    write_results_text(output_file, rows)
+
+def top_pages(pagerank, graph, k=10, engine='dict'):
+    """
+    获取PageRank值最高的k个页面
+    Args:
+        pagerank: PageRank值
+        graph: 图结构
+        k: 返回的页面数量
+        engine: 计算引擎
+    Returns:
+        [(page_id, title, rank)]
+    """
+    if engine in CSR_ENGINES:
+        from pagerank_output import top_k_indices
+        return [(graph['ids'][i], graph['titles'][i], float(pagerank[i]))
+                for i in top_k_indices(pagerank, k)]
+    
+    return [(page_id, graph[page_id]['title'], rank) for page_id, rank in top_k_items(pagerank, k)]
 
 def main():
     """主函数"""
@@ -175,6 +252,14 @@ def main():
     vertices_file = "dataset/wiki-vertices.txt"
     output_file = "pagerank_results.txt"
     
+    # 计算引擎：python main.py [dict|csr|parallel|adaptive] [工作进程数] [--binary]
+    # --binary 额外输出二进制结果（页面ID表 + float64 PageRank值）
+    args = [arg for arg in sys.argv[1:] if arg != '--binary']
+    save_binary = '--binary' in sys.argv[1:]
+    engine = args[0] if len(args) >= 1 else 'dict'
+    num_workers = int(args[1]) if len(args) >= 2 else None
+    binary_file = "pagerank_results.npz"
+    
     # 检查文件是否存在
     if not os.path.exists(edges_file):
         print(f"Error: {edges_file} not found")
@@ -186,20 +271,33 @@ def main():
     
     # 运行PageRank算法
     print("Starting PageRank calculation...")
-    final_pagerank, graph = pagerank_python(edges_file, vertices_file)
+    final_pagerank, graph = pagerank_python(edges_file, vertices_file, engine=engine,
+                                            num_workers=num_workers)
     
     # 保存结果
-    save_pagerank_results(final_pagerank, graph, output_file)
+    if engine in CSR_ENGINES:
+        from pagerank_csr import save_csr_results
+        save_csr_results(final_pagerank, graph, output_file)
+    else:
+        save_pagerank_results(final_pagerank, graph, output_file)
+    
+    if save_binary:
+        from pagerank_output import write_results_binary
+        if engine in CSR_ENGINES:
+            ids = (graph['ids'][i] for i in range(graph['num_pages']))
+            write_results_binary(binary_file, ids, final_pagerank)
+        else:
+            write_results_binary(binary_file, list(final_pagerank), list(final_pagerank.values()))
     
     print("-" * 50)
     print(f"PageRank calculation completed!")
     print(f"Results saved to: {output_file}")
+    if save_binary:
+        print(f"Binary results saved to: {binary_file}")
     
     # 显示前10个结果
     print("\nTop 10 pages by PageRank:")
-    sorted_pages = sorted(final_pagerank.items(), key=lambda x: x[1], reverse=True)
-    for i, (page_id, rank) in enumerate(sorted_pages[:10]):
-        title = graph[page_id]['title']
+    for i, (page_id, title, rank) in enumerate(top_pages(final_pagerank, graph, 10, engine)):
         print(f"{i+1:2d}. {title[:50]:<50} (ID: {page_id[:20]}...) - PR: {rank:.6f}")
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+自适应PageRank引擎
+- 以变化量推送的形式执行Jacobi迭代：每个页面记录尚未计入自身PageRank的变化量，
+  即对当前向量再做一次完整迭代时该页面的变化量
+- 逐页面收敛冻结：待施加变化量低于冻结阈值的页面本轮不更新、不沿出链推送，
+  变化量继续累积，超过冻结阈值时自动解冻，冻结不会丢弃任何变化量
+- 每轮的总变化量为全部页面待施加变化量之和，与csr引擎的收敛判断相同
+"""
+
+import numpy as np
+
+from pagerank_csr import csr_pagerank_iteration, expand_ranges
+
+# 本轮更新的页面超过该比例时遍历完整的出链数组，否则只展开这些页面的出链区间
+DENSE_PUSH_RATIO = 0.5
+
+class AdaptivePageRank:
+    """
+    自适应PageRank迭代器，iteration方法与csr_pagerank_iteration签名一致，
+    并统计迭代次数和页面/出链更新次数；
+    freeze_threshold为None时取convergence_threshold：所有页面都被冻结时平均变化量
+    必然低于收敛阈值，因此冻结不会使迭代停滞，停止时的误差上界与csr引擎相同
+    """
+
+    def __init__(self, csr, convergence_threshold=0.001, freeze_threshold=None,
+                 damping_factor=0.85, teleportation=0.15):
+        self.num_pages = csr['num_pages']
+        self.num_ids = len(csr['ids'])
+        if freeze_threshold is None:
+            freeze_threshold = convergence_threshold
+        self.freeze_threshold = freeze_threshold
+        self.damping_factor = damping_factor
+        self.teleportation = teleportation
+
+        self.offsets = np.asarray(csr['offsets'])
+        self.targets = np.asarray(csr['targets'])
+        self.sources = np.asarray(csr['sources'])
+        self.out_degree = np.asarray(csr['out_degree'])
+        self.dangling = np.asarray(csr['dangling'])
+        # 每个页面尚未计入PageRank的变化量，首次迭代时由一次完整迭代得到
+        self.pending = None
+
+        # 统计计数
+        self.iterations = 0
+        self.vertex_updates = 0
+        self.edge_updates = 0
+
+    def push(self, changed, delta):
+        """
+        将页面的变化量沿出链推送到目标页面的待施加变化量，外部页面直接丢弃；
+        无出链页面的变化量均分给所有页面
+        Args:
+            changed: 本轮更新的页面下标，为None时delta为全部页面的变化量（未更新的页面为0）
+            delta: 这些页面本轮计入的变化量
+        """
+        if changed is None:
+            # 多数页面都更新时，直接遍历完整的出链数组比逐页面展开出链区间更快
+            contribution = np.zeros(self.num_pages, dtype=np.float64)
+            np.divide(delta * self.damping_factor, self.out_degree, out=contribution,
+                      where=~self.dangling)
+            edge_targets = self.targets
+            weights = contribution[self.sources]
+            dangling_delta = delta[self.dangling].sum()
+        else:
+            is_dangling = self.dangling[changed]
+            pushers = changed[~is_dangling]
+            positions, lengths = expand_ranges(self.offsets, pushers)
+            edge_targets = self.targets[positions]
+            weights = np.repeat(delta[~is_dangling] * self.damping_factor / self.out_degree[pushers],
+                                lengths)
+            dangling_delta = delta[is_dangling].sum()
+
+        self.pending += np.bincount(edge_targets, weights=weights,
+                                    minlength=self.num_ids)[:self.num_pages]
+        self.pending += dangling_delta * self.damping_factor / self.num_pages
+        self.edge_updates += len(edge_targets)
+
+    def iteration(self, csr, pagerank):
+        """
+        执行一次自适应PageRank迭代
+        Args:
+            csr: CSR图结构（仅在首次迭代时用于完整计算）
+            pagerank: 当前PageRank向量（须为上一次迭代的返回值）
+        Returns:
+            new_pagerank: 新的PageRank向量
+            total_diff: 对当前向量做一次完整迭代时的总变化量
+        """
+        new_pagerank = np.array(pagerank, dtype=np.float64)
+        if self.pending is None:
+            full_pagerank, _ = csr_pagerank_iteration(csr, new_pagerank, self.damping_factor,
+                                                      self.teleportation)
+            self.pending = full_pagerank - new_pagerank
+            self.vertex_updates += self.num_pages
+            self.edge_updates += len(self.targets)
+
+        magnitude = np.abs(self.pending)
+        total_diff = float(magnitude.sum())
+
+        active = magnitude >= self.freeze_threshold
+        num_changed = int(np.count_nonzero(active))
+        if not num_changed:
+            # 冻结阈值大于收敛阈值时，可能所有页面都被冻结而平均变化量仍未达到收敛阈值
+            active = magnitude > 0
+            num_changed = int(np.count_nonzero(active))
+
+        if num_changed >= DENSE_PUSH_RATIO * self.num_pages:
+            delta = np.where(active, self.pending, 0.0)
+            self.pending -= delta
+            new_pagerank += delta
+            self.push(None, delta)
+        else:
+            changed = np.flatnonzero(active)
+            delta = self.pending[changed]
+            self.pending[changed] = 0.0
+            new_pagerank[changed] += delta
+            self.push(changed, delta)
+
+        self.vertex_updates += num_changed
+        self.iterations += 1
+        return new_pagerank, total_diff
+
+    def report(self):
+        """打印迭代和更新计数，并与每轮重算全部页面的方式比较"""
+        if not self.iterations:
+            return
+        full_updates = self.iterations * self.num_pages
+        full_edges = self.iterations * len(self.targets)
+        saved = 1.0 - self.vertex_updates / full_updates if full_updates else 0.0
+        saved_edges = 1.0 - self.edge_updates / full_edges if full_edges else 0.0
+        frozen = int(np.count_nonzero(np.abs(self.pending) < self.freeze_threshold))
+        print(f"Iterations: {self.iterations}")
+        print(f"Vertex updates: {self.vertex_updates} (full recompute: {full_updates}, saved {saved:.1%})")
+        print(f"Edge updates: {self.edge_updates} (full recompute: {full_edges}, saved {saved_edges:.1%})")
+        print(f"Frozen pages: {frozen}/{self.num_pages}")
+
+    def close(self):
+        """与ParallelPageRank接口保持一致，无需释放资源"""
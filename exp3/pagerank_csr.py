@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+PageRank CSR稀疏矩阵引擎
+将图转换为压缩稀疏行(CSR)结构，每次迭代使用NumPy向量化scatter-add完成，
+输出格式与main.py中的save_pagerank_results保持一致
+"""
+
+import numpy as np
+
+from pagerank_output import write_results_text
+
+def build_csr_graph(graph):
+    """
+    将load_graph输出的字典图转换为CSR结构
+    Args:
+        graph: {page_id: {'out_links': [target_ids], 'title': title}}
+    Returns:
+        csr: {
+            'ids': [page_id]，前num_pages个为参与计算的页面，其后为只出现在出链中的外部页面,
+            'titles': [title]，与前num_pages个ids一一对应,
+            'num_pages': 页面数量,
+            'offsets': 每个页面出链在targets中的起止位置 (int64, 长度num_pages+1),
+            'targets': 出链目标下标 (int64),
+            'sources': 每条出链对应的源页面下标 (int64),
+            'out_degree': 每个页面的出链数量 (int64),
+            'dangling': 无出链页面的布尔掩码
+        }
+    """
+    ids = list(graph.keys())
+    titles = [graph[page_id]['title'] for page_id in ids]
+    num_pages = len(ids)
+    index = {page_id: i for i, page_id in enumerate(ids)}
+
+    offsets = np.zeros(num_pages + 1, dtype=np.int64)
+    targets = []
+
+    for i, page_data in enumerate(graph.values()):
+        for target_id in page_data['out_links']:
+            # 出链目标不在图中时分配外部下标，保证输出时出链列表完整
+            j = index.get(target_id)
+            if j is None:
+                j = len(ids)
+                index[target_id] = j
+                ids.append(target_id)
+            targets.append(j)
+        offsets[i + 1] = len(targets)
+
+    return make_csr_graph(ids, titles, offsets, np.array(targets, dtype=np.int64))
+
+def make_csr_graph(ids, titles, offsets, targets, sources=None):
+    """
+    由ID表、标题表和CSR数组组装图结构，并预先计算迭代所需的派生数组
+    Args:
+        ids: 页面ID列表（页面在前，外部出链目标在后）
+        titles: 页面标题列表
+        offsets: CSR偏移数组
+        targets: CSR目标下标数组
+        sources: 每条出链的源页面下标，为None时由offsets展开
+    Returns:
+        csr: 见build_csr_graph
+    """
+    num_pages = len(titles)
+    out_degree = np.diff(offsets)
+    if sources is None:
+        sources = np.repeat(np.arange(num_pages, dtype=np.int64), out_degree)
+
+    return {
+        'ids': ids,
+        'titles': titles,
+        'num_pages': num_pages,
+        'offsets': offsets,
+        'targets': targets,
+        'sources': sources,
+        'out_degree': out_degree,
+        'dangling': out_degree == 0,
+    }
+
+def build_in_links(csr):
+    """
+    构建入链（CSC）结构：去掉指向外部页面的出链，按目标页面稳定排序
+    Args:
+        csr: CSR图结构
+    Returns:
+        in_offsets: 每个页面入链的起止位置 (int64, 长度num_pages+1)
+        in_sources: 入链的源页面下标
+        in_targets: 入链的目标页面下标（非递减）
+    """
+    num_pages = csr['num_pages']
+    targets = np.asarray(csr['targets'])
+    sources = np.asarray(csr['sources'])
+
+    internal = targets < num_pages
+    order = np.argsort(targets[internal], kind='stable')
+    in_targets = targets[internal][order]
+    in_sources = sources[internal][order]
+
+    in_offsets = np.zeros(num_pages + 1, dtype=np.int64)
+    np.cumsum(np.bincount(in_targets, minlength=num_pages), out=in_offsets[1:])
+    return in_offsets, in_sources, in_targets
+
+def expand_ranges(offsets, idx):
+    """
+    展开若干页面在CSR/CSC数组中的下标区间
+    Args:
+        offsets: 偏移数组
+        idx: 页面下标数组
+    Returns:
+        positions: 所有区间内的数组位置（按页面顺序拼接）
+        lengths: 每个页面的区间长度
+    """
+    starts = offsets[idx]
+    lengths = offsets[idx + 1] - starts
+    ends = np.cumsum(lengths)
+    positions = np.arange(ends[-1] if len(ends) else 0, dtype=np.int64)
+    positions += np.repeat(starts - (ends - lengths), lengths)
+    return positions, lengths
+
+def csr_pagerank_iteration(csr, pagerank, damping_factor=0.85, teleportation=0.15):
+    """
+    执行一次CSR PageRank迭代
+    Args:
+        csr: CSR图结构
+        pagerank: 当前PageRank向量 (float64, 长度num_pages)
+        damping_factor: 阻尼系数
+        teleportation: 跳转概率
+    Returns:
+        new_pagerank: 新的PageRank向量
+        total_diff: 总变化量
+    """
+    num_pages = csr['num_pages']
+    out_degree = csr['out_degree']
+    dangling = csr['dangling']
+
+    # 每个页面分给每条出链的贡献值
+    contribution = np.zeros(num_pages, dtype=np.float64)
+    np.divide(pagerank * damping_factor, out_degree, out=contribution, where=~dangling)
+
+    # scatter-add：按目标下标累加贡献值，外部页面的贡献直接截断丢弃
+    new_pagerank = np.bincount(
+        csr['targets'],
+        weights=contribution[csr['sources']],
+        minlength=len(csr['ids'])
+    )[:num_pages]
+
+    # 无出链页面的PageRank值作为一个标量平均分配给所有页面
+    dangling_mass = pagerank[dangling].sum() * damping_factor / num_pages
+    new_pagerank += dangling_mass + teleportation
+
+    total_diff = float(np.abs(new_pagerank - pagerank).sum())
+    return new_pagerank, total_diff
+
+def get_out_links(csr, i):
+    """
+    获取第i个页面的出链ID列表
+    Args:
+        csr: CSR图结构
+        i: 页面下标
+    Returns:
+        出链ID列表
+    """
+    ids = csr['ids']
+    start, end = csr['offsets'][i], csr['offsets'][i + 1]
+    return [ids[j] for j in csr['targets'][start:end]]
+
+def save_csr_results(pagerank, csr, output_file):
+    """
+    保存CSR引擎的PageRank结果，格式与save_pagerank_results一致
+    Args:
+        pagerank: PageRank向量
+        csr: CSR图结构
+        output_file: 输出文件路径
+    """
+    # 稳定排序，保证同分页面的顺序与字典版本一致
+    order = np.argsort(-pagerank, kind='stable')
+    ids = csr['ids']
+    rows = ((ids[i], pagerank[i], get_out_links(csr, i)) for i in order)
+    write_results_text(output_file, rows)
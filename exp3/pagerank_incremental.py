@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+增量PageRank计算
+以上一次的pagerank_results.txt作为热启动（结果文件中已包含完整的页面和出链信息），
+应用边增量文件后，只从受影响的页面开始沿出链推送变化量，直到变化量低于容差
+
+边增量文件格式（每行一条）：
+    +\tsource_id\ttarget_id    添加出链
+    -\tsource_id\ttarget_id    删除出链
+"""
+
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from graph_loader import assemble_csr_graph
+from pagerank_csr import expand_ranges, save_csr_results
+
+def load_results_graph(results_file):
+    """
+    从PageRank结果文件加载图结构和PageRank值
+    Args:
+        results_file: 结果文件路径 (pageId\tpageRank[\toutLink1,outLink2,...])
+    Returns:
+        csr: CSR图结构，页面顺序与结果文件一致
+        pagerank: PageRank向量
+    """
+    index = {}
+    intern = index.setdefault
+    ranks = {}
+    sources = array('q')
+    targets = array('q')
+
+    with open(results_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            if len(parts) < 2:
+                continue
+
+            i = intern(parts[0].strip(), len(index))
+            if i in ranks:
+                continue
+            ranks[i] = float(parts[1])
+
+            if len(parts) >= 3:
+                for target_id in parts[2].split(','):
+                    target_id = target_id.strip()
+                    if target_id:
+                        sources.append(i)
+                        targets.append(intern(target_id, len(index)))
+
+    csr = assemble_csr_graph(list(index), [], np.fromiter(ranks, dtype=np.int64, count=len(ranks)),
+                             np.frombuffer(sources, dtype=np.int64),
+                             np.frombuffer(targets, dtype=np.int64))
+    pagerank = np.fromiter(ranks.values(), dtype=np.float64, count=len(ranks))
+    return csr, pagerank
+
+def apply_edge_delta(csr, delta_file):
+    """
+    将边增量应用到图上，新出现的源页面追加在原有页面之后
+    Args:
+        csr: 原CSR图结构
+        delta_file: 边增量文件路径
+    Returns:
+        new_csr: 新CSR图结构，原有页面下标不变
+        changed_sources: 出链发生变化的页面下标
+    """
+    ids = csr['ids']
+    num_pages = csr['num_pages']
+    index = {page_id: i for i, page_id in enumerate(ids)}
+    intern = index.setdefault
+    delta = {'+': (array('q'), array('q')), '-': (array('q'), array('q'))}
+
+    with open(delta_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            if len(parts) < 3 or parts[0] not in delta:
+                print(f"Warning: skipping malformed delta line: {line}")
+                continue
+            delta_sources, delta_targets = delta[parts[0]]
+            delta_sources.append(intern(parts[1].strip(), len(index)))
+            delta_targets.append(intern(parts[2].strip(), len(index)))
+
+    num_ids = len(index)
+    add_sources, add_targets = (np.frombuffer(a, dtype=np.int64) for a in delta['+'])
+    remove_sources, remove_targets = (np.frombuffer(a, dtype=np.int64) for a in delta['-'])
+
+    sources = np.asarray(csr['sources'])
+    targets = np.asarray(csr['targets'])
+    if len(remove_sources):
+        keep = ~np.isin(sources * num_ids + targets, remove_sources * num_ids + remove_targets)
+        sources, targets = sources[keep], targets[keep]
+    sources = np.concatenate([sources, add_sources])
+    targets = np.concatenate([targets, add_targets])
+
+    # 原有页面保持下标不变，新的源页面按首次出现顺序追加
+    unique_new, first_seen = np.unique(add_sources[add_sources >= num_pages], return_index=True)
+    new_pages = unique_new[np.argsort(first_seen, kind='stable')]
+    page_order = np.concatenate([np.arange(num_pages, dtype=np.int64), new_pages])
+    new_csr = assemble_csr_graph(list(index), csr['titles'], page_order, sources, targets)
+
+    # 增量涉及的页面在新图中的下标
+    page_slot = np.full(num_ids, -1, dtype=np.int64)
+    page_slot[page_order] = np.arange(len(page_order), dtype=np.int64)
+    changed_sources = np.unique(page_slot[np.concatenate([add_sources, remove_sources])])
+    return new_csr, changed_sources[changed_sources >= 0]
+
+def incremental_pagerank(csr, pagerank, unpushed, pending_base, tolerance=0.0001, max_rounds=1000,
+                         damping_factor=0.85):
+    """
+    增量推送传播：每个页面记录已计入自身PageRank但尚未推送给出链的变化量，
+    每轮只推送变化量超过容差的页面，沿出链scatter-add到目标页面；
+    无出链页面的变化通过均分值累积，超过容差时统一加到所有页面
+    Args:
+        csr: CSR图结构
+        pagerank: 热启动PageRank向量（已计入初始变化量），就地更新
+        unpushed: 每个页面尚未推送的变化量，就地更新
+        pending_base: 尚未施加到所有页面的均分值变化量
+        tolerance: 单个页面的变化容差
+        max_rounds: 最大传播轮数
+        damping_factor: 阻尼系数
+    Returns:
+        pagerank: 更新后的PageRank向量
+        stats: {'rounds', 'pushed_vertices', 'pushed_edges', 'uniform_shifts'}
+    """
+    num_pages = csr['num_pages']
+    offsets = csr['offsets']
+    targets = csr['targets']
+    out_degree = np.asarray(csr['out_degree'])
+    dangling = np.asarray(csr['dangling'])
+    stats = {'rounds': 0, 'pushed_vertices': 0, 'pushed_edges': 0, 'uniform_shifts': 0}
+    # 只有本轮收到推送的页面才可能超过容差
+    candidates = np.flatnonzero(unpushed)
+
+    for _ in range(max_rounds):
+        if abs(pending_base) > tolerance:
+            pagerank += pending_base
+            unpushed += pending_base
+            pending_base = 0.0
+            candidates = np.arange(num_pages, dtype=np.int64)
+            stats['uniform_shifts'] += 1
+
+        changed = candidates[np.abs(unpushed[candidates]) > tolerance]
+        if not len(changed):
+            break
+
+        delta = unpushed[changed]
+        unpushed[changed] = 0.0
+        is_dangling = dangling[changed]
+        pending_base += delta[is_dangling].sum() * damping_factor / num_pages
+
+        # 沿出链推送贡献值变化，外部页面直接丢弃
+        pushers = changed[~is_dangling]
+        positions, lengths = expand_ranges(offsets, pushers)
+        edge_targets = np.asarray(targets)[positions]
+        weights = np.repeat(delta[~is_dangling] * damping_factor / out_degree[pushers], lengths)
+        internal = edge_targets < num_pages
+        candidates, slots = np.unique(edge_targets[internal], return_inverse=True)
+        increments = np.bincount(slots, weights=weights[internal], minlength=len(candidates))
+        pagerank[candidates] += increments
+        unpushed[candidates] += increments
+
+        stats['rounds'] += 1
+        stats['pushed_vertices'] += len(changed)
+        stats['pushed_edges'] += len(positions)
+
+    return pagerank, stats
+
+def pagerank_incremental(results_file, delta_file, tolerance=0.0001,
+                         damping_factor=0.85, teleportation=0.15):
+    """
+    增量PageRank：以旧结果热启动，应用边增量后从受影响页面开始推送传播
+    Args:
+        results_file: 上一次的PageRank结果文件
+        delta_file: 边增量文件
+        tolerance: 单个页面的变化容差
+        damping_factor: 阻尼系数
+        teleportation: 跳转概率
+    Returns:
+        pagerank: 新PageRank向量
+        csr: 新CSR图结构
+        stats: 传播统计
+    """
+    old_csr, old_pagerank = load_results_graph(results_file)
+    num_old = old_csr['num_pages']
+    old_base = (old_pagerank[old_csr['dangling']].sum() * damping_factor / num_old
+                + teleportation)
+
+    csr, changed_sources = apply_edge_delta(old_csr, delta_file)
+    num_pages = csr['num_pages']
+    targets = np.asarray(csr['targets'])
+    sources = np.asarray(csr['sources'])
+
+    # 热启动：原有页面沿用旧值，新页面先只含旧的基础值
+    pagerank = np.full(num_pages, old_base, dtype=np.float64)
+    pagerank[:num_old] = old_pagerank
+    contribution = np.zeros(num_pages, dtype=np.float64)
+    np.divide(pagerank * damping_factor, csr['out_degree'], out=contribution,
+              where=~np.asarray(csr['dangling']))
+    old_contribution = np.zeros(num_old, dtype=np.float64)
+    np.divide(old_pagerank * damping_factor, old_csr['out_degree'], out=old_contribution,
+              where=~np.asarray(old_csr['dangling']))
+
+    initial = np.zeros(num_pages, dtype=np.float64)
+
+    # 出链变化的原有页面：撤销旧出链上的贡献
+    old_changed = changed_sources[changed_sources < num_old]
+    positions, lengths = expand_ranges(old_csr['offsets'], old_changed)
+    old_targets = np.asarray(old_csr['targets'])[positions]
+    weights = np.repeat(old_contribution[old_changed], lengths)
+    keep = old_targets < num_old
+    initial -= np.bincount(old_targets[keep], weights=weights[keep], minlength=num_pages)
+
+    # 出链变化的页面：在新出链上加上新贡献（新页面的入链在下面整体计算）
+    positions, lengths = expand_ranges(csr['offsets'], changed_sources)
+    new_targets = targets[positions]
+    weights = np.repeat(contribution[changed_sources], lengths)
+    keep = new_targets < num_old
+    initial += np.bincount(new_targets[keep], weights=weights[keep], minlength=num_pages)
+
+    # 新页面：汇总全部入链贡献
+    keep = (targets >= num_old) & (targets < num_pages)
+    initial += np.bincount(targets[keep], weights=contribution[sources[keep]], minlength=num_pages)
+
+    # 页面数和无出链页面变化引起的基础值变化
+    new_base = pagerank[csr['dangling']].sum() * damping_factor / num_pages + teleportation
+    pending_base = new_base - old_base
+
+    pagerank += initial
+    unpushed = initial
+
+    print(f"Loaded {num_old} pages from {results_file}")
+    print(f"Pages after delta: {num_pages}, changed sources: {len(changed_sources)}, "
+          f"initially affected pages: {int(np.count_nonzero(initial))}")
+
+    pagerank, stats = incremental_pagerank(csr, pagerank, unpushed, pending_base, tolerance,
+                                           damping_factor=damping_factor)
+    return pagerank, csr, stats
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 3:
+        print("用法: python3 pagerank_incremental.py <上次结果文件> <边增量文件> [输出文件]")
+        print("示例: python3 pagerank_incremental.py pagerank_results.txt dataset/edges-delta.txt")
+        sys.exit(1)
+
+    results_file = sys.argv[1]
+    delta_file = sys.argv[2]
+    output_file = sys.argv[3] if len(sys.argv) >= 4 else "pagerank_results.txt"
+
+    for path in (results_file, delta_file):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    print("Starting incremental PageRank calculation...")
+    start_time = time.perf_counter()
+    pagerank, csr, stats = pagerank_incremental(results_file, delta_file)
+    elapsed = time.perf_counter() - start_time
+
+    save_csr_results(pagerank, csr, output_file)
+
+    num_edges = len(csr['targets'])
+    print("-" * 50)
+    print(f"Propagation rounds: {stats['rounds']} (uniform shifts: {stats['uniform_shifts']})")
+    print(f"Pushed vertices: {stats['pushed_vertices']}")
+    print(f"Pushed edges: {stats['pushed_edges']} "
+          f"({stats['pushed_edges'] / max(num_edges, 1):.2f} full-iteration equivalents)")
+    print(f"Elapsed time: {elapsed:.3f}s")
+    print(f"Results saved to: {output_file}")
+
+if __name__ == "__main__":
+    main()
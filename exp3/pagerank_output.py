@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+PageRank结果输出
+- Top-K：字典结果用堆选取，NumPy结果用argpartition选取，无需全量排序
+- 文本结果：按块格式化并写入，不会一次性生成全部输出行
+- 二进制结果：页面ID表 + float64 PageRank向量（.npz），供下游工具直接读取
+"""
+
+import heapq
+from itertools import islice
+
+# 文本结果每次格式化并写入的行数
+RESULTS_CHUNK_LINES = 65536
+
+def top_k_items(pagerank, k):
+    """
+    从字典结果中选取PageRank最高的k个页面，顺序与按值降序稳定排序后取前k个一致
+    Args:
+        pagerank: {page_id: rank}
+        k: 选取数量
+    Returns:
+        [(page_id, rank)]
+    """
+    return heapq.nlargest(k, pagerank.items(), key=lambda x: x[1])
+
+def top_k_indices(pagerank, k):
+    """
+    从PageRank向量中选取最高的k个下标，同分时下标小的在前（与稳定排序一致）
+    Args:
+        pagerank: PageRank向量
+        k: 选取数量
+    Returns:
+        下标数组，按PageRank降序
+    """
+    import numpy as np
+
+    num_pages = len(pagerank)
+    if k >= num_pages:
+        return np.argsort(-pagerank, kind='stable')
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # 先用argpartition找到第k大的值，再取所有不小于该值的候选，处理边界上的同分页面
+    kth_value = pagerank[np.argpartition(-pagerank, k - 1)[k - 1]]
+    candidates = np.flatnonzero(pagerank >= kth_value)
+    order = np.lexsort((candidates, -pagerank[candidates]))
+    return candidates[order[:k]]
+
+def format_result_line(page_id, rank, out_links):
+    """
+    格式化一行结果：pageId\tpageRank[\toutLink1,outLink2,...]
+    Args:
+        page_id: 页面ID
+        rank: PageRank值
+        out_links: 出链ID列表
+    Returns:
+        结果行（含换行符）
+    """
+    if out_links:
+        return f"{page_id}\t{rank:.6f}\t{','.join(out_links)}\n"
+    return f"{page_id}\t{rank:.6f}\n"
+
+def write_results_text(output_file, rows, chunk_lines=RESULTS_CHUNK_LINES):
+    """
+    分块写入文本结果
+    Args:
+        output_file: 输出文件路径
+        rows: 可迭代的(page_id, rank, out_links)，按输出顺序排列
+        chunk_lines: 每块的行数
+    """
+    rows = iter(rows)
+    with open(output_file, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+        while True:
+            chunk = [format_result_line(*row) for row in islice(rows, chunk_lines)]
+            if not chunk:
+                break
+            f.write(''.join(chunk))
+
+def write_results_binary(output_file, ids, pagerank, names=None):
+    """
+    写入二进制结果：ids_data/ids_offsets为UTF-8页面ID表，ranks为对应的float64 PageRank值；
+    ranks为二维矩阵时每一列对应一组结果，列名保存在names_data/names_offsets中
+    Args:
+        output_file: 输出文件路径（.npz）
+        ids: 可迭代的页面ID，与pagerank的行一一对应
+        pagerank: PageRank向量或(页面数 × 列数)矩阵
+        names: 各列名称，仅矩阵结果需要
+    """
+    import numpy as np
+    from graph_cache import encode_string_table
+
+    arrays = {'ranks': np.asarray(pagerank, dtype=np.float64)}
+    arrays['ids_data'], arrays['ids_offsets'] = encode_string_table(ids)
+    if names is not None:
+        arrays['names_data'], arrays['names_offsets'] = encode_string_table(names)
+    np.savez(output_file, **arrays)
+
+def load_results_binary(input_file):
+    """
+    读取二进制结果
+    Args:
+        input_file: 二进制结果文件路径
+    Returns:
+        ids: 页面ID表
+        pagerank: PageRank向量或矩阵
+        names: 矩阵结果的列名表，向量结果为None
+    """
+    import numpy as np
+    from graph_cache import StringTable
+
+    with np.load(input_file) as data:
+        ids = StringTable(data['ids_data'], data['ids_offsets'])
+        names = None
+        if 'names_data' in data:
+            names = StringTable(data['names_data'], data['names_offsets'])
+        return ids, data['ranks'], names
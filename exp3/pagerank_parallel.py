@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+多进程分区PageRank引擎
+与Java MapReduce版本的分工对应：
+- map阶段：按页面范围分区，计算每个页面分给出链的贡献值（对应PageRankMapper）
+- reduce阶段：按目标页面范围分区，沿入链汇总贡献值得到新的PageRank值（对应PageRankReducer）
+图数组和PageRank向量都放在multiprocessing.shared_memory中，工作进程只在启动时挂载一次
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pagerank_csr import build_in_links, csr_pagerank_iteration
+
+# 工作进程中挂载的共享数组 {name: ndarray}
+_shared_arrays = {}
+# 工作进程中持有的共享内存句柄，防止被回收
+_shared_blocks = []
+
+def _attach_shared(specs):
+    """
+    工作进程初始化：挂载父进程创建的共享内存
+    Args:
+        specs: {name: (shm_name, shape, dtype)}
+    """
+    for name, (shm_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=shm_name)
+        _shared_blocks.append(block)
+        _shared_arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _map_partition(start, end, damping_factor):
+    """
+    map阶段：计算[start, end)范围内页面的贡献值
+    Args:
+        start: 起始页面下标
+        end: 结束页面下标
+        damping_factor: 阻尼系数
+    Returns:
+        该分区无出链页面的PageRank之和
+    """
+    pagerank = _shared_arrays['pagerank'][start:end]
+    out_degree = _shared_arrays['out_degree'][start:end]
+    contribution = _shared_arrays['contribution'][start:end]
+
+    dangling = out_degree == 0
+    contribution[:] = 0.0
+    np.divide(pagerank * damping_factor, out_degree, out=contribution, where=~dangling)
+    return float(pagerank[dangling].sum())
+
+def _reduce_partition(start, end, base_rank):
+    """
+    reduce阶段：汇总[start, end)范围内页面的入链贡献值
+    Args:
+        start: 起始页面下标
+        end: 结束页面下标
+        base_rank: 跳转概率与无出链页面均分值之和
+    Returns:
+        该分区的总变化量
+    """
+    in_offsets = _shared_arrays['in_offsets']
+    lo, hi = in_offsets[start], in_offsets[end]
+    contribution = _shared_arrays['contribution']
+
+    local_targets = _shared_arrays['in_targets'][lo:hi] - start
+    sums = np.bincount(local_targets,
+                       weights=contribution[_shared_arrays['in_sources'][lo:hi]],
+                       minlength=end - start)
+
+    new_pagerank = _shared_arrays['new_pagerank'][start:end]
+    new_pagerank[:] = sums + base_rank
+    return float(np.abs(new_pagerank - _shared_arrays['pagerank'][start:end]).sum())
+
+def split_range(weights_cumsum, num_parts):
+    """
+    按累计权重将页面范围均分为若干分区
+    Args:
+        weights_cumsum: 累计权重（长度num_pages+1，首元素为0）
+        num_parts: 分区数量
+    Returns:
+        [(start, end)]
+    """
+    total = weights_cumsum[-1]
+    bounds = np.searchsorted(weights_cumsum, np.linspace(0, total, num_parts + 1))
+    bounds[0], bounds[-1] = 0, len(weights_cumsum) - 1
+    bounds = np.maximum.accumulate(bounds)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+class ParallelPageRank:
+    """
+    多进程PageRank迭代器，iteration方法与csr_pagerank_iteration签名一致，
+    使用完毕后需调用close释放进程池和共享内存
+    """
+
+    def __init__(self, csr, num_workers=None, damping_factor=0.85, teleportation=0.15):
+        self.num_pages = csr['num_pages']
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.damping_factor = damping_factor
+        self.teleportation = teleportation
+        self.iteration_times = []
+        self.blocks = []
+
+        in_offsets, in_sources, in_targets = build_in_links(csr)
+
+        specs = {}
+        self.arrays = {}
+        for name, value in (('in_offsets', in_offsets),
+                            ('in_targets', in_targets),
+                            ('in_sources', in_sources),
+                            ('out_degree', np.asarray(csr['out_degree'])),
+                            ('pagerank', np.zeros(self.num_pages)),
+                            ('contribution', np.zeros(self.num_pages)),
+                            ('new_pagerank', np.zeros(self.num_pages))):
+            block = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+            self.blocks.append(block)
+            array = np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)
+            array[:] = value
+            self.arrays[name] = array
+            specs[name] = (block.name, value.shape, value.dtype)
+
+        # map阶段按页面数均分，reduce阶段按入链数均分
+        self.map_partitions = split_range(np.arange(self.num_pages + 1), self.num_workers)
+        self.reduce_partitions = split_range(in_offsets, self.num_workers)
+
+        self.executor = ProcessPoolExecutor(max_workers=self.num_workers,
+                                            initializer=_attach_shared,
+                                            initargs=(specs,))
+
+        # 单进程CSR引擎的单次迭代耗时，作为加速比基准
+        start_time = time.perf_counter()
+        csr_pagerank_iteration(csr, np.ones(self.num_pages), damping_factor, teleportation)
+        self.baseline_time = time.perf_counter() - start_time
+
+    def iteration(self, csr, pagerank):
+        """
+        执行一次并行PageRank迭代
+        Args:
+            csr: CSR图结构（图数据已在共享内存中，此参数仅为保持签名一致）
+            pagerank: 当前PageRank向量
+        Returns:
+            new_pagerank: 新的PageRank向量
+            total_diff: 总变化量
+        """
+        start_time = time.perf_counter()
+        self.arrays['pagerank'][:] = pagerank
+
+        # map阶段
+        futures = [self.executor.submit(_map_partition, start, end, self.damping_factor)
+                   for start, end in self.map_partitions]
+        dangling_sum = sum(f.result() for f in futures)
+        base_rank = dangling_sum * self.damping_factor / self.num_pages + self.teleportation
+
+        # reduce阶段
+        futures = [self.executor.submit(_reduce_partition, start, end, base_rank)
+                   for start, end in self.reduce_partitions]
+        total_diff = sum(f.result() for f in futures)
+
+        new_pagerank = self.arrays['new_pagerank'].copy()
+
+        elapsed = time.perf_counter() - start_time
+        self.iteration_times.append(elapsed)
+        speedup = self.baseline_time / elapsed if elapsed > 0 else 0.0
+        print(f"  [{self.num_workers} workers] wall time = {elapsed:.4f}s, "
+              f"speedup vs single-process = {speedup:.2f}x")
+        return new_pagerank, total_diff
+
+    def report(self):
+        """打印并行迭代耗时汇总"""
+        if not self.iteration_times:
+            return
+        avg_time = sum(self.iteration_times) / len(self.iteration_times)
+        speedup = self.baseline_time / avg_time if avg_time > 0 else 0.0
+        print(f"Parallel workers: {self.num_workers}")
+        print(f"Single-process iteration time: {self.baseline_time:.4f}s")
+        print(f"Average parallel iteration time: {avg_time:.4f}s")
+        print(f"Average speedup: {speedup:.2f}x")
+
+    def close(self):
+        """关闭进程池并释放共享内存"""
+        self.executor.shutdown()
+        self.arrays.clear()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
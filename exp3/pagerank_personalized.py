@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+个性化（主题敏感）PageRank批量计算
+加载一次图，对多组种子页面同时迭代一个(页面数 × 种子组数)的PageRank矩阵，
+每一列使用各自的跳转向量：跳转和无出链页面的PageRank都只分配给该组种子页面。
+跳转向量为全部页面均匀分布时，结果与main.py的标准PageRank一致
+
+种子文件格式（每行一组）：
+    name\tpage_id1,page_id2,...
+"""
+
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from graph_cache import load_cached_graph
+from graph_loader import page_index
+from pagerank_csr import build_in_links, save_csr_results
+from pagerank_output import write_results_binary
+
+# 单次迭代中按入链展开的贡献值矩阵的内存上限，超过时按列分批计算
+EDGE_BUFFER_BYTES = 256 * 1024 * 1024
+
+def load_seed_sets(seeds_file, csr):
+    """
+    加载种子页面组
+    Args:
+        seeds_file: 种子文件路径
+        csr: CSR图结构
+    Returns:
+        names: 种子组名称列表
+        seed_sets: 每组种子页面的下标数组
+    Raises:
+        ValueError: 种子组名称重复
+    """
+    index = page_index(csr)
+    num_pages = csr['num_pages']
+    names = []
+    seed_sets = []
+
+    with open(seeds_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            if len(parts) < 2:
+                print(f"Warning: skipping malformed seed line: {line}")
+                continue
+
+            name = parts[0].strip()
+            if name in names:
+                raise ValueError(f"duplicate seed set name: {name}")
+            seeds = []
+            for page_id in parts[1].split(','):
+                i = index.get(page_id.strip())
+                if i is not None and i < num_pages:
+                    seeds.append(i)
+                elif page_id.strip():
+                    print(f"Warning: seed page {page_id.strip()} of {name} not found")
+
+            if not seeds:
+                print(f"Warning: seed set {name} has no known pages, skipped")
+                continue
+            names.append(name)
+            seed_sets.append(np.unique(np.array(seeds, dtype=np.int64)))
+
+    return names, seed_sets
+
+def result_filenames(names):
+    """
+    为每组种子生成结果文件名：名称中路径分隔符等字符替换为下划线，
+    替换后为空、以点开头或与其他组重名时使用组序号
+    Args:
+        names: 种子组名称列表
+    Returns:
+        文件名列表（不含目录）
+    """
+    filenames = []
+    for j, name in enumerate(names):
+        safe = re.sub(r'[^\w.-]', '_', name)
+        if not safe or safe.startswith('.') or f"{safe}.txt" in filenames:
+            safe = f"seed_set_{j}"
+        while f"{safe}.txt" in filenames:
+            safe += '_'
+        filenames.append(f"{safe}.txt")
+    return filenames
+
+def teleport_matrix(num_pages, seed_sets):
+    """
+    构建跳转矩阵，每列在该组种子页面上均匀分布
+    Args:
+        num_pages: 页面数量
+        seed_sets: 每组种子页面的下标数组
+    Returns:
+        (页面数 × 种子组数)矩阵，每列和为1
+    """
+    teleport = np.zeros((num_pages, len(seed_sets)), dtype=np.float64)
+    for j, seeds in enumerate(seed_sets):
+        teleport[seeds, j] = 1.0 / len(seeds)
+    return teleport
+
+def personalized_pagerank(csr, seed_sets, max_iterations=100, convergence_threshold=0.001,
+                          damping_factor=0.85, teleportation=0.15):
+    """
+    批量计算个性化PageRank
+    Args:
+        csr: CSR图结构
+        seed_sets: 每组种子页面的下标数组
+        max_iterations: 最大迭代次数
+        convergence_threshold: 收敛阈值（每列的平均变化量）
+        damping_factor: 阻尼系数
+        teleportation: 跳转概率
+    Returns:
+        pagerank: (页面数 × 种子组数)的PageRank矩阵
+        iterations: 每列收敛所用的迭代次数
+    """
+    num_pages = csr['num_pages']
+    num_sets = len(seed_sets)
+    out_degree = np.asarray(csr['out_degree'])
+    dangling = np.asarray(csr['dangling'])
+    in_offsets, in_sources, _ = build_in_links(csr)
+
+    # reduceat只处理有入链的页面，空区间的结果保持为0
+    has_in_links = np.diff(in_offsets) > 0
+    segment_starts = in_offsets[:-1][has_in_links]
+    scale = np.zeros(num_pages, dtype=np.float64)
+    np.divide(damping_factor, out_degree, out=scale, where=~dangling)
+
+    pagerank = np.ones((num_pages, num_sets), dtype=np.float64)
+    iterations = np.zeros(num_sets, dtype=np.int64)
+    block_size = max(1, EDGE_BUFFER_BYTES // max(len(in_sources) * 8, 1))
+
+    for block_start in range(0, num_sets, block_size):
+        columns = np.arange(block_start, min(block_start + block_size, num_sets))
+        teleport = teleport_matrix(num_pages, [seed_sets[j] for j in columns])
+        base = teleport * (teleportation * num_pages)
+        rank = pagerank[:, columns]
+        active = np.arange(len(columns))
+
+        for iteration in range(max_iterations):
+            current = rank[:, active]
+            contribution = current * scale[:, None]
+
+            new_rank = np.zeros_like(current)
+            if len(segment_starts):
+                new_rank[has_in_links] = np.add.reduceat(contribution[in_sources],
+                                                         segment_starts, axis=0)
+            dangling_sum = current[dangling].sum(axis=0)
+            new_rank += base[:, active] + teleport[:, active] * (dangling_sum * damping_factor)
+
+            avg_diff = np.abs(new_rank - current).sum(axis=0) / num_pages
+            rank[:, active] = new_rank
+            iterations[columns[active]] = iteration + 1
+
+            # 已收敛的列不再参与后续迭代
+            active = active[avg_diff >= convergence_threshold]
+            if not len(active):
+                break
+
+        pagerank[:, columns] = rank
+
+    return pagerank, iterations
+
+def main():
+    """主函数"""
+    if len(sys.argv) < 3:
+        print("用法: python3 pagerank_personalized.py <种子文件> <输出目录|输出文件.npz> [边文件] [顶点文件]")
+        print("示例: python3 pagerank_personalized.py dataset/seeds.txt personalized/")
+        print("      python3 pagerank_personalized.py dataset/seeds.txt personalized.npz")
+        sys.exit(1)
+
+    seeds_file = sys.argv[1]
+    output_path = sys.argv[2]
+    edges_file = sys.argv[3] if len(sys.argv) >= 4 else "dataset/wiki-edges.txt"
+    vertices_file = sys.argv[4] if len(sys.argv) >= 5 else "dataset/wiki-vertices.txt"
+
+    for path in (seeds_file, edges_file, vertices_file):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    csr = load_cached_graph(edges_file, vertices_file)
+    try:
+        names, seed_sets = load_seed_sets(seeds_file, csr)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not seed_sets:
+        print("Error: no valid seed sets")
+        sys.exit(1)
+
+    print(f"Loaded {csr['num_pages']} pages, {len(seed_sets)} seed sets")
+    start_time = time.perf_counter()
+    pagerank, iterations = personalized_pagerank(csr, seed_sets)
+    elapsed = time.perf_counter() - start_time
+    print(f"Iterations per seed set: min {iterations.min()}, max {iterations.max()}")
+    print(f"Elapsed time: {elapsed:.3f}s")
+
+    if output_path.endswith('.npz'):
+        # 单个列式文件，每列对应一组种子
+        ids = (csr['ids'][i] for i in range(csr['num_pages']))
+        write_results_binary(output_path, ids, pagerank, names)
+    else:
+        # 每组种子一个结果文件，格式与pagerank_results.txt相同
+        os.makedirs(output_path, exist_ok=True)
+        for j, filename in enumerate(result_filenames(names)):
+            save_csr_results(pagerank[:, j], csr, os.path.join(output_path, filename))
+
+    print(f"Results saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
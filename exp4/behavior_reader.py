@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户行为日志的分块流式读取
+按大块读取字节并解析为记录批次，跳过标题行和格式不正确的行并计数，
+调用方逐批增量计算，内存占用与日志行数无关
+"""
+
+import csv
+
+# 每次从日志读取的字节数
+BLOCK_SIZE = 16 * 1024 * 1024
+# 报告中保留的格式不正确的行数
+MAX_REJECTED_SAMPLES = 5
+
+def read_blocks(filename, block_size=BLOCK_SIZE):
+    """
+    按块读取文件，每块只包含完整的行（以换行符结尾），文件开头的标题行被去掉
+    Args:
+        filename: 文件路径
+        block_size: 每次读取的字节数
+    Yields:
+        bytes
+    """
+    with open(filename, "rb") as f:
+        rest = b""
+        first = True
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            end = chunk.rfind(b"\n") + 1
+            block, rest = chunk[:end], chunk[end:]
+            if first and block:
+                first = False
+                if block.startswith(b"user_id"):
+                    block = block[block.find(b"\n") + 1:]
+            if block:
+                yield block
+        if rest:
+            yield rest if rest.endswith(b"\n") else rest + b"\n"
+
+class ReadStats:
+    """
+    读取过程的统计：有效记录数、被跳过的行数和部分被跳过的行
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.rejected = 0
+        self.rejected_samples = []
+
+    def reject(self, row):
+        """记录一行格式不正确的数据"""
+        self.rejected += 1
+        if len(self.rejected_samples) < MAX_REJECTED_SAMPLES:
+            self.rejected_samples.append(",".join(row))
+
+    def report(self):
+        """打印读取统计"""
+        print(f"📥 读取了 {self.records} 条有效记录")
+        if self.rejected:
+            print(f"⚠️  跳过了 {self.rejected} 行格式不正确的数据（字段数不是4或数字无法解析），例如:")
+            for sample in self.rejected_samples:
+                print(f"    {sample}")
+
+def parse_block(block, stats):
+    """
+    解析一块完整的行，空行忽略，字段数不是4或数字无法解析的行计入stats.rejected
+    Args:
+        block: bytes
+        stats: ReadStats
+    Returns:
+        [(user_id, item_id, behavior, timestamp)]
+    """
+    records = []
+    append = records.append
+    for row in csv.reader(block.decode("utf-8").splitlines()):
+        if not row:
+            continue
+        if len(row) == 4:
+            try:
+                append((int(row[0]), int(row[1]), row[2], int(row[3])))
+                continue
+            except ValueError:
+                pass
+        stats.reject(row)
+    stats.records += len(records)
+    return records
+
+def iter_batches(filename, block_size=BLOCK_SIZE, stats=None):
+    """
+    流式读取行为日志
+    Args:
+        filename: CSV文件路径 (user_id,item_id,behavior,timestamp)
+        block_size: 每次读取的字节数，每批记录来自一块
+        stats: ReadStats，就地更新；为None时不对外报告
+    Yields:
+        [(user_id, item_id, behavior, timestamp)]
+    """
+    if stats is None:
+        stats = ReadStats()
+    for block in read_blocks(filename, block_size):
+        batch = parse_block(block, stats)
+        if batch:
+            yield batch
@@ -8,6 +8,58 @@
 from pyspark import SparkContext
 import sys
 
+# 聚合时表示缺少某种行为的时间戳
+NO_CLICK = float('inf')
+NO_BUY = float('-inf')
+
+def parse_line(line):
+    """解析数据格式: (user_id, item_id, behavior, timestamp)"""
+    parts = line.strip().split(',')
+    return (int(parts[0]), int(parts[1]), parts[2], int(parts[3]))
+
+def compute_conversion_rates(clicks, buys):
+    """
+    由点击和购买记录计算每个用户的转化率
+    
+    Args:
+        clicks: 点击记录RDD，元素为((user_id, item_id), timestamp)
+        buys: 购买记录RDD，元素为((user_id, item_id), timestamp)
+    
+    Returns:
+        (user_id, conversion_rate)的RDD
+    """
+    # 按(user_id, item_id)聚合最早点击时间和最晚购买时间，每个键只保留一条记录，
+    # 避免clicks×buys连接按点击次数×购买次数膨胀，shuffle与输入规模成线性
+    # 没有点击的键最早点击时间为+inf，没有购买的键最晚购买时间为-inf
+    item_times = clicks.mapValues(lambda t: (t, NO_BUY)) \
+                       .union(buys.mapValues(lambda t: (NO_CLICK, t))) \
+                       .reduceByKey(lambda a, b: (min(a[0], b[0]), max(a[1], b[1])))
+    
+    # 最晚购买晚于最早点击即存在"点击→购买"路径
+    def to_user_counts(item_time):
+        (user_id, item_id), (first_time, last_buy) = item_time
+        return (user_id, (1, 1 if last_buy > first_time else 0))
+    
+    # 统计每个用户点击过的不同商品数和有转化的不同商品数
+    user_counts = item_times.filter(lambda x: x[1][0] != NO_CLICK) \
+                            .map(to_user_counts) \
+                            .reduceByKey(lambda a, b: (a[0] + b[0], a[1] + b[1]))
+    
+    # 计算转化率
+    def calculate_rate(counts):
+        total_count, converted_count = counts
+        return round(converted_count / total_count, 2)
+    
+    return user_counts.mapValues(calculate_rate)
+
+def print_conversion_rates(results):
+    """打印转化率结果用于验证"""
+    print("=== 用户点击到购买转化率结果 ===")
+    for user_id, rate in sorted(results):
+        print(f"用户 {user_id}: 转化率 = {rate}")
+    
+    print(f"\n总用户数: {len(results)}")
+
 def calculate_conversion_rate(input_path, output_path):
     """
     计算用户点击到购买的转化率
@@ -22,12 +74,6 @@ def calculate_conversion_rate(input_path, output_path):
     try:
         # 读取输入数据
         lines = sc.textFile(input_path)
-        
-        # 解析数据格式: (user_id, item_id, behavior, timestamp)
-        def parse_line(line):
-            parts = line.strip().split(',')
-            return (int(parts[0]), int(parts[1]), parts[2], int(parts[3]))
-        
         data = lines.map(parse_line)
         
         # 过滤出click行为，映射为(user_id, item_id) -> timestamp
@@ -38,49 +84,13 @@ def calculate_conversion_rate(input_path, output_path):
         buys = data.filter(lambda x: x[2] == "buy") \
                    .map(lambda x: ((x[0], x[1]), x[3]))
         
-        # 找出有点击且有购买的商品（购买时间 > 点击时间）
-        def has_valid_conversion(click_buy_pair):
-            (user_item, (click_time, buy_time)) = click_buy_pair
-            return buy_time > click_time
-        
-        # 连接点击和购买数据
-        click_buy_pairs = clicks.join(buys)
-        
-        # 筛选出有效的转化（购买时间 > 点击时间）
-        valid_conversions = click_buy_pairs.filter(has_valid_conversion)
-        
-        # 统计每个用户有转化的商品数
-        user_converted_items = valid_conversions.map(lambda x: (x[0][0], 1)) \
-                                               .reduceByKey(lambda a, b: a + b)
-        
-        # 统计每个用户点击过的商品数
-        user_clicked_items = clicks.map(lambda x: (x[0][0], 1)) \
-                                  .reduceByKey(lambda a, b: a + b)
-        
-        # 计算转化率（左连接，确保没有点击的用户也能被包含）
-        def calculate_rate(clicked_count, converted_count):
-            if converted_count is None:
-                converted_count = 0
-            if clicked_count is None or clicked_count == 0:
-                return 0.0
-            return round(converted_count / clicked_count, 2)
-        
-        # 全外连接确保所有用户都被包含
-        all_users = user_clicked_items.fullOuterJoin(user_converted_items)
-        
-        # 计算转化率
-        conversion_rates = all_users.map(lambda x: (x[0], calculate_rate(x[1][0], x[1][1])))
+        conversion_rates = compute_conversion_rates(clicks, buys)
         
         # 保存结果
         conversion_rates.saveAsTextFile(output_path)
         
         # 收集并打印部分结果用于验证
-        results = conversion_rates.collect()
-        print("=== 用户点击到购买转化率结果 ===")
-        for user_id, rate in sorted(results):
-            print(f"用户 {user_id}: 转化率 = {rate}")
-        
-        print(f"\n总用户数: {len(results)}")
+        print_conversion_rates(conversion_rates.collect())
         
     finally:
         # 关闭SparkContext
@@ -8,6 +8,64 @@
 from pyspark import SparkContext
 import sys
 
+# 聚合时表示缺少某种行为的时间戳
+NO_CART = float('inf')
+NO_BUY = float('-inf')
+
+def parse_line(line):
+    """解析数据格式: (user_id, item_id, behavior, timestamp)"""
+    parts = line.strip().split(',')
+    return (int(parts[0]), int(parts[1]), parts[2], int(parts[3]))
+
+def compute_cart_to_buy_rates(carts, buys):
+    """
+    由加购和购买记录计算每个用户的加购后购买率
+    
+    Args:
+        carts: 加购记录RDD，元素为((user_id, item_id), timestamp)
+        buys: 购买记录RDD，元素为((user_id, item_id), timestamp)
+    
+    Returns:
+        (user_id, cart_to_buy_rate)的RDD
+    """
+    # 按(user_id, item_id)聚合最早加购时间和最晚购买时间，每个键只保留一条记录，
+    # 避免carts×buys连接按加购次数×购买次数膨胀，shuffle与输入规模成线性
+    # 没有加购的键最早加购时间为+inf，没有购买的键最晚购买时间为-inf
+    item_times = carts.mapValues(lambda t: (t, NO_BUY)) \
+                      .union(buys.mapValues(lambda t: (NO_CART, t))) \
+                      .reduceByKey(lambda a, b: (min(a[0], b[0]), max(a[1], b[1])))
+    
+    # 最晚购买晚于最早加购即存在"加购→购买"路径
+    def to_user_counts(item_time):
+        (user_id, item_id), (first_time, last_buy) = item_time
+        return (user_id, (1, 1 if last_buy > first_time else 0))
+    
+    # 统计每个用户加购过的不同商品数和有转化的不同商品数
+    user_counts = item_times.filter(lambda x: x[1][0] != NO_CART) \
+                            .map(to_user_counts) \
+                            .reduceByKey(lambda a, b: (a[0] + b[0], a[1] + b[1]))
+    
+    # 计算加购后购买率
+    def calculate_rate(counts):
+        total_count, converted_count = counts
+        return round(converted_count / total_count, 2)
+    
+    return user_counts.mapValues(calculate_rate)
+
+def print_cart_to_buy_rates(results):
+    """打印加购后购买率结果和关键指标"""
+    print("=== 用户加购后购买率结果 ===")
+    for user_id, rate in sorted(results):
+        print(f"用户 {user_id}: 加购后购买率 = {rate}")
+    
+    print(f"\n总用户数: {len(results)}")
+    
+    # 统计一些关键指标
+    total_users = len(results)
+    users_with_carts = sum(1 for _, rate in results if rate > 0)
+    print(f"有加购行为的用户数: {users_with_carts}")
+    print(f"加购用户占比: {round(users_with_carts/total_users*100, 2)}%")
+
 def calculate_cart_to_buy_rate(input_path, output_path):
     """
     计算用户加购后购买率
@@ -22,12 +80,6 @@ def calculate_cart_to_buy_rate(input_path, output_path):
     try:
         # 读取输入数据
         lines = sc.textFile(input_path)
-        
-        # 解析数据格式: (user_id, item_id, behavior, timestamp)
-        def parse_line(line):
-            parts = line.strip().split(',')
-            return (int(parts[0]), int(parts[1]), parts[2], int(parts[3]))
-        
         data = lines.map(parse_line)
         
         # 过滤出cart行为，映射为(user_id, item_id) -> timestamp
@@ -38,55 +90,13 @@ def calculate_cart_to_buy_rate(input_path, output_path):
         buys = data.filter(lambda x: x[2] == "buy") \
                    .map(lambda x: ((x[0], x[1]), x[3]))
         
-        # 找出有加购且有购买的商品（购买时间 > 加购时间）
-        def has_valid_cart_buy_conversion(cart_buy_pair):
-            (user_item, (cart_time, buy_time)) = cart_buy_pair
-            return buy_time > cart_time
-        
-        # 连接加购和购买数据
-        cart_buy_pairs = carts.join(buys)
-        
-        # 筛选出有效的转化（购买时间 > 加购时间）
-        valid_conversions = cart_buy_pairs.filter(has_valid_cart_buy_conversion)
-        
-        # 统计每个用户有加购后购买的商品数
-        user_converted_items = valid_conversions.map(lambda x: (x[0][0], 1)) \
-                                              .reduceByKey(lambda a, b: a + b)
-        
-        # 统计每个用户加购过的商品数
-        user_carted_items = carts.map(lambda x: (x[0][0], 1)) \
-                                 .reduceByKey(lambda a, b: a + b)
-        
-        # 计算加购后购买率（左连接，确保没有加购的用户也能被包含）
-        def calculate_rate(carted_count, converted_count):
-            if converted_count is None:
-                converted_count = 0
-            if carted_count is None or carted_count == 0:
-                return 0.0
-            return round(converted_count / carted_count, 2)
-        
-        # 全外连接确保所有用户都被包含
-        all_users = user_carted_items.fullOuterJoin(user_converted_items)
-        
-        # 计算加购后购买率
-        cart_to_buy_rates = all_users.map(lambda x: (x[0], calculate_rate(x[1][0], x[1][1])))
+        cart_to_buy_rates = compute_cart_to_buy_rates(carts, buys)
         
         # 保存结果
         cart_to_buy_rates.saveAsTextFile(output_path)
         
         # 收集并打印部分结果用于验证
-        results = cart_to_buy_rates.collect()
-        print("=== 用户加购后购买率结果 ===")
-        for user_id, rate in sorted(results):
-            print(f"用户 {user_id}: 加购后购买率 = {rate}")
-        
-        print(f"\n总用户数: {len(results)}")
-        
-        # 统计一些关键指标
-        total_users = len(results)
-        users_with_carts = sum(1 for _, rate in results if rate > 0)
-        print(f"有加购行为的用户数: {users_with_carts}")
-        print(f"加购用户占比: {round(users_with_carts/total_users*100, 2)}%")
+        print_cart_to_buy_rates(cart_to_buy_rates.collect())
         
     finally:
         # 关闭SparkContext
@@ -4,158 +4,108 @@
 本地测试脚本 - 在不依赖Spark的情况下验证算法逻辑
 """
 
-import csv
 from collections import defaultdict
 import time
 
-def load_data(filename):
-    """加载测试数据"""
-    data = []
-    with open(filename, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        is_first_line = True
-        for row in reader:
-            # 跳过CSV标题行
-            if is_first_line and row and row[0] == 'user_id':
-                is_first_line = False
-                continue
-            if len(row) == 4:
-                try:
-                    user_id, item_id, behavior, timestamp = row
-                    data.append((int(user_id), int(item_id), behavior, int(timestamp)))
-                except ValueError:
-                    continue  # 跳过格式不正确的行
-    return data
+from behavior_reader import ReadStats, iter_batches
 
-def test_task1(data):
-    """测试任务1：用户点击到购买转化率"""
-    print("\n=== 任务1测试：用户点击到购买转化率 ===")
-    
-    # 统计每个用户点击和购买的商品
-    user_clicks = defaultdict(set)  # 用户点击的商品集合
-    user_conversions = defaultdict(set)  # 用户有转化的商品集合（点击后购买）
-    
-    # 先按用户-商品分组，收集行为
-    user_item_behaviors = defaultdict(list)
-    for user_id, item_id, behavior, timestamp in data:
-        user_item_behaviors[(user_id, item_id)].append((behavior, timestamp))
-    
-    # 分析每个用户-商品的行为序列
-    for (user_id, item_id), behaviors in user_item_behaviors.items():
-        has_click = False
-        click_time = None
-        
-        # 按时间排序
-        behaviors.sort(key=lambda x: x[1])
-        
-        for behavior, timestamp in behaviors:
+# 任务3的筛选条件
+MIN_CLICKS = 10
+MAX_CART_RATE = 0.2
+
+class ConversionFold:
+    """
+    按批累积每个(用户, 商品)的最早起始行为时间和最晚购买时间，
+    最晚购买晚于最早起始行为即存在"起始行为→购买"路径，状态大小只与不同的(用户, 商品)数有关
+    """
+
+    def __init__(self, first_behavior):
+        self.first_behavior = first_behavior
+        self.first_times = {}  # (user_id, item_id) -> 最早起始行为时间
+        self.last_buys = {}    # (user_id, item_id) -> 最晚购买时间
+
+    def add(self, batch):
+        """累积一批(user_id, item_id, behavior, timestamp)记录"""
+        first_times = self.first_times
+        last_buys = self.last_buys
+        for user_id, item_id, behavior, timestamp in batch:
+            if behavior == self.first_behavior:
+                key = (user_id, item_id)
+                first_time = first_times.get(key)
+                if first_time is None or timestamp < first_time:
+                    first_times[key] = timestamp
+            elif behavior == "buy":
+                key = (user_id, item_id)
+                last_buy = last_buys.get(key)
+                if last_buy is None or timestamp > last_buy:
+                    last_buys[key] = timestamp
+
+    def user_counts(self):
+        """
+        Returns:
+            {user_id: [有起始行为的商品数, 有转化的商品数]}
+        """
+        counts = defaultdict(lambda: [0, 0])
+        for (user_id, item_id), first_time in self.first_times.items():
+            user_count = counts[user_id]
+            user_count[0] += 1
+            last_buy = self.last_buys.get((user_id, item_id))
+            if last_buy is not None and last_buy > first_time:
+                user_count[1] += 1
+        return counts
+
+class ItemCountFold:
+    """
+    按批累积每个商品的点击和加购次数
+    """
+
+    def __init__(self):
+        self.item_clicks = defaultdict(int)
+        self.item_carts = defaultdict(int)
+
+    def add(self, batch):
+        """累积一批(user_id, item_id, behavior, timestamp)记录"""
+        for user_id, item_id, behavior, timestamp in batch:
             if behavior == "click":
-                has_click = True
-                click_time = timestamp
-            elif behavior == "buy" and has_click and timestamp > click_time:
-                user_conversions[user_id].add(item_id)
-                break  # 找到转化就可以停止了
-        
-        # 统计点击的商品
-        if any(b[0] == "click" for b in behaviors):
-            user_clicks[user_id].add(item_id)
+                self.item_clicks[item_id] += 1
+            elif behavior == "cart":
+                self.item_carts[item_id] += 1
+
+def report_task1(fold):
+    """输出任务1结果：用户点击到购买转化率"""
+    print("\n=== 任务1测试：用户点击到购买转化率 ===")
     
-    # 计算转化率
     results = []
-    all_users = set(user_clicks.keys()) | set(user_conversions.keys())
-    
-    for user_id in all_users:
-        clicked_count = len(user_clicks[user_id])
-        converted_count = len(user_conversions[user_id])
-        
-        if clicked_count == 0:
-            conversion_rate = 0.0
-        else:
-            conversion_rate = round(converted_count / clicked_count, 2)
-        
+    for user_id, (clicked_count, converted_count) in fold.user_counts().items():
+        conversion_rate = round(converted_count / clicked_count, 2)
         results.append((user_id, conversion_rate))
         print(f"用户 {user_id}: 点击商品 {clicked_count} 个，转化商品 {converted_count} 个，转化率 = {conversion_rate}")
     
     return results
 
-def test_task2(data):
-    """测试任务2：用户加购后购买率"""
+def report_task2(fold):
+    """输出任务2结果：用户加购后购买率"""
     print("\n=== 任务2测试：用户加购后购买率 ===")
     
-    # 统计每个用户加购和购买的商品
-    user_carts = defaultdict(set)  # 用户加购的商品集合
-    user_cart_conversions = defaultdict(set)  # 用户有加购转化的商品集合（加购后购买）
-    
-    # 先按用户-商品分组，收集行为
-    user_item_behaviors = defaultdict(list)
-    for user_id, item_id, behavior, timestamp in data:
-        user_item_behaviors[(user_id, item_id)].append((behavior, timestamp))
-    
-    # 分析每个用户-商品的行为序列
-    for (user_id, item_id), behaviors in user_item_behaviors.items():
-        has_cart = False
-        cart_time = None
-        
-        # 按时间排序
-        behaviors.sort(key=lambda x: x[1])
-        
-        for behavior, timestamp in behaviors:
-            if behavior == "cart":
-                has_cart = True
-                cart_time = timestamp
-            elif behavior == "buy" and has_cart and timestamp > cart_time:
-                user_cart_conversions[user_id].add(item_id)
-                break  # 找到转化就可以停止了
-        
-        # 统计加购的商品
-        if any(b[0] == "cart" for b in behaviors):
-            user_carts[user_id].add(item_id)
-    
-    # 计算加购后购买率
     results = []
-    all_users = set(user_carts.keys()) | set(user_cart_conversions.keys())
-    
-    for user_id in all_users:
-        carted_count = len(user_carts[user_id])
-        converted_count = len(user_cart_conversions[user_id])
-        
-        if carted_count == 0:
-            cart_to_buy_rate = 0.0
-        else:
-            cart_to_buy_rate = round(converted_count / carted_count, 2)
-        
+    for user_id, (carted_count, converted_count) in fold.user_counts().items():
+        cart_to_buy_rate = round(converted_count / carted_count, 2)
         results.append((user_id, cart_to_buy_rate))
         print(f"用户 {user_id}: 加购商品 {carted_count} 个，加购后购买商品 {converted_count} 个，加购购买率 = {cart_to_buy_rate}")
     
     return results
 
-def test_task3(data):
-    """测试任务3：高曝光低加购商品识别"""
+def report_task3(fold):
+    """输出任务3结果：高曝光低加购商品识别"""
     print("\n=== 任务3测试：高曝光低加购商品识别 ===")
     
-    MIN_CLICKS = 10
-    MAX_CART_RATE = 0.2
-    
-    # 统计每个商品的点击和加购次数
-    item_clicks = defaultdict(int)
-    item_carts = defaultdict(int)
-    
-    for user_id, item_id, behavior, timestamp in data:
-        if behavior == "click":
-            item_clicks[item_id] += 1
-        elif behavior == "cart":
-            item_carts[item_id] += 1
-    
     # 找出符合条件的商品
     results = []
-    all_items = set(item_clicks.keys()) | set(item_carts.keys())
-    
-    for item_id in all_items:
-        click_count = item_clicks[item_id]
-        cart_count = item_carts[item_id]
+    for item_id, click_count in fold.item_clicks.items():
+        cart_count = fold.item_carts.get(item_id, 0)
         
         if click_count >= MIN_CLICKS:
-            cart_conversion_rate = round(cart_count / click_count, 2) if click_count > 0 else 0.0
+            cart_conversion_rate = round(cart_count / click_count, 2)
             
             if cart_conversion_rate <= MAX_CART_RATE:
                 results.append((item_id, click_count, cart_count, cart_conversion_rate))
@@ -167,30 +117,55 @@ def test_task3(data):
     print(f"\n找到 {len(results)} 个符合条件的商品")
     return results
 
+def test_task1(data):
+    """测试任务1：用户点击到购买转化率（data为记录列表）"""
+    fold = ConversionFold("click")
+    fold.add(data)
+    return report_task1(fold)
+
+def test_task2(data):
+    """测试任务2：用户加购后购买率（data为记录列表）"""
+    fold = ConversionFold("cart")
+    fold.add(data)
+    return report_task2(fold)
+
+def test_task3(data):
+    """测试任务3：高曝光低加购商品识别（data为记录列表）"""
+    fold = ItemCountFold()
+    fold.add(data)
+    return report_task3(fold)
+
 def main():
     """主函数"""
     print("🧪 开始本地算法测试...")
     
-    # 加载测试数据
+    # 流式读取测试数据，三个任务在同一遍读取中逐批累积
+    stats = ReadStats()
+    task1 = ConversionFold("click")
+    task2 = ConversionFold("cart")
+    task3 = ItemCountFold()
+    start_time = time.time()
+    
     try:
-        data = load_data("data/user_behavior_logs.csv")
-        print(f"加载了 {len(data)} 条测试数据")
-        
-        # 显示前几条数据
-        print("\n前5条数据样本:")
-        for i, record in enumerate(data[:5]):
-            print(f"  {i+1}. user_id={record[0]}, item_id={record[1]}, behavior={record[2]}, timestamp={record[3]}")
-        
+        for i, batch in enumerate(iter_batches("data/user_behavior_logs.csv", stats=stats)):
+            if i == 0:
+                # 显示前几条数据
+                print("\n前5条数据样本:")
+                for j, record in enumerate(batch[:5]):
+                    print(f"  {j+1}. user_id={record[0]}, item_id={record[1]}, behavior={record[2]}, timestamp={record[3]}")
+            task1.add(batch)
+            task2.add(batch)
+            task3.add(batch)
     except FileNotFoundError:
         print("❌ 测试数据文件 data/user_behavior_logs.csv 不存在，请先准备数据文件")
         return
     
-    # 执行任务测试
-    start_time = time.time()
+    stats.report()
     
-    results1 = test_task1(data)
-    results2 = test_task2(data)
-    results3 = test_task3(data)
+    # 输出各任务结果
+    results1 = report_task1(task1)
+    results2 = report_task2(task2)
+    results3 = report_task3(task3)
     
     end_time = time.time()
     
@@ -198,7 +173,8 @@ def main():
     print(f"\n{'='*60}")
     print("📊 本地测试总结")
     print(f"{'='*60}")
-    print(f"测试数据量: {len(data)} 条记录")
+    print(f"测试数据量: {stats.records} 条记录")
+    print(f"跳过的格式不正确的行: {stats.rejected} 行")
     print(f"任务1结果数: {len(results1)} 个用户")
     print(f"任务2结果数: {len(results2)} 个用户")
     print(f"任务3结果数: {len(results3)} 个商品")
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量化的本地计算引擎
+行为日志按大块读取并直接解析为列式数组（user_id/item_id为int32，行为为uint8编码，时间戳为int64），
+三个任务都用排序加分组归约计算，不为每条记录创建Python对象；
+结果与local_test.py一致，可作为快速的基准结果与Spark的输出对比
+"""
+
+import argparse
+import ast
+import csv
+import glob
+import io
+import os
+import time
+import warnings
+
+import numpy as np
+
+from behavior_reader import read_blocks
+
+# 每次从日志读取的字节数
+BLOCK_SIZE = 64 * 1024 * 1024
+
+# 行为编码
+CLICK, CART, BUY = 0, 1, 2
+OTHER = 255
+BEHAVIOR_CODES = {"click": CLICK, "cart": CART, "buy": BUY}
+
+# 任务3的筛选条件（与code3/task3_high_click_low_cart.py一致）
+MIN_CLICKS = 10
+MAX_CART_RATE = 0.2
+
+# 各任务的Spark输出子目录（与run_all_tasks.py一致）
+TASK_OUTPUTS = ("task1_conversion_rate", "task2_cart_to_buy_rate", "task3")
+
+COMMA = ord(",")
+NEWLINE = ord("\n")
+SPACE = ord(" ")
+INT32 = np.iinfo(np.int32)
+
+class BehaviorLog:
+    """
+    列式行为日志
+    """
+
+    def __init__(self, users, items, behaviors, timestamps):
+        self.users = users
+        self.items = items
+        self.behaviors = behaviors
+        self.timestamps = timestamps
+
+    def __len__(self):
+        return len(self.users)
+
+    def select(self, mask):
+        """按布尔掩码取出子集"""
+        return BehaviorLog(self.users[mask], self.items[mask],
+                           self.behaviors[mask], self.timestamps[mask])
+
+def parse_block_fast(block):
+    """
+    向量化解析一块完整的行（以换行符结尾）
+    Args:
+        block: bytes
+    Returns:
+        (users, items, behaviors, timestamps)的int64/uint8数组；
+        块中有空行、字段数不是4、行为不是click/cart/buy或数字无法解析时返回None
+    """
+    buf = np.frombuffer(block, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == NEWLINE)
+    commas = np.flatnonzero(buf == COMMA)
+    num_lines = len(newlines)
+
+    # 每行恰好3个逗号
+    if len(commas) != 3 * num_lines:
+        return None
+    per_line = np.searchsorted(commas, newlines)
+    if not np.array_equal(per_line, np.arange(3, 3 * num_lines + 1, 3)):
+        return None
+
+    # 第3个字段（行为）位于每行第2、3个逗号之间，按长度和逐字节比较识别
+    commas = commas.reshape(num_lines, 3)
+    starts = commas[:, 1] + 1
+    lengths = commas[:, 2] - starts
+    behaviors = np.full(num_lines, OTHER, dtype=np.uint8)
+    for word, code in BEHAVIOR_CODES.items():
+        match = lengths == len(word)
+        for offset, char in enumerate(word.encode()):
+            match &= buf[np.minimum(starts + offset, len(buf) - 1)] == char
+        behaviors[match] = code
+    if (behaviors == OTHER).any():
+        return None
+
+    # 行为字段改写为"0"加空格，换行符改为逗号，整块交给NumPy按逗号解析整数
+    text = bytearray(block)
+    chars = np.frombuffer(text, dtype=np.uint8)
+    chars[starts] = ord("0")
+    for offset in range(1, max(len(word) for word in BEHAVIOR_CODES)):
+        padded = offset < lengths
+        chars[starts[padded] + offset] = SPACE
+    chars[newlines] = COMMA
+
+    with warnings.catch_warnings():
+        # 数字无法解析时NumPy只给出警告并返回已解析的部分
+        warnings.simplefilter("error")
+        try:
+            values = np.fromstring(bytes(text), dtype=np.int64, sep=",")
+        except (ValueError, DeprecationWarning):
+            return None
+    if len(values) != 4 * num_lines:
+        return None
+
+    values = values.reshape(num_lines, 4)
+    return values[:, 0], values[:, 1], behaviors, values[:, 3]
+
+def parse_block_slow(block):
+    """
+    逐行解析一块数据，规则与behavior_reader.parse_block相同：跳过字段数不是4或数字无法解析的行，
+    其他行为编码为OTHER
+    Args:
+        block: bytes
+    Returns:
+        (users, items, behaviors, timestamps)数组
+    """
+    users, items, behaviors, timestamps = [], [], [], []
+    for row in csv.reader(io.StringIO(block.decode("utf-8", errors="replace"))):
+        if len(row) != 4:
+            continue
+        try:
+            user_id, item_id, timestamp = int(row[0]), int(row[1]), int(row[3])
+        except ValueError:
+            continue
+        users.append(user_id)
+        items.append(item_id)
+        behaviors.append(BEHAVIOR_CODES.get(row[2], OTHER))
+        timestamps.append(timestamp)
+    return (np.array(users, dtype=np.int64), np.array(items, dtype=np.int64),
+            np.array(behaviors, dtype=np.uint8), np.array(timestamps, dtype=np.int64))
+
+def load_log(filename, block_size=BLOCK_SIZE):
+    """
+    把行为日志加载为列式数组
+    Args:
+        filename: CSV文件路径 (user_id,item_id,behavior,timestamp)
+        block_size: 每次读取的字节数
+    Returns:
+        BehaviorLog
+    Raises:
+        ValueError: user_id或item_id超出int32范围
+    """
+    columns = ([], [], [], [])
+    for block in read_blocks(filename, block_size):
+        parsed = parse_block_fast(block)
+        if parsed is None:
+            parsed = parse_block_slow(block)
+        users, items = parsed[0], parsed[1]
+        if len(users) and (min(users.min(), items.min()) < INT32.min or
+                           max(users.max(), items.max()) > INT32.max):
+            raise ValueError(f"{filename}: user_id或item_id超出int32范围")
+        for column, values, dtype in zip(columns, parsed, (np.int32, np.int32, np.uint8, np.int64)):
+            column.append(values.astype(dtype, copy=False))
+
+    # 逐列拼接并释放分块，峰值内存约为最终数组加一列
+    arrays = []
+    for column, dtype in zip(columns, (np.int32, np.int32, np.uint8, np.int64)):
+        arrays.append(np.concatenate(column) if column else np.empty(0, dtype=dtype))
+        column.clear()
+    return BehaviorLog(*arrays)
+
+def round_rates(numerators, denominators):
+    """
+    与Python的round(a / b, 2)逐位一致的比例（np.round先乘100再舍入，结果可能不同），
+    只对不同的(a, b)组合调用round
+    Args:
+        numerators: 分子数组
+        denominators: 分母数组（均大于0）
+    Returns:
+        float64数组
+    """
+    if len(numerators) == 0:
+        return np.empty(0, dtype=np.float64)
+    pairs, inverse = np.unique(np.stack([numerators, denominators], axis=1),
+                               axis=0, return_inverse=True)
+    table = np.array([round(a / b, 2) for a, b in pairs.tolist()], dtype=np.float64)
+    return table[inverse.ravel()]
+
+def group_starts(*keys):
+    """
+    有序键数组中每个分组的起始下标
+    Args:
+        keys: 等长的已排序键数组（按字典序）
+    Returns:
+        int64数组
+    """
+    changed = np.zeros(len(keys[0]), dtype=bool)
+    if len(changed):
+        changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(changed)
+
+def conversion_rates(log, first_behavior):
+    """
+    计算每个用户"first_behavior→购买"的转化率：
+    有first_behavior的不同商品中，最晚购买晚于最早first_behavior的商品所占比例
+    Args:
+        log: BehaviorLog
+        first_behavior: 起始行为编码（CLICK或CART）
+    Returns:
+        (user_ids, rates)，按user_id升序
+    """
+    events = log.select((log.behaviors == first_behavior) | (log.behaviors == BUY))
+    order = np.lexsort((events.items, events.users))
+    users = events.users[order]
+    items = events.items[order]
+    behaviors = events.behaviors[order]
+    timestamps = events.timestamps[order]
+
+    # 每个(user_id, item_id)的最早起始行为时间和最晚购买时间
+    starts = group_starts(users, items)
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+    no_time = np.iinfo(np.int64)
+    first_times = np.minimum.reduceat(
+        np.where(behaviors == first_behavior, timestamps, no_time.max), starts)
+    last_buys = np.maximum.reduceat(np.where(behaviors == BUY, timestamps, no_time.min), starts)
+
+    # 只保留有起始行为的商品，再按用户统计商品数和转化商品数
+    has_first = first_times != no_time.max
+    item_users = users[starts][has_first]
+    converted = (last_buys > first_times)[has_first]
+    user_starts = group_starts(item_users)
+    if len(user_starts) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+    totals = np.diff(np.append(user_starts, len(item_users)))
+    converted_counts = np.add.reduceat(converted.astype(np.int64), user_starts)
+    return item_users[user_starts], round_rates(converted_counts, totals)
+
+def high_click_low_cart_items(log):
+    """
+    找出点击次数 ≥ MIN_CLICKS 且加购转化率 ≤ MAX_CART_RATE 的商品
+    Args:
+        log: BehaviorLog
+    Returns:
+        (item_ids, click_counts, cart_counts, rates)，按加购转化率升序，转化率相同时按item_id升序
+    """
+    click_items, click_counts = np.unique(log.items[log.behaviors == CLICK], return_counts=True)
+    cart_items, cart_counts = np.unique(log.items[log.behaviors == CART], return_counts=True)
+
+    # 每个点击过的商品的加购次数（没有加购为0）
+    item_carts = np.zeros(len(click_items), dtype=np.int64)
+    if len(cart_items):
+        positions = np.minimum(np.searchsorted(cart_items, click_items), len(cart_items) - 1)
+        found = cart_items[positions] == click_items
+        item_carts[found] = cart_counts[positions[found]]
+
+    keep = click_counts >= MIN_CLICKS
+    items, clicks, carts = click_items[keep], click_counts[keep], item_carts[keep]
+    rates = round_rates(carts, clicks)
+    keep = rates <= MAX_CART_RATE
+    items, clicks, carts, rates = items[keep], clicks[keep], carts[keep], rates[keep]
+
+    order = np.argsort(rates, kind="stable")
+    return items[order], clicks[order], carts[order], rates[order]
+
+def run_tasks(log):
+    """
+    计算三个任务的结果
+    Args:
+        log: BehaviorLog
+    Returns:
+        {任务输出子目录: [结果元组]}，元组格式与Spark版本的输出一致
+    """
+    task1 = conversion_rates(log, CLICK)
+    task2 = conversion_rates(log, CART)
+    task3 = high_click_low_cart_items(log)
+    return {
+        TASK_OUTPUTS[0]: list(zip(*(column.tolist() for column in task1))),
+        TASK_OUTPUTS[1]: list(zip(*(column.tolist() for column in task2))),
+        TASK_OUTPUTS[2]: list(zip(*(column.tolist() for column in task3))),
+    }
+
+def read_spark_output(output_path):
+    """
+    读取saveAsTextFile写出的元组格式结果
+    Args:
+        output_path: 输出目录（包含part-*文件）
+    Returns:
+        [结果元组]
+    """
+    rows = []
+    for part in sorted(glob.glob(os.path.join(output_path, "part-*"))):
+        with open(part, "r", encoding="utf-8") as f:
+            rows.extend(ast.literal_eval(line) for line in f if line.strip())
+    return rows
+
+def compare_with_spark(results, output_dir):
+    """
+    与Spark的输出逐行比较（忽略行的顺序）
+    Args:
+        results: run_tasks()的结果
+        output_dir: Spark输出根目录
+    Returns:
+        全部一致返回True
+    """
+    all_match = True
+    for name, rows in results.items():
+        output_path = os.path.join(output_dir, name)
+        if not os.path.isdir(output_path):
+            print(f"⚠️  {name}: 输出目录 {output_path} 不存在，跳过")
+            continue
+        spark_rows = read_spark_output(output_path)
+        if sorted(spark_rows) == sorted(rows):
+            print(f"✅ {name}: 与Spark输出一致（{len(rows)} 行）")
+        else:
+            all_match = False
+            missing = set(rows) - set(spark_rows)
+            extra = set(spark_rows) - set(rows)
+            print(f"❌ {name}: 与Spark输出不一致（基准 {len(rows)} 行，Spark {len(spark_rows)} 行，"
+                  f"缺少 {len(missing)} 行，多出 {len(extra)} 行）")
+            for row in sorted(missing)[:5]:
+                print(f"    缺少: {row}")
+            for row in sorted(extra)[:5]:
+                print(f"    多出: {row}")
+    return all_match
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="向量化的本地计算引擎")
+    parser.add_argument("input", nargs="?", default="data/user_behavior_logs.csv",
+                        help="CSV输入路径")
+    parser.add_argument("--compare", metavar="OUTPUT_DIR",
+                        help="与该目录下的Spark输出比较（如output）")
+    parser.add_argument("--blockmb", type=int, default=BLOCK_SIZE // (1024 * 1024),
+                        help="每次读取的MB数")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    log = load_log(args.input, args.blockmb * 1024 * 1024)
+    load_time = time.time() - start_time
+    print(f"📥 加载了 {len(log)} 条记录，耗时 {load_time:.2f} 秒")
+
+    start_time = time.time()
+    results = run_tasks(log)
+    compute_time = time.time() - start_time
+    print(f"任务1结果数: {len(results[TASK_OUTPUTS[0]])} 个用户")
+    print(f"任务2结果数: {len(results[TASK_OUTPUTS[1]])} 个用户")
+    print(f"任务3结果数: {len(results[TASK_OUTPUTS[2]])} 个商品")
+    print(f"⏱️  计算耗时 {compute_time:.2f} 秒")
+
+    if args.compare and not compare_with_spark(results, args.compare):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
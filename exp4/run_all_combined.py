@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+在同一个SparkContext中执行三个PySpark任务
+输入数据只读取、解析一次并缓存，三个任务都基于缓存的RDD计算，
+JVM启动、SparkContext初始化和输入扫描只发生一次
+"""
+
+from pyspark import SparkContext, StorageLevel
+import os
+import sys
+import time
+
+# 当前脚本所在目录
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 三个任务的脚本，通过addPyFile分发到executor
+TASK_SCRIPTS = [
+    os.path.join(CURRENT_DIR, "code1", "task1_conversion_rate.py"),
+    os.path.join(CURRENT_DIR, "code2", "task2_cart_to_buy_rate.py"),
+    os.path.join(CURRENT_DIR, "code3", "task3_high_click_low_cart.py"),
+]
+
+# 各任务输出子目录（与run_all_tasks.py一致）
+TASK1_OUTPUT = "task1_conversion_rate"
+TASK2_OUTPUT = "task2_cart_to_buy_rate"
+TASK3_OUTPUT = "task3"
+
+def parse_record(line):
+    """
+    解析一行CSV，配合flatMap使用
+
+    Args:
+        line: 文本行 user_id,item_id,behavior,timestamp
+
+    Returns:
+        [(user_id, item_id, behavior, timestamp)]，标题行或格式不正确的行返回空列表
+    """
+    parts = line.strip().split(',')
+    if len(parts) != 4:
+        return []
+    try:
+        return [(int(parts[0]), int(parts[1]), parts[2], int(parts[3]))]
+    except ValueError:
+        return []
+
+def behavior_records(data, behavior):
+    """
+    从缓存的解析结果中取出某种行为的记录
+
+    Args:
+        data: 解析后的行为RDD
+        behavior: 行为类型（click/cart/buy）
+
+    Returns:
+        ((user_id, item_id), timestamp)的RDD
+    """
+    return data.filter(lambda x: x[2] == behavior) \
+               .map(lambda x: ((x[0], x[1]), x[3]))
+
+def run_all_tasks_combined(input_path, output_dir):
+    """
+    在一个SparkContext中计算三个任务的结果
+
+    Args:
+        input_path: 输入数据路径
+        output_dir: 输出根目录，三个任务的结果分别写入其下的子目录
+
+    Returns:
+        {任务输出子目录: 耗时（秒）}
+    """
+    # 初始化SparkContext（只初始化一次）
+    sc = SparkContext(appName="UserBehaviorAllTasks")
+
+    try:
+        for script in TASK_SCRIPTS:
+            sc.addPyFile(script)
+            sys.path.insert(0, os.path.dirname(script))
+
+        from task1_conversion_rate import compute_conversion_rates, print_conversion_rates
+        from task2_cart_to_buy_rate import compute_cart_to_buy_rates, print_cart_to_buy_rates
+        from task3_high_click_low_cart import (compute_high_click_low_cart_items,
+                                               print_high_click_low_cart_items)
+
+        # 读取并解析输入数据一次，缓存供三个任务复用（内存不足时溢写到磁盘）
+        data = sc.textFile(input_path).flatMap(parse_record) \
+                 .persist(StorageLevel.MEMORY_AND_DISK)
+
+        start_time = time.time()
+        record_count = data.count()  # 触发读取并物化缓存
+        print(f"📥 读取并缓存 {record_count} 条行为记录，耗时 {time.time() - start_time:.2f} 秒")
+
+        clicks = behavior_records(data, "click")
+        carts = behavior_records(data, "cart")
+        buys = behavior_records(data, "buy")
+
+        tasks = [
+            (TASK1_OUTPUT, lambda: compute_conversion_rates(clicks, buys), print_conversion_rates),
+            (TASK2_OUTPUT, lambda: compute_cart_to_buy_rates(carts, buys), print_cart_to_buy_rates),
+            (TASK3_OUTPUT, lambda: compute_high_click_low_cart_items(clicks, carts),
+             print_high_click_low_cart_items),
+        ]
+
+        durations = {}
+        for name, compute, report in tasks:
+            start_time = time.time()
+            result = compute()
+            result.saveAsTextFile(os.path.join(output_dir, name))
+            report(result.collect())
+            durations[name] = time.time() - start_time
+            print(f"⏱️  {name} 耗时 {durations[name]:.2f} 秒\n")
+
+        data.unpersist()
+        return durations
+
+    finally:
+        # 关闭SparkContext
+        sc.stop()
+
+def main():
+    """主函数"""
+    if len(sys.argv) >= 2:
+        input_path = sys.argv[1]
+    else:
+        input_path = "data/user_behavior_logs.csv"  # 默认数据集路径
+
+    if len(sys.argv) >= 3:
+        output_dir = sys.argv[2]
+    else:
+        output_dir = "output"  # 默认输出根目录
+
+    run_all_tasks_combined(input_path, output_dir)
+
+if __name__ == "__main__":
+    main()
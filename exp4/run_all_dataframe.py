@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+三个任务的DataFrame版本
+按与RDD版本相同的规则拆分并按显式schema转换每行（可选转存为Parquet后读取），过滤、分组和条件计数都使用内置表达式，
+由Catalyst优化后在JVM中执行，行为记录不再逐条经过Python worker；
+结果按RDD版本saveAsTextFile的元组格式写出，内容与RDD版本一致
+"""
+
+from pyspark.sql import SparkSession, functions as F
+from pyspark.sql.types import (StructType, StructField, IntegerType, LongType,
+                               StringType, DoubleType)
+import argparse
+import os
+import sys
+import time
+
+from run_all_combined import (CURRENT_DIR, TASK_SCRIPTS, TASK1_OUTPUT, TASK2_OUTPUT, TASK3_OUTPUT,
+                              behavior_records, parse_record)
+
+for script in TASK_SCRIPTS:
+    sys.path.insert(0, os.path.dirname(script))
+
+from task1_conversion_rate import compute_conversion_rates, print_conversion_rates
+from task2_cart_to_buy_rate import compute_cart_to_buy_rates, print_cart_to_buy_rates
+from task3_high_click_low_cart import (MIN_CLICKS, MAX_CART_RATE,
+                                       compute_high_click_low_cart_items,
+                                       print_high_click_low_cart_items)
+
+# 行为日志的schema（时间戳为毫秒，超出int范围）
+BEHAVIOR_SCHEMA = StructType([
+    StructField("user_id", IntegerType()),
+    StructField("item_id", IntegerType()),
+    StructField("behavior", StringType()),
+    StructField("timestamp", LongType()),
+])
+
+@F.udf(returnType=DoubleType())
+def round_rate(numerator, denominator):
+    """
+    与RDD版本相同的round(numerator / denominator, 2)
+    Spark的round/bround按double的十进制字符串舍入（如59/200得0.3，Python得0.29），
+    因此比例的舍入交给Python；它只作用于聚合后的每个用户/商品一行，不影响逐条记录的处理
+    """
+    return round(numerator / denominator, 2)
+
+def read_behaviors(spark, input_path, parquet_path=None):
+    """
+    读取行为日志
+
+    Args:
+        spark: SparkSession
+        input_path: CSV输入路径
+        parquet_path: Parquet副本路径，不存在时先由CSV转存；为None时直接读取CSV
+
+    Returns:
+        (user_id, item_id, behavior, timestamp)的DataFrame，标题行和格式不正确的行已丢弃
+    """
+    if parquet_path is not None and os.path.exists(parquet_path):
+        return spark.read.parquet(parquet_path)
+
+    # 与run_all_combined.parse_record一致：去掉首尾空白后按逗号拆分，字段数不是4的行丢弃。
+    # 不使用spark.read.csv：PERMISSIVE模式会截断多余字段并保留该行，与RDD版本不一致
+    parts = F.split(F.regexp_replace("value", r"^\s+|\s+$", ""), ",")
+    columns = [parts.getItem(i).cast(field.dataType).alias(field.name)
+               for i, field in enumerate(BEHAVIOR_SCHEMA.fields)]
+    # 数字无法解析的字段转换为null（包括标题行），na.drop()引用全部列，避免列裁剪后只检查部分字段
+    events = spark.read.text(input_path) \
+                  .where(F.size(parts) == len(BEHAVIOR_SCHEMA.fields)) \
+                  .select(*columns) \
+                  .na.drop()
+    if parquet_path is None:
+        return events
+
+    events.write.mode("overwrite").parquet(parquet_path)
+    print(f"💾 已将输入转存为Parquet: {parquet_path}")
+    return spark.read.parquet(parquet_path)
+
+def conversion_rates(events, first_behavior):
+    """
+    计算每个用户"first_behavior→购买"的转化率
+
+    Args:
+        events: 行为DataFrame
+        first_behavior: 起始行为（click或cart）
+
+    Returns:
+        (user_id, rate)的DataFrame
+    """
+    behavior = F.col("behavior")
+    # 每个(user_id, item_id)的最早起始行为时间和最晚购买时间
+    item_times = events.where(behavior.isin(first_behavior, "buy")) \
+                       .groupBy("user_id", "item_id") \
+                       .agg(F.min(F.when(behavior == first_behavior, F.col("timestamp"))).alias("first_time"),
+                            F.max(F.when(behavior == "buy", F.col("timestamp"))).alias("last_buy"))
+
+    # 每个用户有起始行为的不同商品数和有转化的不同商品数（无购买时last_buy为null，计0）
+    user_counts = item_times.where(F.col("first_time").isNotNull()) \
+                            .groupBy("user_id") \
+                            .agg(F.count(F.lit(1)).alias("total_count"),
+                                 F.sum(F.when(F.col("last_buy") > F.col("first_time"), 1)
+                                        .otherwise(0)).alias("converted_count"))
+
+    return user_counts.select("user_id",
+                              round_rate("converted_count", "total_count").alias("rate"))
+
+def high_click_low_cart_items(events):
+    """
+    找出高曝光低加购商品
+
+    Args:
+        events: 行为DataFrame
+
+    Returns:
+        按加购转化率升序排列的(item_id, click_count, cart_count, cart_conversion_rate)的DataFrame
+    """
+    behavior = F.col("behavior")
+    item_counts = events.groupBy("item_id") \
+                        .agg(F.sum(F.when(behavior == "click", 1).otherwise(0)).alias("click_count"),
+                             F.sum(F.when(behavior == "cart", 1).otherwise(0)).alias("cart_count"))
+
+    return item_counts.where(F.col("click_count") >= MIN_CLICKS) \
+                      .withColumn("cart_conversion_rate", round_rate("cart_count", "click_count")) \
+                      .where(F.col("cart_conversion_rate") <= MAX_CART_RATE) \
+                      .orderBy("cart_conversion_rate", "item_id")
+
+def save_as_tuples(df, output_path):
+    """
+    按RDD saveAsTextFile的格式写出，每行为Python元组形式，如 (1, 0.67)
+
+    Args:
+        df: 结果DataFrame
+        output_path: 输出目录
+    """
+    fields = F.concat_ws(", ", *[F.col(name).cast("string") for name in df.columns])
+    df.select(F.concat(F.lit("("), fields, F.lit(")")).alias("value")) \
+      .write.mode("overwrite").text(output_path)
+
+def verify_against_rdd(spark, input_path, results):
+    """
+    用RDD版本从原始文本重新解析、计算并比较结果
+
+    Args:
+        spark: SparkSession
+        input_path: CSV输入路径
+        results: {任务输出子目录: DataFrame版本collect()的结果}
+
+    Returns:
+        结果全部一致返回True
+    """
+    sc = spark.sparkContext
+    # parse_record按模块引用序列化，executor需要能导入run_all_combined
+    sc.addPyFile(os.path.join(CURRENT_DIR, "run_all_combined.py"))
+    data = sc.textFile(input_path).flatMap(parse_record).cache()
+    clicks = behavior_records(data, "click")
+    carts = behavior_records(data, "cart")
+    buys = behavior_records(data, "buy")
+
+    expected = {
+        TASK1_OUTPUT: sorted(compute_conversion_rates(clicks, buys).collect()),
+        TASK2_OUTPUT: sorted(compute_cart_to_buy_rates(carts, buys).collect()),
+        TASK3_OUTPUT: sorted(compute_high_click_low_cart_items(clicks, carts).collect()),
+    }
+
+    data.unpersist()
+
+    all_match = True
+    for name, rows in expected.items():
+        actual = sorted(tuple(row) for row in results[name])
+        if actual == rows:
+            print(f"✅ {name}: 与RDD版本一致（{len(rows)} 行）")
+        else:
+            all_match = False
+            print(f"❌ {name}: 与RDD版本不一致（DataFrame {len(actual)} 行，RDD {len(rows)} 行）")
+    return all_match
+
+def run_all_tasks_dataframe(input_path, output_dir, parquet_path=None, verify=False):
+    """
+    用DataFrame API计算三个任务的结果
+
+    Args:
+        input_path: CSV输入路径
+        output_dir: 输出根目录，三个任务的结果分别写入其下的子目录
+        parquet_path: Parquet副本路径，为None时直接读取CSV
+        verify: 是否与RDD版本的结果比较
+
+    Returns:
+        {任务输出子目录: 耗时（秒）}，verify为True且结果不一致时抛出RuntimeError
+    """
+    spark = SparkSession.builder.appName("UserBehaviorAllTasksDataFrame").getOrCreate()
+
+    try:
+        for script in TASK_SCRIPTS:
+            spark.sparkContext.addPyFile(script)
+
+        start_time = time.time()
+        events = read_behaviors(spark, input_path, parquet_path).cache()
+        record_count = events.count()  # 触发读取并物化列式缓存
+        print(f"📥 读取并缓存 {record_count} 条行为记录，耗时 {time.time() - start_time:.2f} 秒")
+
+        tasks = [
+            (TASK1_OUTPUT, conversion_rates(events, "click"), print_conversion_rates),
+            (TASK2_OUTPUT, conversion_rates(events, "cart"), print_cart_to_buy_rates),
+            (TASK3_OUTPUT, high_click_low_cart_items(events), print_high_click_low_cart_items),
+        ]
+
+        durations = {}
+        results = {}
+        for name, result, report in tasks:
+            start_time = time.time()
+            save_as_tuples(result, os.path.join(output_dir, name))
+            results[name] = result.collect()
+            report(results[name])
+            durations[name] = time.time() - start_time
+            print(f"⏱️  {name} 耗时 {durations[name]:.2f} 秒\n")
+
+        if verify and not verify_against_rdd(spark, input_path, results):
+            raise RuntimeError("DataFrame版本与RDD版本的结果不一致")
+
+        events.unpersist()
+        return durations
+
+    finally:
+        spark.stop()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="三个任务的DataFrame版本")
+    parser.add_argument("input", nargs="?", default="data/user_behavior_logs.csv",
+                        help="CSV输入路径")
+    parser.add_argument("output", nargs="?", default="output", help="输出根目录")
+    parser.add_argument("--parquet", help="Parquet副本路径，不存在时由CSV转存，之后直接读取")
+    parser.add_argument("--verify", action="store_true", help="与RDD版本的结果比较")
+    args = parser.parse_args()
+
+    run_all_tasks_dataframe(args.input, args.output, args.parquet, args.verify)
+
+if __name__ == "__main__":
+    main()
@@ -67,13 +67,20 @@ def run_spark_job(script_path, input_path, output_path, task_name):
 def main():
     """主函数"""
     
-    # 检查参数
-    if len(sys.argv) != 2:
-        print("用法: python run_all_tasks.py <输入数据文件>")
+    # 检查参数（--combined：在一个SparkContext中执行三个任务，输入只读取一次；
+    # --dataframe：执行DataFrame版本，同样只提交一次）
+    flags = {"--combined", "--dataframe"}
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    combined = "--combined" in sys.argv[1:]
+    dataframe = "--dataframe" in sys.argv[1:]
+    if len(args) != 1 or (combined and dataframe):
+        print("用法: python run_all_tasks.py <输入数据文件> [--combined | --dataframe]")
         print("示例: python run_all_tasks.py test_data.txt")
+        print("      python run_all_tasks.py test_data.txt --combined")
+        print("      python run_all_tasks.py test_data.txt --dataframe")
         sys.exit(1)
     
-    input_file = sys.argv[1]
+    input_file = args[0]
     
     # 检查输入文件是否存在
     if not os.path.exists(input_file):
@@ -117,8 +124,21 @@ def main():
     start_time = time.time()
     success_count = 0
     
+    if combined or dataframe:
+        # 一次spark-submit完成三个任务，共享JVM、SparkContext和缓存的输入
+        if combined:
+            script, name = "run_all_combined.py", "全部任务（共享SparkContext）"
+        else:
+            script, name = "run_all_dataframe.py", "全部任务（DataFrame版本）"
+        success = run_spark_job(os.path.join(current_dir, script), input_file, "output", name)
+        if success:
+            success_count = len(tasks)
+        tasks_to_run = []
+    else:
+        tasks_to_run = tasks
+    
     # 依次执行每个任务
-    for i, task in enumerate(tasks, 1):
+    for i, task in enumerate(tasks_to_run, 1):
         print(f"\n📋 任务 {i}/3: {task['name']}")
         
         # 运行任务